@@ -1,15 +1,162 @@
 import asyncio
+import contextlib
+import copy
+import time
 from abc import ABC, abstractmethod
 
 import grpc
 import numpy as np
 
+import rl_pb2
+from rl.action_table import ActionTable
+from rl.client_pool import RLClientPool
+from rl.observation_batch import ObservationDecoder, PackedObservations
+from rl.reconnect import ReconnectPolicy, connection_lost
 from rl.rl_client import RLClient
 from utils.log import Logger
 
 logger = Logger(__name__)
 
 
+class StepPhaseStats:
+    """
+    Wall-clock time spent in each phase of the environment steps.
+
+    Attributes
+    ----------
+    steps : int
+        Number of collected steps.
+    pipelined_steps : int
+        Number of steps submitted with `step_async` and collected with `step_wait`.
+    submit_s : float
+        Time spent decoding actions and sending the step requests.
+    overlap_s : float
+        Time the caller spent on its own work while a step request was in flight.
+    wait_s : float
+        Time spent blocked waiting for step responses.
+    pipelined_wait_s : float
+        Part of `wait_s` spent in `step_wait` after a `step_async`.
+    encode_s : float
+        Time spent encoding the observations.
+    """
+
+    def __init__(self) -> None:
+        self.steps = 0
+        self.pipelined_steps = 0
+        self.submit_s = 0.0
+        self.overlap_s = 0.0
+        self.wait_s = 0.0
+        self.pipelined_wait_s = 0.0
+        self.encode_s = 0.0
+
+    def summary(self) -> dict[str, float]:
+        """Return the totals together with derived per-step figures.
+
+        The saved time is estimated from the mean wait of the blocking steps,
+        so it is only reported when both blocking and pipelined steps were taken.
+
+        Returns
+        -------
+        dict[str, float]
+            The phase totals, the mean wait of blocking and pipelined steps and
+            the estimated wall-clock time saved by pipelining.
+        """
+        blocking_steps = self.steps - self.pipelined_steps
+        blocking_wait_s = self.wait_s - self.pipelined_wait_s
+        summary = {
+            "steps": self.steps,
+            "pipelined_steps": self.pipelined_steps,
+            "submit_s": self.submit_s,
+            "overlap_s": self.overlap_s,
+            "wait_s": self.wait_s,
+            "encode_s": self.encode_s,
+            "blocking_wait_mean_s": (
+                blocking_wait_s / blocking_steps if blocking_steps else 0.0
+            ),
+            "pipelined_wait_mean_s": (
+                self.pipelined_wait_s / self.pipelined_steps
+                if self.pipelined_steps
+                else 0.0
+            ),
+            "estimated_saved_s": 0.0,
+        }
+        if blocking_steps and self.pipelined_steps:
+            summary["estimated_saved_s"] = max(
+                0.0,
+                summary["blocking_wait_mean_s"] * self.pipelined_steps
+                - self.pipelined_wait_s,
+            )
+        return summary
+
+
+class EpisodeLog:
+    """
+    What it takes to bring a simulator to the current state of an episode:
+    its configuration, its seed and the actions sent since the reset.
+
+    Attributes
+    ----------
+    config : str | None
+        The YAML configuration of the last init, None if not known.
+    seed : int | None
+        The seed of the last reset, None before the first one.
+    steps : list[tuple]
+        The decoded actions and the action repeat of every step since.
+    """
+
+    def __init__(self, config: str | None = None, seed: int | None = None) -> None:
+        self.config = config
+        self.seed = seed
+        self.steps: list[tuple] = []
+
+    def restart(self, seed: int) -> None:
+        self.seed = seed
+        self.steps = []
+
+    def copy(self) -> "EpisodeLog":
+        log = EpisodeLog(self.config, self.seed)
+        log.steps = list(self.steps)
+        return log
+
+
+class EnvSnapshot:
+    """
+    A saved environment state, returned by `AbstractEnv.snapshot`.
+
+    Attributes
+    ----------
+    snapshot_id : str
+        The id of the simulation state saved on the server.
+    state : dict
+        Copies of the client-side attributes of the environment listed in its
+        `_snapshot_attributes`, e.g. the cells visited so far.
+    episode : EpisodeLog | None
+        The log of the episode up to the state, replayed if the simulator is
+        lost after a restore.
+    """
+
+    def __init__(
+        self, snapshot_id: str, state: dict, episode: EpisodeLog | None = None
+    ) -> None:
+        self.snapshot_id = snapshot_id
+        self.state = state
+        self.episode = episode
+
+
+def _server_states(observations) -> dict[str, int] | None:
+    """The discrete states computed by the server, None if there are none"""
+    if isinstance(observations, PackedObservations):
+        if observations.states is None:
+            return None
+        return dict(
+            zip(observations.agent_ids, observations.states.tolist(), strict=True)
+        )
+    first = next(iter(observations.values()), None)
+    if first is None or not first.HasField("state"):
+        return None
+    return {k: v.state for k, v in observations.items()}
+
+
 class AbstractEnv(ABC):
     """
     Custom environment class for RL interaction via gRPC with abstract methods for encoding observations and decoding actions.
@@ -27,20 +174,184 @@ class AbstractEnv(ABC):
         The RL client for gRPC communication.
     render_mode : str
         The render mode for the environment.
+    action_repeat : int
+        Simulator ticks every action is applied for, 1 by default. A step
+        returns the observations of the last tick, the rewards summed and the
+        flags OR-ed over the ticks, and stops early when an agent is done.
     loop : asyncio.AbstractEventLoop
-        The event loop for running async operations.
+        The event loop running the calls of the synchronous API, created on
+        first use and never installed as the thread's loop, so environments
+        do not take over each other's. Environments of the same thread may
+        share one, see `thread_loop`; `AsyncEnv` runs on the caller's loop
+        instead. Init, reset, step and render skip it and block on the sync
+        transport of the client when the client opted into it and it can
+        serve them, see `RLClient.sync_ready`.
+    step_stats : StepPhaseStats
+        Time spent in each phase of the steps taken so far.
+    reconnect : ReconnectPolicy | None
+        How to fail over to another simulator when the connection to this one
+        is lost, None (default) to raise instead. The calls of the synchronous
+        API are then retried on the new simulator once the current episode is
+        replayed there from its `EpisodeLog`, so the caller carries on; saved
+        snapshots stay on the lost one.
+    observation_decoder : ObservationDecoder
+        Columnar decoder used when the environment sets `_batch_encoding`.
+    server_encoding : bool
+        Whether the simulator computes the discrete states with the
+        `encoder_spec` sent at init, False (default) to encode the
+        observations on the client. Set it before `init`.
     """
 
+    # encode the observations of all agents at once with
+    # `_encode_observation_batch(batch)`, one row per agent of the columnar
+    # `ObservationBatch` of `observation_decoder`, instead of agent by agent;
+    # the batch arrays are reused by the next step, so the result must not be
+    # a view of them
+    _batch_encoding = False
+    # observation fields requested from the server at init, and the columns
+    # decoded for `_encode_observation_batch`
+    _observation_fields = ObservationDecoder.FIELDS
+    # sensors read by `_encode_observation_batch`, None for all of them
+    _proximity_indices = None
+    _light_indices = None
+    # receive the visited cells as a grid kept by the client, see `RLClient.init`
+    _visited_delta = False
+    # client-side episode state saved by `snapshot` along with the simulation
+    _snapshot_attributes = ()
+
     def __init__(self, server_address, client_name) -> None:
         self.client = RLClient(server_address, client_name)
         self.render_mode = "rgb_array"
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
+        self.action_repeat = 1
+        self._loop = None
+        self._owns_loop = False
+        self.step_stats = StepPhaseStats()
+        self.reconnect: ReconnectPolicy | None = None
+        self._episode = EpisodeLog()
+        self._pool = None
+        self.observation_decoder = ObservationDecoder()
+        self.server_encoding = False
+        self._pending_step = None
+        self._pending_actions = None
+        self._pending_since = None
+        self._pending_reset = None
+        self._action_table = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._owns_loop = True
+        return self._loop
+
+    @loop.setter
+    def loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        # a loop passed in is shared, and closed by its owner
+        self._loop = loop
+        self._owns_loop = False
 
     def _run_async(self, coro):
         """Helper method to run async coroutines synchronously"""
         return self.loop.run_until_complete(coro)
 
+    def _recovering(self, call, retry=None):
+        """Run `call`, and `retry` (default `call`) again on another simulator
+        if the connection was lost, see `reconnect`"""
+        try:
+            return call()
+        except (grpc.RpcError, ConnectionError) as e:
+            if self.reconnect is None or not connection_lost(e):
+                raise
+            self._run_async(self._fail_over(e))
+        return (retry or call)()
+
+    async def _fail_over(self, error: BaseException) -> None:
+        """Replace the client of a lost simulator and replay the episode"""
+        policy = self.reconnect
+        lost = self.client
+        reason = error.code().name if isinstance(error, grpc.RpcError) else error
+        logger.warning(f"✗ Lost simulator {lost.server_address}: {reason}")
+        trace, lost.trace = lost.trace, None
+        stream = lost.step_stream is not None
+        await self._drop_client(lost)
+        for attempt in range(policy.attempts):
+            await asyncio.sleep(policy.delay(attempt))
+            client = await self._next_client(lost)
+            if client is None:
+                logger.warning(
+                    f"✗ No simulator reachable, attempt {attempt + 1}/{policy.attempts}"
+                )
+                continue
+            client.shared_memory = lost.shared_memory
+            client.shared_memory_slots = lost.shared_memory_slots
+            client.packed_steps = lost.packed_steps
+            client.sync_transport = lost.sync_transport
+            self.client = client
+            try:
+                await self._replay_episode()
+            except (grpc.RpcError, ConnectionError, ValueError) as e:
+                logger.warning(f"✗ Replay on {client.server_address} failed: {e}")
+                await self._drop_client(client)
+                continue
+            client.trace = trace
+            if stream:
+                await client.open_step_stream()
+            logger.info(
+                f"✓ Failed over to {client.server_address} [instance {client.instance}],"
+                f" replayed {len(self._episode.steps)} steps"
+            )
+            return
+        self.client = lost
+        lost.trace = trace
+        raise ConnectionError(
+            f"No simulator reachable after {policy.attempts} attempts"
+        ) from error
+
+    async def _next_client(self, lost: RLClient) -> RLClient | None:
+        """A connected client on the next reachable simulator, None if none is
+
+        Pool endpoints are health checked first, evicting the lost one.
+        """
+        if self._pool is not None:
+            await self._pool.health_check()
+            try:
+                return await self._pool.acquire()
+            except RuntimeError:
+                return None
+        for address in self.reconnect.candidates(lost.server_address):
+            client = RLClient(
+                address, lost.client_name, lost.instance, metrics=lost.metrics
+            )
+            try:
+                await client.connect(self.reconnect.connect_timeout_s)
+            except (asyncio.TimeoutError, grpc.RpcError):
+                await self._drop_client(client)
+                continue
+            return client
+        return None
+
+    async def _drop_client(self, client: RLClient) -> None:
+        with contextlib.suppress(grpc.RpcError, ConnectionError):
+            if self._pool is not None:
+                await self._pool.release(client)
+            else:
+                await client.close()
+
+    async def _replay_episode(self) -> None:
+        """Bring the simulator of the client to the state of the episode"""
+        episode = self._episode
+        if episode.config is not None:
+            ok, message = await self.client.init(
+                episode.config, **self._init_arguments()
+            )
+            if not ok:
+                raise ValueError(f"Invalid configuration: {message}")
+        if episode.seed is None:
+            return
+        await self.client.reset(episode.seed)
+        for actions, repeat in episode.steps:
+            await self.client.step(actions, repeat=repeat)
+
     @abstractmethod
     def _encode_observation(
         self, proximity_values, light_values, position, orientation, visited_positions
@@ -55,6 +366,14 @@ class AbstractEnv(ABC):
 
     def _encode_observations(self, observations):
         """Encode multiple observations"""
+        states = _server_states(observations)
+        if states is not None:
+            return states
+        if self._batch_encoding:
+            batch = self.observation_decoder.decode(
+                observations, self._observation_fields
+            )
+            return batch.to_dict(self._encode_observation_batch(batch))
         return {
             k: self._encode_observation(
                 v.proximity_values,
@@ -67,9 +386,28 @@ class AbstractEnv(ABC):
         }
 
     def _decode_actions(self, actions):
-        """Decode multiple actions"""
+        """Decode multiple actions
+
+        With an `action_table` they are serialized from entries built once
+        per agent and action, instead of one message per agent and step.
+        """
+        table = self.action_table()
+        if table is not None:
+            return table.encode(actions)
         return {k: self._decode_action(v) for k, v in actions.items()}
 
+    def action_table(self) -> ActionTable | None:
+        """The pre-built actions of the discrete action set, None to decode
+        every action with `_decode_action`
+
+        The default is built once from `actions`, the (left, right) wheel
+        speeds of every action index, which is how the environments decode
+        their actions.
+        """
+        if self._action_table is None and getattr(self, "actions", None):
+            self._action_table = ActionTable(self.actions)
+        return self._action_table
+
     def connect_to_client(self):
         """Initialize the RL client and connect to the server"""
         try:
@@ -83,15 +421,116 @@ class AbstractEnv(ABC):
         except Exception as e:
             logger.info(f"✗ Error: {e}")
 
+    def connect_to_pool(self, pool: RLClientPool):
+        """Connect through a client pool, on its least-loaded live endpoint
+
+        Parameters
+        ----------
+        pool : RLClientPool
+            The pool to take the client from, connected on first use. It must
+            not be shared with environments running on other event loops.
+        """
+
+        async def _acquire():
+            if not pool.alive_endpoints:
+                await pool.connect()
+            return await pool.acquire()
+
+        self.client = self._run_async(_acquire())
+        self._pool = pool
+        logger.info(
+            f"✓ Connected to {self.client.server_address} [instance {self.client.instance}]"
+        )
+
+    def encoder_spec(self) -> rl_pb2.EncoderSpec | None:
+        """The spec of `_encode_observation` for the server, None if it has none
+
+        With `server_encoding` set, environments with a spec get the discrete
+        states computed by the server with their observations and do not
+        encode them; shared memory steps carry no state, so they keep
+        encoding on the client.
+        """
+        return None
+
+    def _server_encoder(self) -> rl_pb2.EncoderSpec | None:
+        if not self.server_encoding or self.client.shared_memory:
+            return None
+        return self.encoder_spec()
+
+    def observation_mask(self) -> rl_pb2.ObservationMask:
+        """The observation fields and sensors this environment encodes
+
+        Sensor indices are only requested by environments encoding the
+        columnar batch, where `observation_decoder` puts the values back at
+        their sensor column; the others receive every sensor. Environments
+        whose states are computed by the server only receive the states.
+        """
+        if self._server_encoder() is not None:
+            return rl_pb2.ObservationMask(fields=["state"])
+        mask = rl_pb2.ObservationMask()
+        if set(self._observation_fields) != set(ObservationDecoder.FIELDS):
+            mask.fields.extend(self._observation_fields)
+        if self._batch_encoding:
+            mask.proximity_indices.extend(self._proximity_indices or ())
+            mask.light_indices.extend(self._light_indices or ())
+        mask.visited_delta = self._visited_delta
+        return mask
+
+    def _init_arguments(self) -> dict:
+        """The mask and encoder of an init, with the decoder set for the mask"""
+        mask = self.observation_mask()
+        self._configure_decoder(mask)
+        return {"mask": mask, "encoder": self._server_encoder()}
+
+    def _configure_decoder(self, mask: rl_pb2.ObservationMask) -> None:
+        self.observation_decoder.clear()
+        self.observation_decoder.proximity_indices = (
+            tuple(mask.proximity_indices) or None
+        )
+        self.observation_decoder.light_indices = tuple(mask.light_indices) or None
+
     def init(self, yaml_config: str):
         """Initialize the environment with the given YAML configuration
 
+        Only the fields of `observation_mask` are sent by the server until the
+        next initialization.
+
         Parameters
         ----------
         yaml_config : str
             The YAML configuration string.
         """
-        return self._run_async(self.client.init(yaml_config))
+        self._episode = EpisodeLog(yaml_config)
+
+        def init():
+            if self.client.sync_ready:
+                return self.client.init_sync(yaml_config, **self._init_arguments())
+            return self._run_async(
+                self.client.init(yaml_config, **self._init_arguments())
+            )
+
+        return self._recovering(init)
+
+    def init_reset(self, yaml_config: str, seed: int = 42) -> tuple[dict, dict]:
+        """Switch to a configuration and reset in a single round trip
+
+        The configuration is uploaded to the server only the first time it is
+        used, later switches refer to it by content hash, so it is cheaper than
+        `init` followed by `reset` when a few configurations are reused.
+
+        Parameters
+        ----------
+        yaml_config : str
+            The YAML configuration string.
+        seed : int
+            The seed for random number generation.
+        """
+        self._cancel_pending()
+        self._episode = EpisodeLog(yaml_config, seed)
+        self._pending_reset = self.loop.create_task(
+            self.client.init_reset(yaml_config, seed, **self._init_arguments())
+        )
+        return self.reset(seed)
 
     def step(self, actions: dict) -> tuple[dict, dict, dict, dict, dict]:
         """Take a step in the environment with the given actions
@@ -106,20 +545,124 @@ class AbstractEnv(ABC):
         tuple[dict, dict, dict, dict, dict]
             A tuple containing observations, rewards, terminateds, truncateds, and infos.
         """
-        actions = self._decode_actions(actions)
+        if self._pending_step is not None or not self.client.sync_ready:
+            self._submit_step(actions)
+            return self.step_wait()
+        stats = self.step_stats
+        start = time.perf_counter()
+        decoded = self._decode_actions(actions)
+        submitted = time.perf_counter()
+        stats.submit_s += submitted - start
+        step = self._recovering(lambda: self._client_step(decoded))
+        self._episode.steps.append((decoded, self.action_repeat))
+        waited = time.perf_counter()
+        stats.wait_s += waited - submitted
+        result = self._step_result(*step)
+        stats.encode_s += time.perf_counter() - waited
+        stats.steps += 1
+        return result
+
+    def step_async(self, actions: dict) -> None:
+        """Send a step request without waiting for its response
 
-        observations, rewards, terminateds, truncateds, infos = self._run_async(
-            self.client.step(actions)
+        The request is in flight until `step_wait` is called, so the caller can
+        run its own work, e.g. a learning update, in the meantime.
+
+        Parameters
+        ----------
+        actions : dict
+            A dictionary mapping agent IDs to their respective actions.
+        """
+        self._submit_step(actions)
+        # let the call start, so the request is sent before returning
+        self._run_async(asyncio.sleep(0))
+        self._pending_since = time.perf_counter()
+
+    def step_wait(self) -> tuple[dict, dict, dict, dict, dict]:
+        """Wait for the step submitted last and return its results
+
+        Returns
+        -------
+        tuple[dict, dict, dict, dict, dict]
+            A tuple containing observations, rewards, terminateds, truncateds, and infos.
+        """
+        if self._pending_step is None:
+            raise RuntimeError("step_wait called without a pending step")
+        stats = self.step_stats
+        start = time.perf_counter()
+        if self._pending_since is not None:
+            stats.overlap_s += start - self._pending_since
+        task, self._pending_step = self._pending_step, None
+        actions, self._pending_actions = self._pending_actions, None
+        observations, rewards, terminateds, truncateds, infos = self._recovering(
+            lambda: self._run_async(task), retry=lambda: self._client_step(actions)
+        )
+        self._episode.steps.append((actions, self.action_repeat))
+        waited = time.perf_counter()
+        stats.wait_s += waited - start
+        if self._pending_since is not None:
+            stats.pipelined_steps += 1
+            stats.pipelined_wait_s += waited - start
+            self._pending_since = None
+        result = self._step_result(
+            observations, rewards, terminateds, truncateds, infos
         )
-        return (
-            self._encode_observations(observations),
-            rewards,
-            terminateds,
-            truncateds,
-            infos,
+        stats.encode_s += time.perf_counter() - waited
+        stats.steps += 1
+        return result
+
+    def _step_result(
+        self, observations, rewards, terminateds, truncateds, infos
+    ) -> tuple[dict, dict, dict, dict, dict]:
+        """The step results returned to the caller, with encoded observations
+
+        Environments keeping per-episode state, e.g. the explored cells,
+        update it here, so the synchronous and the `AsyncEnv` steps share it.
+        """
+        encoded = self._encode_observations(observations)
+        return encoded, rewards, terminateds, truncateds, infos
+
+    def _reset_result(self, observations, infos) -> tuple[dict, dict]:
+        """The reset results returned to the caller, see `_step_result`"""
+        return self._encode_observations(observations), infos
+
+    def _restore_result(self, observations, infos) -> tuple[dict, dict]:
+        """The restore results returned to the caller, with the saved
+        attributes already restored, see `_step_result`"""
+        return self._encode_observations(observations), infos
+
+    def _submit_step(self, actions: dict) -> None:
+        if self._pending_step is not None:
+            raise RuntimeError("a step is already pending, call step_wait first")
+        start = time.perf_counter()
+        actions = self._decode_actions(actions)
+        self._pending_step = self.loop.create_task(
+            self.client.step(actions, repeat=self.action_repeat)
         )
+        self._pending_actions = actions
+        self.step_stats.submit_s += time.perf_counter() - start
 
-    def render(self, width: int = 800, height: int = 600) -> np.ndarray:
+    def _client_step(self, actions) -> tuple:
+        if self.client.sync_ready:
+            return self.client.step_sync(actions, repeat=self.action_repeat)
+        return self._run_async(self.client.step(actions, repeat=self.action_repeat))
+
+    def _client_reset(self, seed: int) -> tuple:
+        if self.client.sync_ready:
+            return self.client.reset_sync(seed)
+        return self._run_async(self.client.reset(seed))
+
+    def _cancel_pending(self) -> None:
+        for task in (self._pending_step, self._pending_reset):
+            if task is not None:
+                task.cancel()
+        self._pending_step = None
+        self._pending_actions = None
+        self._pending_reset = None
+
+    def render(
+        self, width: int = 800, height: int = 600, out: np.ndarray | None = None
+    ) -> np.ndarray:
         """Render the current state of the environment
 
         Parameters
@@ -128,13 +671,24 @@ class AbstractEnv(ABC):
             The width of the rendered image.
         height : int
             The height of the rendered image.
+        out : np.ndarray | None, optional (default=None)
+            A uint8 array of shape (height, width, 3) the frame is written to.
+            Without it every call returns a new array, copied out of the
+            response; pass the previous frame to reuse its buffer, unless the
+            frames are kept, e.g. for a video.
 
         Returns
         -------
         np.ndarray
-            A numpy array representing the rendered RGB image.
+            A numpy array representing the rendered RGB image, `out` if given.
         """
-        return self._run_async(self.client.render(width, height))
+
+        def render():
+            if self.client.sync_ready:
+                return self.client.render_sync(width, height, out=out)
+            return self._run_async(self.client.render(width, height, out=out))
+
+        return self._recovering(render)
 
     def reset(self, seed: int = 42) -> tuple[dict, dict]:
         """Reset the environment to an initial state
@@ -142,12 +696,91 @@ class AbstractEnv(ABC):
         Parameters
         ----------
         seed : int
-            The seed for random number generation.
+            The seed for random number generation. Ignored when a reset is
+            already in flight, sent by a `VectorEnv` for `async_reset` or its
+            autoreset, like steps sent with `step_async`: its response is
+            collected instead.
         """
-        observations, infos = self._run_async(self.client.reset(seed))
-        return self._encode_observations(observations), infos
+        task, self._pending_reset = self._pending_reset, None
+        if task is None:
+            self._episode.restart(seed)
+            observations, infos = self._recovering(lambda: self._client_reset(seed))
+        else:
+            observations, infos = self._recovering(
+                lambda: self._run_async(task),
+                retry=lambda: self._client_reset(self._episode.seed),
+            )
+        return self._reset_result(observations, infos)
+
+    def snapshot(self) -> EnvSnapshot:
+        """Save the current state of the environment, mid-episode included
+
+        Returns
+        -------
+        EnvSnapshot
+            The saved state, to pass to `restore` any number of times.
+        """
+        return EnvSnapshot(
+            self._run_async(self.client.snapshot()),
+            self._saved_state(),
+            self._episode.copy(),
+        )
+
+    def _saved_state(self) -> dict:
+        return {
+            name: copy.deepcopy(getattr(self, name))
+            for name in self._snapshot_attributes
+        }
+
+    def restore(self, snapshot: EnvSnapshot) -> tuple[dict, dict]:
+        """Go back to a saved state, e.g. to restart from a frontier state
+
+        It replaces `reset` followed by the steps that led to the state, in a
+        single round trip, and the episode continues from there.
+
+        Unlike the other calls, it does not fail over with `reconnect`: the
+        snapshot is kept by the simulator that saved it, so once that one is
+        lost the state cannot be restored elsewhere, and the connection error
+        is raised. The next call fails over as usual.
+
+        Parameters
+        ----------
+        snapshot : EnvSnapshot
+            A state saved by `snapshot`.
+
+        Returns
+        -------
+        tuple[dict, dict]
+            The encoded observations and the infos in the saved state.
+        """
+        self._cancel_pending()
+        observations, infos = self._run_async(self.client.restore(snapshot.snapshot_id))
+        self._episode = (
+            snapshot.episode.copy() if snapshot.episode is not None else EpisodeLog()
+        )
+        self._load_state(snapshot.state)
+        return self._restore_result(observations, infos)
+
+    def _load_state(self, state: dict) -> None:
+        for name, value in state.items():
+            setattr(self, name, copy.deepcopy(value))
+
+    def release_snapshots(self, snapshots: list[EnvSnapshot]) -> None:
+        """Free the server memory held by states that will not be restored"""
+        self._run_async(
+            self.client.release_snapshots([s.snapshot_id for s in snapshots])
+        )
+
+    def _submit_reset(self, seed: int) -> None:
+        if self._pending_reset is not None:
+            raise RuntimeError("a reset is already pending, call reset first")
+        self._episode.restart(seed)
+        self._pending_reset = self.loop.create_task(self.client.reset(seed))
 
     def close(self):
         """Close the environment and the client connection"""
+        self._cancel_pending()
         self._run_async(self.client.close())
-        self.loop.close()
+        if self._owns_loop:
+            self.loop.close()
+            self._loop = None
@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from environment.abstract_env import AbstractEnv, EnvSnapshot
+from rl.client_pool import RLClientPool
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+_thread_loops = threading.local()
+
+
+def thread_loop() -> asyncio.AbstractEventLoop:
+    """The event loop shared by the synchronous environments of this thread
+
+    Assigning it to `env.loop` lets several environments of a thread share
+    one loop, e.g. to share an `RLClientPool`; environments in other threads
+    get their own.
+
+    Returns
+    -------
+    asyncio.AbstractEventLoop
+        The loop of the calling thread, created on first use.
+    """
+    loop = getattr(_thread_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _thread_loops.loop = asyncio.new_event_loop()
+    return loop
+
+
+class AsyncEnv:
+    """
+    Awaitable API of an environment, run on the caller's event loop.
+
+    It drives the client of an `AbstractEnv`, reusing its observation
+    encoding and episode state, without the event loop of its synchronous
+    API: any number of them can share one loop, e.g. stepped together with
+    `asyncio.gather`, and nothing is installed as the thread's loop. An
+    environment must be used either through its `AsyncEnv` or synchronously,
+    from the loop it was connected on. Unlike the synchronous API, its calls
+    do not fail over to another simulator, see `AbstractEnv.reconnect`.
+
+    Parameters
+    ----------
+    env : AbstractEnv
+        The environment, not connected yet.
+
+    Attributes
+    ----------
+    env : AbstractEnv
+        The wrapped environment, for its spaces and episode state.
+    """
+
+    def __init__(self, env: AbstractEnv) -> None:
+        self.env = env
+
+    @property
+    def client(self):
+        return self.env.client
+
+    @property
+    def observation_space(self):
+        return self.env.observation_space
+
+    @property
+    def action_space(self):
+        return self.env.action_space
+
+    async def connect(self) -> None:
+        """Connect the client to the server
+
+        Unlike `AbstractEnv.connect_to_client`, failures are raised.
+        """
+        await self.env.client.connect()
+
+    async def connect_to_pool(self, pool: RLClientPool) -> None:
+        """Connect through a client pool, see `AbstractEnv.connect_to_pool`
+
+        The pool must only be used from the loop running this call.
+        """
+        if not pool.alive_endpoints:
+            await pool.connect()
+        self.env.client = await pool.acquire()
+        logger.info(
+            f"✓ Connected to {self.env.client.server_address} [instance {self.env.client.instance}]"
+        )
+
+    async def init(self, yaml_config: str):
+        """Initialize the environment, see `AbstractEnv.init`"""
+        return await self.env.client.init(yaml_config, **self.env._init_arguments())
+
+    async def init_reset(self, yaml_config: str, seed: int = 42) -> tuple[dict, dict]:
+        """Switch to a configuration and reset, see `AbstractEnv.init_reset`"""
+        observations, infos = await self.env.client.init_reset(
+            yaml_config, seed, **self.env._init_arguments()
+        )
+        return self.env._reset_result(observations, infos)
+
+    async def reset(self, seed: int = 42) -> tuple[dict, dict]:
+        """Reset the environment to an initial state
+
+        Parameters
+        ----------
+        seed : int
+            The seed for random number generation.
+
+        Returns
+        -------
+        tuple[dict, dict]
+            The encoded observations and the infos.
+        """
+        observations, infos = await self.env.client.reset(seed)
+        return self.env._reset_result(observations, infos)
+
+    async def step(self, actions: dict) -> tuple[dict, dict, dict, dict, dict]:
+        """Take a step in the environment with the given actions
+
+        Parameters
+        ----------
+        actions : dict
+            A dictionary mapping agent IDs to their respective actions.
+
+        Returns
+        -------
+        tuple[dict, dict, dict, dict, dict]
+            A tuple containing observations, rewards, terminateds, truncateds, and infos.
+        """
+        env = self.env
+        stats = env.step_stats
+        start = time.perf_counter()
+        decoded = env._decode_actions(actions)
+        submitted = time.perf_counter()
+        stats.submit_s += submitted - start
+        step = await env.client.step(decoded, repeat=env.action_repeat)
+        waited = time.perf_counter()
+        stats.wait_s += waited - submitted
+        result = env._step_result(*step)
+        stats.encode_s += time.perf_counter() - waited
+        stats.steps += 1
+        return result
+
+    async def render(
+        self, width: int = 800, height: int = 600, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Render the current state of the environment, see `AbstractEnv.render`"""
+        return await self.env.client.render(width, height, out=out)
+
+    async def snapshot(self) -> EnvSnapshot:
+        """Save the current state of the environment, see `AbstractEnv.snapshot`"""
+        snapshot_id = await self.env.client.snapshot()
+        return EnvSnapshot(snapshot_id, self.env._saved_state())
+
+    async def restore(self, snapshot: EnvSnapshot) -> tuple[dict, dict]:
+        """Go back to a saved state, see `AbstractEnv.restore`"""
+        observations, infos = await self.env.client.restore(snapshot.snapshot_id)
+        self.env._load_state(snapshot.state)
+        return self.env._restore_result(observations, infos)
+
+    async def release_snapshots(self, snapshots: list[EnvSnapshot]) -> None:
+        """Free the server memory held by states that will not be restored"""
+        await self.env.client.release_snapshots([s.snapshot_id for s in snapshots])
+
+    async def close(self) -> None:
+        """Close the client connection"""
+        await self.env.client.close()
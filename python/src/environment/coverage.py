@@ -0,0 +1,81 @@
+import numpy as np
+
+
+class Coverage:
+    """
+    The cells of a grid visited by every agent and by all of them together.
+
+    Each agent has its own bitmap and the team a global one, with running
+    counts updated when a cell is entered for the first time, so the explored
+    ratios are read in constant time whatever the grid size.
+
+    Parameters
+    ----------
+    shape : tuple[int, int]
+        The shape of the grid.
+
+    Attributes
+    ----------
+    visited : np.ndarray
+        Boolean array of the cells visited by any agent.
+    count : int
+        The number of cells visited by any agent.
+    agent_visited : dict[str, np.ndarray]
+        Boolean array of the cells visited by each agent.
+    agent_counts : dict[str, int]
+        The number of cells visited by each agent.
+    """
+
+    def __init__(self, shape: tuple[int, int]) -> None:
+        self.shape = tuple(shape)
+        self.total_cells = self.shape[0] * self.shape[1]
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget every visited cell, e.g. at the start of an episode."""
+        self.visited = np.zeros(self.shape, dtype=bool)
+        self.count = 0
+        self.agent_visited: dict[str, np.ndarray] = {}
+        self.agent_counts: dict[str, int] = {}
+
+    def visit(self, agent_id: str, x: int, y: int) -> bool:
+        """Mark the cell (x, y) as visited by an agent.
+
+        Returns
+        -------
+        bool
+            Whether no agent had visited the cell before.
+        """
+        grid = self.agent_visited.get(agent_id)
+        if grid is None:
+            grid = self.agent_visited[agent_id] = np.zeros(self.shape, dtype=bool)
+            self.agent_counts[agent_id] = 0
+        if not grid[x, y]:
+            grid[x, y] = True
+            self.agent_counts[agent_id] += 1
+        if self.visited[x, y]:
+            return False
+        self.visited[x, y] = True
+        self.count += 1
+        return True
+
+    @property
+    def explored_ratio(self) -> float:
+        """The fraction of the grid visited by any agent."""
+        return self.count / self.total_cells
+
+    def agent_explored_ratio(self, agent_id: str) -> float:
+        """The fraction of the grid visited by an agent."""
+        return self.agent_counts.get(agent_id, 0) / self.total_cells
+
+    def infos(self, agent_ids) -> dict[str, dict[str, float]]:
+        """The `explored_ratio` of the team and `agent_explored_ratio` of
+        each agent, as step infos."""
+        explored_ratio = self.explored_ratio
+        return {
+            agent_id: {
+                "explored_ratio": explored_ratio,
+                "agent_explored_ratio": self.agent_explored_ratio(agent_id),
+            }
+            for agent_id in agent_ids
+        }
@@ -3,11 +3,18 @@ import numpy as np
 import rl_pb2
 
 from environment.abstract_env import AbstractEnv
+from environment.coverage import Coverage
+from rl.observation_batch import PackedObservations
 
 
 class ExplorationEnv(AbstractEnv):
     """Custom environment for Deep Q-Learning Exploration via gRPC"""
 
+    _snapshot_attributes = ("coverage",)
+    _batch_encoding = True
+    _observation_fields = ("proximity", "position", "orientation", "visited")
+    _visited_delta = True
+
     def __init__(
         self,
         server_address,
@@ -35,38 +42,12 @@ class ExplorationEnv(AbstractEnv):
             low=0.0, high=1.0, shape=(35,), dtype=np.float32
         )
 
-        self.visited_virtual = np.zeros(
-            (virtual_grid_size, virtual_grid_size), dtype=bool
-        )
-
-    def _update_virtual_visited(self, position):
-        """Update the virtual visited grid based on the agent's position"""
-        x_real = position.x
-        y_real = position.y
-
-        i = int(
-            np.clip(
-                x_real / self.grid_size[0] * self.virtual_grid_size,
-                0,
-                self.virtual_grid_size - 1,
-            )
-        )
-        j = int(
-            np.clip(
-                y_real / self.grid_size[1] * self.virtual_grid_size,
-                0,
-                self.virtual_grid_size - 1,
-            )
-        )
-
-        self.visited_virtual[i, j] = True
+        self.coverage = Coverage((virtual_grid_size, virtual_grid_size))
 
     def _encode_observation(
         self, proximity_values, light_values, position, orientation, visited_positions
     ):
-        """Encode observation and update visited virtual grid"""
-        self._update_virtual_visited(position)
-
+        """Encode observation"""
         orientation_sin = np.sin(np.radians(orientation))
         orientation_cos = np.cos(np.radians(orientation))
 
@@ -75,33 +56,61 @@ class ExplorationEnv(AbstractEnv):
             dtype=np.float32,
         )
 
+    def _encode_observation_batch(self, batch):
+        """Encode all agents at once"""
+        radians = np.radians(batch.orientation)
+        return np.concatenate(
+            [
+                np.sin(radians)[:, np.newaxis],
+                np.cos(radians)[:, np.newaxis],
+                batch.visited,
+                batch.proximity,
+            ],
+            axis=1,
+            dtype=np.float32,
+        )
+
     def _decode_action(self, action) -> rl_pb2.ContinuousAction:
         """Decode discrete action to continuous action"""
         left, right = self.actions[action]
         return rl_pb2.ContinuousAction(left_wheel=left, right_wheel=right)
 
-    def reset(self, seed: int = 42):
-        """Reset environment and virtual visited grid"""
-        self.visited_virtual = np.zeros(
-            (self.virtual_grid_size, self.virtual_grid_size), dtype=bool
+    def _visit(self, observations) -> None:
+        """Mark the virtual grid cells of the agents as covered"""
+        if isinstance(observations, PackedObservations):
+            agent_ids, positions = observations.agent_ids, observations.position
+        else:
+            agent_ids = list(observations)
+            positions = np.array(
+                [(o.position.x, o.position.y) for o in observations.values()],
+                dtype=np.float64,
+            ).reshape(-1, 2)
+        cells = np.clip(
+            positions / np.asarray(self.grid_size) * self.virtual_grid_size,
+            0,
+            self.virtual_grid_size - 1,
+        ).astype(int)
+        for agent_id, (i, j) in zip(agent_ids, cells.tolist(), strict=True):
+            self.coverage.visit(agent_id, i, j)
+
+    def _reset_result(self, observations, infos):
+        """Reset the virtual grid coverage with the observations of a reset"""
+        self.coverage.clear()
+        self._visit(observations)
+        observations, infos = super()._reset_result(observations, infos)
+        return observations, self.coverage.infos(observations.keys())
+
+    def _restore_result(self, observations, infos):
+        """Go back to a saved state, together with its virtual grid coverage"""
+        self._visit(observations)
+        observations, _infos = super()._restore_result(observations, infos)
+        return observations, self.coverage.infos(observations.keys())
+
+    def _step_result(self, observations, rewards, terminateds, truncateds, infos):
+        """Collect an environment step and update the virtual grid coverage"""
+        self._visit(observations)
+        observations, rewards, terminateds, truncateds, infos = super()._step_result(
+            observations, rewards, terminateds, truncateds, infos
         )
-        observations, infos = super().reset(seed)
-
-        explored_ratio = np.sum(self.visited_virtual) / (self.virtual_grid_size**2)
-        new_infos = {
-            agent_id: {"explored_ratio": explored_ratio}
-            for agent_id in observations.keys()
-        }
-
-        return observations, new_infos
-
-    def step(self, actions: dict):
-        """Perform environment step and update virtual visited grid"""
-        observations, rewards, terminateds, truncateds, infos = super().step(actions)
-        explored_ratio = np.sum(self.visited_virtual) / (self.virtual_grid_size**2)
-        new_infos = {
-            agent_id: {"explored_ratio": explored_ratio}
-            for agent_id in observations.keys()
-        }
-
+        new_infos = self.coverage.infos(observations.keys())
         return observations, rewards, terminateds, truncateds, new_infos
@@ -11,6 +11,9 @@ logger = Logger(__name__)
 class ObstacleAvoidanceEnv(AbstractEnv):
     """Custom environment for deep q learning obstacle avoidance via gRPC"""
 
+    _batch_encoding = True
+    _observation_fields = ("proximity",)
+
     def __init__(self, server_address, client_name) -> None:
         super().__init__(server_address, client_name)
 
@@ -33,6 +36,9 @@ class ObstacleAvoidanceEnv(AbstractEnv):
     ):
         return np.array(proximity_values, dtype=np.float32)
 
+    def _encode_observation_batch(self, batch):
+        return batch.proximity.copy()
+
     def _decode_action(self, action):
         left, right = self.actions[action]
         return rl_pb2.ContinuousAction(left_wheel=left, right_wheel=right)
@@ -11,6 +11,9 @@ logger = Logger(__name__)
 class PhototaxisEnv(AbstractEnv):
     """Custom environment for deep q learning phototaxis via gRPC"""
 
+    _batch_encoding = True
+    _observation_fields = ("proximity", "light")
+
     def __init__(self, server_address, client_name) -> None:
         super().__init__(server_address, client_name)
 
@@ -51,6 +54,9 @@ class PhototaxisEnv(AbstractEnv):
 
         return np.concatenate([prox, light])
 
+    def _encode_observation_batch(self, batch):
+        return np.concatenate([batch.proximity, batch.light], axis=1)
+
     def _decode_action(self, action):
         left, right = self.actions[action]
         return rl_pb2.ContinuousAction(left_wheel=left, right_wheel=right)
@@ -111,7 +111,9 @@ class Env:
             infos,
         )
 
-    async def render(self, width: int = 800, height: int = 600) -> "np.ndarray":
+    async def render(
+        self, width: int = 800, height: int = 600, out: "np.ndarray | None" = None
+    ) -> "np.ndarray":
         """Render the current state of the environment
 
         Parameters
@@ -120,13 +122,18 @@ class Env:
             The width of the rendered image.
         height : int
             The height of the rendered image.
+        out : np.ndarray | None, optional (default=None)
+            A uint8 array of shape (height, width, 3) the frame is written to.
+            Without it every call returns a new array, copied out of the
+            response; pass the previous frame to reuse its buffer, unless the
+            frames are kept, e.g. for a video.
 
         Returns
         -------
         np.ndarray
-            A numpy array representing the rendered RGB image.
+            A numpy array representing the rendered RGB image, `out` if given.
         """
-        return await self.client.render(width, height)
+        return await self.client.render(width, height, out=out)
 
     async def close(self):
         """Close the environment and the client connection"""
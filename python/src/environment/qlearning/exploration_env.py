@@ -3,6 +3,8 @@ import numpy as np
 
 import rl_pb2
 from environment.abstract_env import AbstractEnv
+from environment.coverage import Coverage
+from rl.observation_batch import ObservationDecoder
 from utils.log import Logger
 
 logger = Logger(__name__)
@@ -11,6 +13,10 @@ logger = Logger(__name__)
 class ExplorationEnv(AbstractEnv):
     """Custom environment for Q-Learning Exploration via gRPC"""
 
+    _snapshot_attributes = ("coverage",)
+    _batch_encoding = True
+    _observation_fields = ("position", "orientation")
+
     def __init__(
         self,
         server_address,
@@ -19,6 +25,7 @@ class ExplorationEnv(AbstractEnv):
         orientation_bins: int = 8,
     ) -> None:
         super().__init__(server_address, client_name)
+        self.observation_decoder = ObservationDecoder(dtype=np.float64)
 
         self.actions = [
             (1.0, 1.0),  # move forward
@@ -36,8 +43,7 @@ class ExplorationEnv(AbstractEnv):
         )
         self.observation_space = spaces.Discrete(self.observation_space_n)
         logger.info(self.observation_space)
-        self.visited = None
-        self.total_cells = grid_size[0] * grid_size[1]
+        self.coverage = Coverage(grid_size)
 
     def _encode_observation(
         self, proximity_values, light_values, position, orientation, visited_positions
@@ -54,6 +60,18 @@ class ExplorationEnv(AbstractEnv):
         state += orientation_idx * self.grid_size[0] * self.grid_size[1]
         return state
 
+    def _encode_observation_batch(self, batch) -> list[int]:
+        """Encode the positions and orientations of all agents at once."""
+        orientation_step = 360.0 / self.orientation_bins
+        orientation_idx = ((batch.orientation % 360) / orientation_step).astype(int)
+
+        x = np.clip(batch.position[:, 0], 0, self.grid_size[0] - 1).astype(int)
+        y = np.clip(batch.position[:, 1], 0, self.grid_size[1] - 1).astype(int)
+
+        state = x + y * self.grid_size[0]
+        state += orientation_idx * self.grid_size[0] * self.grid_size[1]
+        return state.tolist()
+
     def _decode_action(self, action) -> rl_pb2.ContinuousAction:
         """Decode the discrete action into continuous wheel speeds."""
         left, right = self.actions[action]
@@ -65,29 +83,27 @@ class ExplorationEnv(AbstractEnv):
         y = (state // self.grid_size[0]) % self.grid_size[1]
         return x, y
 
-    def reset(self, seed: int = 42):
-        """Reset the environment and visited grid."""
-        observations, infos = super().reset(seed)
-        self.visited = np.zeros(self.grid_size, dtype=bool)
-        for _agent_id, obs in observations.items():
-            x, y = self._decode_position(obs)
-            self.visited[x, y] = True
-        explored_ratio = self.visited.sum() / self.total_cells
-        new_infos = {
-            agent_id: {"explored_ratio": explored_ratio}
-            for agent_id in observations.keys()
-        }
-        return observations, new_infos
-
-    def step(self, actions: dict):
-        """Take a step in the environment and update visited grid."""
-        observations, rewards, terminateds, truncateds, infos = super().step(actions)
-        for _agent_id, obs in observations.items():
-            x, y = self._decode_position(obs)
-            self.visited[x, y] = True
-        explored_ratio = self.visited.sum() / self.total_cells
-        new_infos = {
-            agent_id: {"explored_ratio": explored_ratio}
-            for agent_id in observations.keys()
-        }
+    def _visit(self, observations) -> None:
+        for agent_id, obs in observations.items():
+            self.coverage.visit(agent_id, *self._decode_position(obs))
+
+    def _reset_result(self, observations, infos):
+        """Reset the coverage with the observations of a reset."""
+        observations, infos = super()._reset_result(observations, infos)
+        self.coverage.clear()
+        self._visit(observations)
+        return observations, self.coverage.infos(observations.keys())
+
+    def _restore_result(self, observations, infos):
+        """Go back to a saved state, together with its coverage."""
+        observations, _infos = super()._restore_result(observations, infos)
+        return observations, self.coverage.infos(observations.keys())
+
+    def _step_result(self, observations, rewards, terminateds, truncateds, infos):
+        """Update the coverage with the observations of a step."""
+        observations, rewards, terminateds, truncateds, infos = super()._step_result(
+            observations, rewards, terminateds, truncateds, infos
+        )
+        self._visit(observations)
+        new_infos = self.coverage.infos(observations.keys())
         return observations, rewards, terminateds, truncateds, new_infos
@@ -1,7 +1,9 @@
 import gymnasium.spaces as spaces
+import numpy as np
 
 import rl_pb2
 from environment.abstract_env import AbstractEnv
+from rl.observation_batch import ObservationDecoder
 from utils.log import Logger
 
 logger = Logger(__name__)
@@ -10,6 +12,10 @@ logger = Logger(__name__)
 class ObstacleAvoidanceEnv(AbstractEnv):
     """Custom environment class for RL interaction via gRPC"""
 
+    _batch_encoding = True
+    _observation_fields = ("proximity",)
+    _proximity_indices = (0, 1, 7)
+
     def __init__(self, server_address, client_name) -> None:
         super().__init__(server_address, client_name)
         self._bin_values = 4
@@ -26,6 +32,10 @@ class ObstacleAvoidanceEnv(AbstractEnv):
             (0.0, 1.0),  # soft left
         ]
         self.action_space = spaces.Discrete(len(self.actions))
+        self._sensor_idx = [0, 1, 7]
+        self._bin_thresholds = [0.1, 0.3, 0.6]
+        self._bin_weights = self._bin_values ** np.arange(self._bin_num)
+        self.observation_decoder = ObservationDecoder(dtype=np.float64)
 
     def _encode_observation(
         self, proximity_values, light_values, position, orientation, visited_pos
@@ -52,6 +62,24 @@ class ObstacleAvoidanceEnv(AbstractEnv):
             state += b * (self._bin_values**i)
         return state
 
+    def encoder_spec(self):
+        """The binned sensors as an `EncoderSpec`, the last sensor first."""
+        return rl_pb2.EncoderSpec(
+            terms=[
+                rl_pb2.EncoderTerm(
+                    source=rl_pb2.EncoderTerm.PROXIMITY,
+                    indices=[i],
+                    reduce=rl_pb2.EncoderTerm.MIN,
+                    thresholds=self._bin_thresholds,
+                )
+                for i in reversed(self._sensor_idx)
+            ]
+        )
+
+    def _encode_observation_batch(self, batch):
+        bins = np.digitize(batch.proximity[:, self._sensor_idx], self._bin_thresholds)
+        return (bins @ self._bin_weights).tolist()
+
     def _decode_action(self, action):
         left, right = self.actions[action]
         return rl_pb2.ContinuousAction(left_wheel=left, right_wheel=right)
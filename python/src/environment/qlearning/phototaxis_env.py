@@ -1,6 +1,9 @@
 import gymnasium.spaces as spaces
+import numpy as np
+
 import rl_pb2
 from environment.abstract_env import AbstractEnv
+from rl.observation_batch import ObservationDecoder
 from collections.abc import Callable
 from utils.log import Logger
 
@@ -9,6 +12,8 @@ logger = Logger(__name__)
 
 class PhototaxisEnv(AbstractEnv):
     _CARDINAL_IDX = [0, 2, 4, 6]
+    _batch_encoding = True
+    _observation_fields = ("proximity", "light")
 
     def __init__(
         self,
@@ -105,6 +110,12 @@ class PhototaxisEnv(AbstractEnv):
         self._encode_fn = self._master_encoder
         self.observation_space = spaces.Discrete(n_states)
         self.observation_space_n = n_states
+        # float64 columns, so binning gives the same states as the doubles
+        self.observation_decoder = ObservationDecoder(
+            num_proximity=self.num_prox_sensors,
+            num_light=self.num_light_sensors,
+            dtype=np.float64,
+        )
 
         logger.info(
             f"[PhototaxisEnv] Light: {self.light_direction}"
@@ -200,6 +211,90 @@ class PhototaxisEnv(AbstractEnv):
         total_prox_states = self.prox_dir_states * self.prox_intensity_bins
         return light_part * total_prox_states + prox_part
 
+    # Batch encoding
+    def _encode_observation_batch(self, batch) -> list[int]:
+        """The `_master_encoder` states of every row, as a mixed-radix number
+        of the light direction and intensity and proximity direction and
+        intensity digits."""
+        light, prox = batch.light, batch.proximity
+        state = self._batch_light_direction(light)
+        if self.light_intensity_bins > 1:
+            state = state * self.light_intensity_bins + np.searchsorted(
+                self.light_intensity_thresholds, light.max(axis=1), side="right"
+            )
+        state = state * self.prox_dir_states + self._batch_prox_direction(prox)
+        if self.prox_intensity_bins > 1:
+            worst = (
+                prox[:, [0, 1, 7]] if self.prox_direction == "front_min" else prox
+            ).min(axis=1)
+            state = state * self.prox_intensity_bins + np.searchsorted(
+                self.prox_thresholds, worst, side="right"
+            )
+        return state.tolist()
+
+    def _batch_light_direction(self, light: np.ndarray) -> np.ndarray:
+        if self.light_direction == "none":
+            return np.zeros(len(light), dtype=np.int64)
+        columns = (
+            light[:, self._CARDINAL_IDX]
+            if self.light_direction == "light4"
+            else light[:, :8]
+        )
+        direction = columns.argmax(axis=1)
+        if self.light_has_no_light_state:
+            no_light = light.max(axis=1) < self.no_light_threshold
+            direction[no_light] = self.light_dir_states - 1
+        return direction
+
+    def _batch_prox_direction(self, prox: np.ndarray) -> np.ndarray:
+        if self.prox_dir_states == 1:
+            return np.zeros(len(prox), dtype=np.int64)
+        columns = (
+            prox[:, self._CARDINAL_IDX]
+            if self.prox_direction.startswith("prox4")
+            else prox[:, :8]
+        )
+        if self.prox_direction.endswith("threat"):
+            return columns.argmin(axis=1)
+        return columns.argmax(axis=1)
+
+    # Server-side encoding
+    def encoder_spec(self) -> rl_pb2.EncoderSpec:
+        """The `_master_encoder` states as an `EncoderSpec`, one term per digit."""
+        term = rl_pb2.EncoderTerm
+        light, prox = term.LIGHT, term.PROXIMITY
+        spec = rl_pb2.EncoderSpec()
+        if self.light_direction != "none":
+            indices = (
+                self._CARDINAL_IDX if self.light_direction == "light4" else range(8)
+            )
+            t = spec.terms.add(source=light, indices=indices, reduce=term.ARGMAX)
+            if self.light_has_no_light_state:
+                t.none_below = self.no_light_threshold
+        if self.light_intensity_bins > 1:
+            spec.terms.add(
+                source=light,
+                reduce=term.MAX,
+                thresholds=self.light_intensity_thresholds,
+            )
+        if self.prox_direction not in ("none", "front_min"):
+            four = self.prox_direction.startswith("prox4")
+            spec.terms.add(
+                source=prox,
+                indices=self._CARDINAL_IDX if four else range(8),
+                reduce=term.ARGMIN
+                if self.prox_direction.endswith("threat")
+                else term.ARGMAX,
+            )
+        if self.prox_intensity_bins > 1:
+            spec.terms.add(
+                source=prox,
+                indices=[0, 1, 7] if self.prox_direction == "front_min" else [],
+                reduce=term.MIN,
+                thresholds=self.prox_thresholds,
+            )
+        return spec
+
     # light dir encoder builder
     def _build_light_dir_encoder(self) -> (Callable[[list[float]], int], int):
         """Return (encoder_fn, n_states) for a light direction."""
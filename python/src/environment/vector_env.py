@@ -0,0 +1,454 @@
+import asyncio
+import time
+from collections.abc import Callable, Sequence
+
+import numpy as np
+
+from environment.abstract_env import AbstractEnv, EpisodeLog
+from rl.client_pool import RLClientPool
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+
+async def _gather(*aws):
+    """`asyncio.gather` awaited on the running loop, not the thread's one"""
+    return await asyncio.gather(*aws)
+
+
+class VectorEnv:
+    """
+    Vectorized environment stepping several `AbstractEnv` instances concurrently.
+
+    Each sub-environment drives its own simulation, on its own server or
+    simulation instance, while all their clients share a single event loop: the
+    requests of every sub-environment are in flight at once and collected
+    together. The Scala server hosts a single instance, so with it every
+    sub-environment needs a server of its own. A sub-environment is reset as soon as all its agents are
+    terminated or truncated (same-step autoreset), so the observations returned
+    for it are the first ones of the new episode, while the last ones of the
+    finished episode are reported in `infos["final_obs"]`.
+
+    Batches follow the gymnasium vector API, with one entry per agent:
+    observations, rewards, terminations, truncations and infos are dictionaries
+    mapping each agent ID to an array whose first dimension is the
+    sub-environment index. Actions are given in the same layout.
+
+    Besides the synchronous `step`, which waits for the slowest simulation,
+    the asynchronous mode (`async_reset`, `send` and `recv`) hands back the
+    sub-environments that are ready, as soon as `batch_size` of them are or a
+    deadline expires, while the stragglers keep running. In this mode a
+    finished sub-environment is reset right away, and the first observations
+    of its new episode are what the next `recv` returns for it after the
+    caller `send`s it an action, which is ignored (next-step autoreset).
+
+    Parameters
+    ----------
+    env_fns : Sequence[Callable[[], AbstractEnv]]
+        Factories of the sub-environments, not connected yet. Their
+        configurations must all have the same agent IDs.
+    max_episode_steps : int | None, optional (default=None)
+        Steps after which an episode is truncated, None to end episodes only
+        when the simulation does.
+
+    Attributes
+    ----------
+    envs : list[AbstractEnv]
+        The sub-environments, sharing `loop`.
+    num_envs : int
+        The number of sub-environments.
+    loop : asyncio.AbstractEventLoop
+        The event loop running the requests of all the sub-environments.
+    agent_ids : list[str]
+        The agent IDs of the batches, known after the first reset.
+    single_observation_space : gymnasium.Space
+        The observation space of one agent of a sub-environment.
+    single_action_space : gymnasium.Space
+        The action space of one agent of a sub-environment.
+    """
+
+    def __init__(
+        self,
+        env_fns: Sequence[Callable[[], AbstractEnv]],
+        max_episode_steps: int | None = None,
+    ) -> None:
+        self.envs = [env_fn() for env_fn in env_fns]
+        self.num_envs = len(self.envs)
+        self.max_episode_steps = max_episode_steps
+        self.loop = asyncio.new_event_loop()
+        for env in self.envs:
+            env.loop = self.loop
+        self.single_observation_space = self.envs[0].observation_space
+        self.single_action_space = self.envs[0].action_space
+        self.agent_ids: list[str] = []
+        self._seeds = [0] * self.num_envs
+        self._episode_steps = np.zeros(self.num_envs, dtype=np.int64)
+        self._last_obs: list[dict] = [{} for _ in self.envs]
+        self._stepping = False
+        self._inflight: dict[int, str] = {}
+        self._prefetched: set[int] = set()
+
+    def _run_async(self, coro):
+        """Helper method to run async coroutines synchronously"""
+        return self.loop.run_until_complete(coro)
+
+    def connect(self):
+        """Connect the clients of all the sub-environments concurrently"""
+        self._run_async(_gather(*(env.client.connect() for env in self.envs)))
+
+    def connect_to_pool(self, pool: RLClientPool):
+        """Connect every sub-environment through a client pool
+
+        Parameters
+        ----------
+        pool : RLClientPool
+            The pool to take the clients from, with a free simulation instance
+            for each sub-environment.
+        """
+        for env in self.envs:
+            env.connect_to_pool(pool)
+
+    def init(self, yaml_config: str | Sequence[str]):
+        """Initialize the sub-environments concurrently
+
+        Every sub-environment sends its observation mask and encoder, as
+        `AbstractEnv.init` does, and starts the episode log its resets and
+        steps are recorded to.
+
+        Parameters
+        ----------
+        yaml_config : str | Sequence[str]
+            The YAML configuration of all the sub-environments, or one per
+            sub-environment.
+        """
+        if isinstance(yaml_config, str):
+            yaml_config = [yaml_config] * self.num_envs
+        inits = []
+        for env, config in zip(self.envs, yaml_config, strict=True):
+            env._episode = EpisodeLog(config)
+            inits.append(env.client.init(config, **env._init_arguments()))
+        self._run_async(_gather(*inits))
+        self.agent_ids = []
+
+    def _submit_resets(self, indices: list[int]) -> None:
+        for i in indices:
+            self.envs[i]._submit_reset(self._seeds[i])
+
+    def _collect_resets(self, indices: list[int]) -> dict[int, tuple[dict, dict]]:
+        self._run_async(asyncio.wait([self.envs[i]._pending_reset for i in indices]))
+        results = {}
+        for i in indices:
+            results[i] = self.envs[i].reset(self._seeds[i])
+            self._last_obs[i] = dict(results[i][0])
+            self._episode_steps[i] = 0
+        return results
+
+    def reset(self, seed: int = 42) -> tuple[dict, dict]:
+        """Reset all the sub-environments concurrently
+
+        Parameters
+        ----------
+        seed : int
+            The seed of the first sub-environment, the i-th one is reset with
+            `seed + i`. Later automatic resets keep deriving distinct seeds.
+
+        Returns
+        -------
+        tuple[dict, dict]
+            The batched observations and infos.
+        """
+        if self._stepping or self._inflight:
+            raise RuntimeError("a step is pending, call step_wait or recv first")
+        self._drop_prefetched()
+        self._seeds = [seed + i for i in range(self.num_envs)]
+        indices = list(range(self.num_envs))
+        self._submit_resets(indices)
+        results = self._collect_resets(indices)
+        self.agent_ids = list(
+            dict.fromkeys(agent_id for obs, _ in results.values() for agent_id in obs)
+        )
+        infos = [results[i][1] for i in range(self.num_envs)]
+        return self._stack_observations(), self._stack_infos(infos)
+
+    def step_async(self, actions: dict) -> None:
+        """Send the step requests of every sub-environment without waiting
+
+        Parameters
+        ----------
+        actions : dict
+            A dictionary mapping agent IDs to arrays with one action per
+            sub-environment.
+        """
+        if self._stepping or self._inflight:
+            raise RuntimeError("a step is already pending, call step_wait first")
+        for i, env in enumerate(self.envs):
+            env._submit_step({agent_id: a[i] for agent_id, a in actions.items()})
+        # let the calls start, so the requests are sent before returning
+        self._run_async(asyncio.sleep(0))
+        self._stepping = True
+
+    def step_wait(self) -> tuple[dict, dict, dict, dict, dict]:
+        """Wait for the pending steps and auto-reset the finished sub-environments
+
+        Returns
+        -------
+        tuple[dict, dict, dict, dict, dict]
+            The batched observations, rewards, terminations, truncations and
+            infos.
+        """
+        if not self._stepping:
+            raise RuntimeError("step_wait called without a pending step")
+        self._stepping = False
+        self._run_async(asyncio.wait([env._pending_step for env in self.envs]))
+        self._episode_steps += 1
+        finished = [
+            i
+            for i, env in enumerate(self.envs)
+            if self._episode_done(i, env._pending_step)
+        ]
+        results = [self._collect_step(i) for i in range(self.num_envs)]
+        # resets restart the episode logs, so they are sent once the last
+        # steps of the finished episodes are logged
+        for i in finished:
+            self._seeds[i] += self.num_envs
+        self._submit_resets(finished)
+
+        infos = [info for *_, info in results]
+        final_obs = np.full(self.num_envs, None, dtype=object)
+        final_info = np.full(self.num_envs, None, dtype=object)
+        if finished:
+            for i in finished:
+                final_obs[i] = self._last_obs[i]
+                final_info[i] = infos[i]
+            for i, (_, reset_infos) in self._collect_resets(finished).items():
+                infos[i] = reset_infos
+
+        batch_infos = self._stack_infos(infos)
+        if finished:
+            mask = np.zeros(self.num_envs, dtype=bool)
+            mask[finished] = True
+            batch_infos.update(
+                final_obs=final_obs,
+                _final_obs=mask,
+                final_info=final_info,
+                _final_info=mask.copy(),
+            )
+        return (
+            self._stack_observations(),
+            self._stack_column(results, 1, 0.0, np.float64),
+            self._stack_column(results, 2, False, bool),
+            self._stack_column(results, 3, False, bool),
+            batch_infos,
+        )
+
+    def step(self, actions: dict) -> tuple[dict, dict, dict, dict, dict]:
+        """Step all the sub-environments concurrently
+
+        Parameters
+        ----------
+        actions : dict
+            A dictionary mapping agent IDs to arrays with one action per
+            sub-environment.
+
+        Returns
+        -------
+        tuple[dict, dict, dict, dict, dict]
+            The batched observations, rewards, terminations, truncations and
+            infos.
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def async_reset(self, seed: int = 42) -> None:
+        """Send the reset requests of every sub-environment, collected by `recv`
+
+        Parameters
+        ----------
+        seed : int
+            The seed of the first sub-environment, the i-th one is reset with
+            `seed + i`.
+        """
+        if self._stepping or self._inflight:
+            raise RuntimeError("requests are pending, collect them first")
+        self._drop_prefetched()
+        self._seeds = [seed + i for i in range(self.num_envs)]
+        self.agent_ids = []
+        indices = list(range(self.num_envs))
+        self._submit_resets(indices)
+        self._inflight = dict.fromkeys(indices, "reset")
+
+    def send(self, actions: dict, env_ids) -> None:
+        """Send the step requests of some sub-environments without waiting
+
+        Parameters
+        ----------
+        actions : dict
+            A dictionary mapping agent IDs to arrays with one action per entry
+            of `env_ids`.
+        env_ids : array_like of int
+            The sub-environments to step, usually the `env_id` of the last
+            `recv`. Those whose episode finished get their reset instead.
+        """
+        if self._stepping:
+            raise RuntimeError("a synchronous step is pending, call step_wait first")
+        for k, i in enumerate(np.asarray(env_ids).tolist()):
+            if i in self._inflight:
+                raise RuntimeError(f"sub-environment {i} already has a pending request")
+            if i in self._prefetched:
+                self._prefetched.discard(i)
+                self._inflight[i] = "reset"
+                continue
+            self.envs[i]._submit_step(
+                {agent_id: a[k] for agent_id, a in actions.items()}
+            )
+            self._inflight[i] = "step"
+        # let the calls start, so the requests are sent before returning
+        self._run_async(asyncio.sleep(0))
+
+    def recv(
+        self, batch_size: int | None = None, timeout: float | None = None
+    ) -> tuple[dict, dict, dict, dict, dict]:
+        """Collect the sub-environments whose pending request has completed
+
+        Waits until `batch_size` of them are ready or, once at least one is,
+        until `timeout` expires, so slow simulations do not hold back the
+        others.
+
+        Parameters
+        ----------
+        batch_size : int | None, optional (default=None)
+            The number of sub-environments to collect at most, None for all
+            the ones with a pending request.
+        timeout : float | None, optional (default=None)
+            Seconds after which the ready sub-environments are returned even
+            if fewer than `batch_size`, None to wait for the whole batch.
+
+        Returns
+        -------
+        tuple[dict, dict, dict, dict, dict]
+            The observations, rewards, terminations, truncations and infos of
+            the collected sub-environments, in the order of `infos["env_id"]`.
+            Reset sub-environments report no reward and no termination.
+        """
+        if not self._inflight:
+            raise RuntimeError("recv called without pending requests")
+        batch_size = min(batch_size or len(self._inflight), len(self._inflight))
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        tasks = {self._pending_task(i): i for i in self._inflight}
+        while True:
+            # read back from the tasks, as more may complete in the loop
+            # iteration that ends the wait than the ones it returns
+            ready = [i for task, i in tasks.items() if task.done()]
+            if len(ready) >= batch_size:
+                break
+            wait_s = None
+            if ready and deadline is not None:
+                wait_s = deadline - time.perf_counter()
+                if wait_s <= 0:
+                    break
+            pending = [task for task in tasks if not task.done()]
+            self._run_async(
+                asyncio.wait(
+                    pending, timeout=wait_s, return_when=asyncio.FIRST_COMPLETED
+                )
+            )
+        ready = ready[:batch_size]
+
+        results = []
+        for i in ready:
+            if self._inflight.pop(i) == "reset":
+                observations, infos = self._collect_resets([i])[i]
+                no_event = dict.fromkeys(observations, False)
+                results.append((observations, {}, no_event, no_event, infos))
+                continue
+            self._episode_steps[i] += 1
+            finished = self._episode_done(i, self.envs[i]._pending_step)
+            # logged before the reset restarts the episode log, see step_wait
+            results.append(self._collect_step(i))
+            if finished:
+                self._seeds[i] += self.num_envs
+                self._submit_resets([i])
+                self._prefetched.add(i)
+        if not self.agent_ids:
+            self.agent_ids = list(
+                dict.fromkeys(agent_id for obs, *_ in results for agent_id in obs)
+            )
+
+        batch_infos = self._stack_infos([info for *_, info in results])
+        batch_infos["env_id"] = np.asarray(ready, dtype=np.int64)
+        return (
+            self._stack_observations(ready),
+            self._stack_column(results, 1, 0.0, np.float64),
+            self._stack_column(results, 2, False, bool),
+            self._stack_column(results, 3, False, bool),
+            batch_infos,
+        )
+
+    def _drop_prefetched(self) -> None:
+        for i in self._prefetched:
+            self.envs[i]._cancel_pending()
+        self._prefetched.clear()
+
+    def _pending_task(self, i: int) -> asyncio.Task:
+        env = self.envs[i]
+        return env._pending_reset if self._inflight[i] == "reset" else env._pending_step
+
+    def _collect_step(self, i: int) -> tuple[dict, dict, dict, dict, dict]:
+        result = self.envs[i].step_wait()
+        self._last_obs[i] = {**self._last_obs[i], **result[0]}
+        if (
+            self.max_episode_steps is not None
+            and self._episode_steps[i] >= self.max_episode_steps
+        ):
+            result[3].update(dict.fromkeys(result[3], True))
+        return result
+
+    def _episode_done(self, i: int, task: asyncio.Task) -> bool:
+        if self.max_episode_steps is not None:
+            if self._episode_steps[i] >= self.max_episode_steps:
+                return True
+        if task.cancelled() or task.exception() is not None:
+            # raised by the sub-environment's step_wait
+            return False
+        _, _, terminateds, truncateds, _ = task.result()
+        return bool(terminateds) and all(
+            terminateds[agent_id] or truncateds.get(agent_id, False)
+            for agent_id in terminateds
+        )
+
+    def _stack_observations(
+        self, indices: list[int] | None = None
+    ) -> dict[str, np.ndarray]:
+        last_obs = (
+            self._last_obs if indices is None else [self._last_obs[i] for i in indices]
+        )
+        return {
+            agent_id: np.stack([obs[agent_id] for obs in last_obs])
+            for agent_id in self.agent_ids
+        }
+
+    def _stack_column(
+        self, results: list[tuple], column: int, default, dtype
+    ) -> dict[str, np.ndarray]:
+        return {
+            agent_id: np.array(
+                [r[column].get(agent_id, default) for r in results], dtype=dtype
+            )
+            for agent_id in self.agent_ids
+        }
+
+    def _stack_infos(self, infos: list[dict]) -> dict[str, np.ndarray]:
+        batch = {}
+        for agent_id in self.agent_ids:
+            column = np.empty(len(infos), dtype=object)
+            column[:] = [info.get(agent_id) for info in infos]
+            batch[agent_id] = column
+        return batch
+
+    def close(self):
+        """Close every sub-environment and the shared event loop"""
+        for env in self.envs:
+            env._cancel_pending()
+        self._run_async(_gather(*(env.client.close() for env in self.envs)))
+        self.loop.close()
+        logger.info(f"✓ Closed {self.num_envs} vectorized environments")
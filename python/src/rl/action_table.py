@@ -0,0 +1,98 @@
+"""
+Pre-built wheel actions of a discrete action set.
+
+The environments pick every action from a small fixed set of wheel speeds, so
+the `ContinuousAction` messages, and the map entries of a `StepRequest` for
+every (agent, action) pair, are built and serialized once. A step then only
+joins bytes, and `RLClient.step` sends them without building a request.
+"""
+
+from collections.abc import Sequence
+
+import rl_pb2
+
+
+class EncodedActions:
+    """
+    The discrete actions of a step, serialized as the `actions` field of a
+    `StepRequest`.
+
+    Parameters
+    ----------
+    indices : dict[str, int]
+        The action index of every agent.
+    table : ActionTable
+        The table the indices refer to.
+    payload : bytes
+        The serialized `actions` map entries.
+    """
+
+    __slots__ = ("indices", "payload", "table")
+
+    def __init__(self, indices: dict, table: "ActionTable", payload: bytes) -> None:
+        self.indices = indices
+        self.table = table
+        self.payload = payload
+
+    @property
+    def messages(self) -> dict[str, rl_pb2.ContinuousAction]:
+        """The actions as messages, for the calls that build their request."""
+        messages = self.table.messages
+        return {agent_id: messages[i] for agent_id, i in self.indices.items()}
+
+
+class ActionTable:
+    """
+    Wheel speeds of the actions of a discrete action set, as messages and
+    serialized `StepRequest` map entries.
+
+    Parameters
+    ----------
+    wheels : Sequence[tuple[float, float]]
+        The (left, right) wheel speeds of every action index.
+
+    Attributes
+    ----------
+    messages : list[rl_pb2.ContinuousAction]
+        The message of every action index, shared by all the steps.
+    """
+
+    def __init__(self, wheels: Sequence[tuple[float, float]]) -> None:
+        self.messages = [
+            rl_pb2.ContinuousAction(left_wheel=float(left), right_wheel=float(right))
+            for left, right in wheels
+        ]
+        # serialized map entry of every (agent id, action index) seen so far
+        self._entries: dict[tuple[str, int], bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def _entry(self, agent_id: str, action: int) -> bytes:
+        entry = rl_pb2.StepRequest(
+            actions={agent_id: self.messages[action]}
+        ).SerializeToString()
+        self._entries[agent_id, action] = entry
+        return entry
+
+    def encode(self, actions: dict) -> EncodedActions:
+        """Serialize the actions of a step.
+
+        Parameters
+        ----------
+        actions : dict
+            The action index of every agent id, Python or NumPy integers.
+
+        Returns
+        -------
+        EncodedActions
+            The actions, with the `actions` field of their `StepRequest`.
+        """
+        entries = self._entries
+        payload = b"".join(
+            [
+                entries.get((agent_id, action)) or self._entry(agent_id, int(action))
+                for agent_id, action in actions.items()
+            ]
+        )
+        return EncodedActions(actions, self, payload)
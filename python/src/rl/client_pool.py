@@ -0,0 +1,220 @@
+import asyncio
+import contextlib
+import time
+
+import grpc
+
+from rl.rl_client import RLClient
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+
+def parse_endpoints(spec: str) -> list[str]:
+    """Expand an endpoint specification into a list of addresses.
+
+    Parameters
+    ----------
+    spec : str
+        Comma separated addresses, where the port can be a range, e.g.
+        "localhost:50051-50066" or "host-a:50051,host-b:50051-50052".
+
+    Returns
+    -------
+    list[str]
+        One `host:port` address per endpoint.
+    """
+    addresses = []
+    for part in spec.split(","):
+        host, ports = part.strip().rsplit(":", 1)
+        first, _, last = ports.partition("-")
+        for port in range(int(first), int(last or first) + 1):
+            addresses.append(f"{host}:{port}")
+    return addresses
+
+
+class Endpoint:
+    """
+    A simulator server shared by the clients of a pool.
+
+    Parameters
+    ----------
+    address : str
+        The address of the gRPC server.
+    capacity : int
+        The number of simulation instances the server can host.
+
+    Attributes
+    ----------
+    channel : grpc.aio.Channel | None
+        The channel shared by every client routed to this endpoint.
+    alive : bool
+        Whether the last health check succeeded.
+    leases : set[int]
+        The simulation instances currently handed out.
+    """
+
+    def __init__(self, address: str, capacity: int) -> None:
+        self.address = address
+        self.capacity = capacity
+        self.channel = None
+        self.alive = False
+        self.leases: set[int] = set()
+
+    @property
+    def load(self) -> int:
+        return len(self.leases)
+
+    def free_instance(self) -> int | None:
+        return next((i for i in range(self.capacity) if i not in self.leases), None)
+
+
+class RLClientPool:
+    """
+    Pool of channels to several simulator servers.
+
+    Clients are routed to the least-loaded live endpoint, each one bound to a
+    free simulation instance of that server and sharing its channel. Endpoints
+    are probed with `channel_ready`: the ones that do not answer are evicted
+    from routing, and brought back when a later health check succeeds. The
+    checks run in the background while the event loop is driven, and before
+    routing a client when the last one is older than `health_interval`, so
+    blocking callers, whose loop only runs during their calls, route on fresh
+    health too. The pool, like the clients it hands out, must be used from a
+    single event loop.
+
+    Parameters
+    ----------
+    addresses : list[str]
+        The addresses of the simulator servers.
+    client_name : str
+        The name given to the clients.
+    instances_per_endpoint : int, optional (default=1)
+        Simulation instances hosted by every server. The Scala server hosts
+        only instance 0 and rejects the others, so keep 1 with it; more only
+        pay off with servers hosting several, like the local stand-in.
+    ready_timeout : float, optional (default=5.0)
+        Seconds a health check waits for an endpoint to become ready.
+    health_interval : float | None, optional (default=10.0)
+        Seconds between health checks, None to disable them.
+    """
+
+    def __init__(
+        self,
+        addresses: list[str],
+        client_name: str,
+        instances_per_endpoint: int = 1,
+        ready_timeout: float = 5.0,
+        health_interval: float | None = 10.0,
+    ) -> None:
+        self.client_name = client_name
+        self.ready_timeout = ready_timeout
+        self.health_interval = health_interval
+        self.endpoints = [Endpoint(a, instances_per_endpoint) for a in addresses]
+        self._leases: dict[RLClient, Endpoint] = {}
+        self._health_task = None
+        self._checked_at: float | None = None
+        # the background and on-demand checks probe one at a time
+        self._health_lock = asyncio.Lock()
+
+    @property
+    def alive_endpoints(self) -> list[Endpoint]:
+        return [e for e in self.endpoints if e.alive]
+
+    async def connect(self) -> None:
+        """Open the channels and run a first health check."""
+        await self.health_check()
+        logger.info(
+            f"✓ Pool connected to {len(self.alive_endpoints)}/{len(self.endpoints)} endpoints"
+        )
+        if self.health_interval is not None and self._health_task is None:
+            self._health_task = asyncio.get_running_loop().create_task(
+                self._health_loop()
+            )
+
+    async def _probe(self, endpoint: Endpoint) -> None:
+        channel = endpoint.channel
+        if channel is None:
+            channel = endpoint.channel = grpc.aio.insecure_channel(endpoint.address)
+        try:
+            await asyncio.wait_for(channel.channel_ready(), timeout=self.ready_timeout)
+        except (asyncio.TimeoutError, grpc.aio.AioRpcError):
+            if endpoint.alive:
+                logger.warning(f"✗ Evicting unresponsive endpoint {endpoint.address}")
+            endpoint.alive = False
+            if endpoint.channel is channel:
+                endpoint.channel = None
+            await channel.close()
+            return
+        if not endpoint.alive:
+            logger.debug(f"✓ Endpoint {endpoint.address} is ready")
+        endpoint.alive = True
+
+    async def health_check(self) -> None:
+        """Probe every endpoint concurrently, evicting the unresponsive ones."""
+        async with self._health_lock:
+            await asyncio.gather(*(self._probe(e) for e in self.endpoints))
+            self._checked_at = time.monotonic()
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.health_check()
+
+    async def acquire(self) -> RLClient:
+        """Hand out a client on the least-loaded live endpoint.
+
+        Returns
+        -------
+        RLClient
+            A connected client bound to a free simulation instance.
+
+        Raises
+        ------
+        RuntimeError
+            If no live endpoint has a free simulation instance.
+        """
+        if self.health_interval is not None and (
+            self._checked_at is None
+            or time.monotonic() - self._checked_at >= self.health_interval
+        ):
+            await self.health_check()
+        candidates = [e for e in self.alive_endpoints if e.load < e.capacity]
+        if not candidates:
+            raise RuntimeError("No live endpoint with a free simulation instance")
+        endpoint = min(candidates, key=lambda e: e.load)
+        instance = endpoint.free_instance()
+        endpoint.leases.add(instance)
+        client = RLClient(
+            endpoint.address, self.client_name, instance, channel=endpoint.channel
+        )
+        self._leases[client] = endpoint
+        logger.debug(f"✓ Routed client to {endpoint.address} [instance {instance}]")
+        return client
+
+    async def release(self, client: RLClient) -> None:
+        """Give a client's simulation instance back to the pool."""
+        endpoint = self._leases.pop(client, None)
+        if endpoint is not None:
+            endpoint.leases.discard(client.instance)
+        await client.close()
+
+    async def report_failure(self, client: RLClient) -> None:
+        """Probe the endpoint of a client whose call failed, evicting it if dead."""
+        endpoint = self._leases.get(client)
+        if endpoint is not None:
+            await self._probe(endpoint)
+
+    async def close(self) -> None:
+        """Stop the health checks and close every channel."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        for endpoint in self.endpoints:
+            if endpoint.channel is not None:
+                await endpoint.channel.close()
+                endpoint.channel = None
+            endpoint.alive = False
+        logger.info("✓ Closed pool connections")
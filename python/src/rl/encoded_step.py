@@ -0,0 +1,39 @@
+import grpc
+
+import rl_pb2
+
+_SERVICE = rl_pb2.DESCRIPTOR.services_by_name["RL"]
+# full method path of the Step call, as the generated stubs address it
+STEP_METHOD = f"/{_SERVICE.full_name}/{_SERVICE.methods_by_name['Step'].name}"
+
+
+class EncodedStepRequest:
+    """A StepRequest already serialized, see `ActionTable`."""
+
+    __slots__ = ("instance", "payload")
+
+    def __init__(self, payload: bytes, instance: int) -> None:
+        self.payload = payload
+        self.instance = instance
+
+    def SerializeToString(self) -> bytes:  # noqa: N802
+        return self.payload
+
+    def ByteSize(self) -> int:  # noqa: N802
+        return len(self.payload)
+
+
+def encoded_step_rpc(channel: grpc.aio.Channel | grpc.Channel):
+    """Step call sending `EncodedStepRequest` payloads as they are."""
+    return channel.unary_unary(
+        STEP_METHOD,
+        request_serializer=EncodedStepRequest.SerializeToString,
+        response_deserializer=rl_pb2.StepResponse.FromString,
+    )
+
+
+def step_template(instance: int, packed: bool, repeat: int) -> bytes:
+    """The fields of a StepRequest but the actions, serialized."""
+    return rl_pb2.StepRequest(
+        instance=instance, packed=packed, repeat=repeat
+    ).SerializeToString()
@@ -0,0 +1,89 @@
+"""
+Reference evaluator of the `EncoderSpec` of `rl.proto`.
+
+The simulator computes the discrete state of every agent from its sensors
+with the spec sent at Init, so the environments do not encode the
+observations themselves. This module gives the same states in Python, for the
+local stand-in server and to check a spec against the encoder it replaces.
+"""
+
+from collections.abc import Sequence
+
+import rl_pb2
+
+Term = rl_pb2.EncoderTerm
+
+# value read for the sensors a robot does not have, as the encoders pad them
+SENSOR_PAD = {Term.PROXIMITY: 1.0, Term.LIGHT: 0.0}
+
+
+def _bin(value: float, thresholds: Sequence[float]) -> int:
+    return sum(threshold <= value for threshold in thresholds)
+
+
+def radix(term: rl_pb2.EncoderTerm, num_sensors: int = 8) -> int:
+    """Number of values of the digit of a term.
+
+    Parameters
+    ----------
+    term : rl_pb2.EncoderTerm
+        The term.
+    num_sensors : int, optional (default=8)
+        Sensors of the source, for the groups without indices.
+    """
+    if term.reduce in (Term.MAX, Term.MIN):
+        return len(term.thresholds) + 1
+    size = len(term.indices) or num_sensors
+    return size + term.HasField("none_below")
+
+
+def num_states(
+    spec: rl_pb2.EncoderSpec, num_proximity: int = 8, num_light: int = 8
+) -> int:
+    """Number of states of a spec, the product of the radices of its terms."""
+    sensors = {Term.PROXIMITY: num_proximity, Term.LIGHT: num_light}
+    n = 1
+    for term in spec.terms:
+        n *= radix(term, sensors[term.source])
+    return n
+
+
+def evaluate(
+    spec: rl_pb2.EncoderSpec, proximity: Sequence[float], light: Sequence[float]
+) -> int:
+    """Discrete state of one agent.
+
+    Parameters
+    ----------
+    spec : rl_pb2.EncoderSpec
+        The spec sent at Init.
+    proximity, light : Sequence[float]
+        The sensor readings of the agent.
+
+    Returns
+    -------
+    int
+        The state, a mixed-radix number with one digit per term.
+    """
+    readings = {Term.PROXIMITY: list(proximity), Term.LIGHT: list(light)}
+    state = 0
+    for term in spec.terms:
+        values = readings[term.source]
+        pad = SENSOR_PAD[term.source]
+        indices = list(term.indices) or range(len(values))
+        group = [values[i] if 0 <= i < len(values) else pad for i in indices]
+        if term.reduce == Term.ARGMAX:
+            if term.HasField("none_below") and max(values, default=pad) < (
+                term.none_below
+            ):
+                digit = len(group)
+            else:
+                digit = group.index(max(group))
+        elif term.reduce == Term.ARGMIN:
+            digit = group.index(min(group))
+        elif term.reduce == Term.MAX:
+            digit = _bin(max(group), term.thresholds)
+        else:
+            digit = _bin(min(group), term.thresholds)
+        state = state * radix(term, len(values)) + digit
+    return state
@@ -0,0 +1,738 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Scala RL server.
+
+It implements the `rl.proto` service with a lightweight kinematic simulation, so
+clients, environments and trainers can be exercised without the JVM simulator.
+Every server hosts any number of independent simulation instances, addressed by
+the `instance` field of the requests. Clients on the same host can also step
+through a shared memory ring, see `rl.shm_transport`.
+
+How to run:
+python -m rl.local_server --port 50051
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import io
+import math
+import re
+import sys
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import grpc
+import numpy as np
+from PIL import Image
+
+import rl_pb2
+import rl_pb2_grpc
+from rl.encoder_spec import evaluate
+from rl.rl_client import config_handle
+from rl.shm_transport import SharedMemoryRing
+from rl.visited_grid import VISITED_DECAY, VISITED_RADIUS
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+DEFAULT_AGENT_ID = "00000000-0000-0000-0000-000000000001"
+NUM_SENSORS = 8
+SENSOR_RANGE = 5.0
+LIGHT_REACHED_DISTANCE = 0.3
+CRASH_DISTANCE = 0.05
+DT = 0.1
+
+_ENTITY_RE = re.compile(r"^\s*-\s*(\w+):\s*$")
+_KEY_VALUE_RE = re.compile(r"^\s*(\w+):\s*(.+?)\s*$")
+
+
+@dataclass
+class _Robot:
+    x: float
+    y: float
+    orientation: float
+    radius: float = 0.25
+    speed: float = 1.0
+    visited: dict[tuple[int, int], float] = field(default_factory=dict)
+
+
+def _parse_vector(value: str) -> tuple[float, float]:
+    x, y = value.strip("[] ").split(",")
+    return float(x), float(y)
+
+
+def _sends(mask: rl_pb2.ObservationMask, field: str) -> bool:
+    return not mask.fields or field in mask.fields
+
+
+def _select(
+    mask: rl_pb2.ObservationMask, field: str, values: list[float], indices=()
+) -> list[float]:
+    if not _sends(mask, field):
+        return []
+    if not indices:
+        return values
+    return [values[i] for i in indices if 0 <= i < len(values)]
+
+
+def _select_columns(
+    mask: rl_pb2.ObservationMask, field: str, values: np.ndarray, indices=()
+) -> np.ndarray:
+    """`_select` of the readings of several robots, one row each."""
+    if not _sends(mask, field):
+        return values[:, :0]
+    if not indices:
+        return values
+    return values[:, [i for i in indices if 0 <= i < values.shape[1]]]
+
+
+def _encoder(request) -> rl_pb2.EncoderSpec | None:
+    return request.encoder if request.HasField("encoder") else None
+
+
+def parse_config(yaml_config: str) -> dict:
+    """Extract the few fields the stand-in simulation needs from a YAML config.
+
+    Parameters
+    ----------
+    yaml_config : str
+        The YAML configuration string, in the same format used by the simulator.
+
+    Returns
+    -------
+    dict
+        A dictionary with the environment size, the agents and the lights.
+    """
+    parsed = {"width": 10.0, "height": 10.0, "agents": [], "lights": []}
+    entity = None
+    for line in yaml_config.splitlines():
+        entity_match = _ENTITY_RE.match(line)
+        if entity_match:
+            entity = {"kind": entity_match.group(1)}
+            if entity["kind"] == "agent":
+                parsed["agents"].append(entity)
+            elif entity["kind"] == "light":
+                parsed["lights"].append(entity)
+            continue
+        kv_match = _KEY_VALUE_RE.match(line)
+        if not kv_match:
+            continue
+        key, value = kv_match.groups()
+        if entity is None and key in ("width", "height"):
+            parsed[key] = float(value)
+        elif entity is not None:
+            entity[key] = value
+    if not parsed["agents"]:
+        raise ValueError("configuration does not contain any agent")
+    return parsed
+
+
+class LocalSimulation:
+    """A single simulation instance with differential-drive robots and point lights."""
+
+    def __init__(self) -> None:
+        self.config = None
+        self.mask = rl_pb2.ObservationMask()
+        self.encoder = None
+        self.robots: dict[str, _Robot] = {}
+        self.lights: list[tuple[float, float]] = []
+        self.width = 0.0
+        self.height = 0.0
+
+    def init(
+        self,
+        yaml_config: str,
+        mask: rl_pb2.ObservationMask | None = None,
+        encoder: rl_pb2.EncoderSpec | None = None,
+    ) -> rl_pb2.InitResponse:
+        """Load a configuration, keeping it for the following resets."""
+        try:
+            self.load(parse_config(yaml_config), mask, encoder)
+        except ValueError as e:
+            return rl_pb2.InitResponse(ok=False, message=str(e))
+        return rl_pb2.InitResponse(ok=True)
+
+    def load(
+        self,
+        config: dict,
+        mask: rl_pb2.ObservationMask | None = None,
+        encoder: rl_pb2.EncoderSpec | None = None,
+    ) -> None:
+        """Switch to an already parsed configuration.
+
+        The mask selects the observation fields sent from now on, all of them
+        if it is None or empty, and the encoder the discrete state added to
+        them, none if it is None.
+        """
+        self.config = config
+        self.mask = mask if mask is not None else rl_pb2.ObservationMask()
+        self.encoder = encoder
+        self.robots = {}
+
+    def reset(self, seed: int) -> rl_pb2.ResetResponse:
+        """Place every robot back at its configured pose."""
+        if self.config is None:
+            self.init(f"- agent:\n    id: {DEFAULT_AGENT_ID}\n")
+        rng = np.random.default_rng(seed)
+        self.width = self.config["width"]
+        self.height = self.config["height"]
+        self.lights = [
+            _parse_vector(light.get("position", "[0.0, 0.0]"))
+            for light in self.config["lights"]
+        ]
+        self.robots = {}
+        for agent in self.config["agents"]:
+            if "position" in agent:
+                x, y = _parse_vector(agent["position"])
+            else:
+                x, y = (
+                    rng.uniform(0.5, self.width - 0.5),
+                    rng.uniform(0.5, self.height - 0.5),
+                )
+            robot = _Robot(
+                x=x,
+                y=y,
+                orientation=float(agent.get("orientation", 0.0)),
+                radius=float(agent.get("radius", 0.25)),
+                speed=float(agent.get("speed", 1.0)),
+            )
+            self._visit(robot)
+            self.robots[agent.get("id", DEFAULT_AGENT_ID)] = robot
+        return self.observe()
+
+    def observe(self) -> rl_pb2.ResetResponse:
+        """Observe every robot without advancing the simulation."""
+        readings = self._readings()
+        return rl_pb2.ResetResponse(
+            observations={
+                k: self._observe(r, readings[k], sync=True)
+                for k, r in self.robots.items()
+            },
+            infos=dict.fromkeys(self.robots, ""),
+        )
+
+    def step(
+        self, actions, packed: bool = False, repeat: int = 1
+    ) -> rl_pb2.StepResponse:
+        """Apply the given wheel actions for `repeat` ticks, at least one.
+
+        It stops after a tick where a robot is terminated; the rewards are
+        summed and the flags OR-ed over the ticks. In delta mode the cells of
+        the ticks before the last go in `visited_path`. Packed responses carry
+        float32 blobs in `packed` instead of the maps.
+        """
+        wheels = {k: (a.left_wheel, a.right_wheel) for k, a in actions.items()}
+        rewards, terminateds = self._tick(wheels)
+        paths = {k: [] for k in self.robots}
+        ticks = 1
+        while ticks < repeat and not any(terminateds.values()):
+            if self.mask.visited_delta:
+                for agent_id, robot in self.robots.items():
+                    paths[agent_id].append(self._cell_index(robot))
+            tick_rewards, tick_terminateds = self._tick(wheels)
+            for agent_id in self.robots:
+                rewards[agent_id] += tick_rewards[agent_id]
+                terminateds[agent_id] |= tick_terminateds[agent_id]
+            ticks += 1
+        if packed:
+            return rl_pb2.StepResponse(
+                infos=dict.fromkeys(self.robots, ""),
+                packed=self._step_tensors(rewards, terminateds, paths),
+                ticks=ticks,
+            )
+        readings = self._readings()
+        observations = {}
+        for agent_id, robot in self.robots.items():
+            observations[agent_id] = self._observe(robot, readings[agent_id])
+            if self.mask.visited_delta:
+                observations[agent_id].visited_path.extend(paths[agent_id])
+        return rl_pb2.StepResponse(
+            observations=observations,
+            rewards=rewards,
+            terminateds=terminateds,
+            truncateds=dict.fromkeys(self.robots, False),
+            infos=dict.fromkeys(self.robots, ""),
+            ticks=ticks,
+        )
+
+    def step_into(
+        self,
+        agent_ids: list[str],
+        actions: np.ndarray,
+        observations: np.ndarray,
+        rewards: np.ndarray,
+        flags: np.ndarray,
+    ) -> None:
+        """Apply one tick of wheel action rows, writing the results in place.
+
+        It is the array counterpart of `step` for the shared memory transport,
+        rows follow `agent_ids` and NaN actions leave a robot still.
+        """
+        wheels = {
+            agent_id: (left, right)
+            for agent_id, (left, right) in zip(agent_ids, actions.tolist(), strict=True)
+            if not math.isnan(left)
+        }
+        step_rewards, terminateds = self._tick(wheels)
+        readings = self._readings()
+        for i, agent_id in enumerate(agent_ids):
+            observations[i] = self._observation_row(
+                self.robots[agent_id], readings[agent_id]
+            )
+            rewards[i] = step_rewards[agent_id]
+            flags[i] = (terminateds[agent_id], False)
+
+    def _observation_row(self, robot: _Robot, readings: tuple) -> list[float]:
+        """Observation of a robot in the shared memory and packed row layout."""
+        proximity, light, _ = self._fields(robot, readings)
+        # shared memory rows keep the dense neighbourhood, delta mode or not
+        visited = self._visited_positions(robot) if _sends(self.mask, "visited") else []
+        return [*proximity, *light, *self._pose(robot), *visited]
+
+    def _step_tensors(
+        self, rewards: dict, terminateds: dict, paths: dict
+    ) -> rl_pb2.StepTensors:
+        """The packed observations of every robot, built column by column."""
+        mask = self.mask
+        agent_ids = list(self.robots)
+        robots = list(self.robots.values())
+        n = len(robots)
+        proximity, light = self._sense_all(robots)
+        states = b""
+        if self._sends_state():
+            states = np.array(
+                [
+                    evaluate(self.encoder, p, li)
+                    for p, li in zip(proximity.tolist(), light.tolist(), strict=True)
+                ],
+                dtype="<i4",
+            ).tobytes()
+        proximity = _select_columns(
+            mask, "proximity", proximity, mask.proximity_indices
+        )
+        light = _select_columns(mask, "light", light, mask.light_indices)
+        if _sends(mask, "visited") and not mask.visited_delta:
+            visited = np.array([self._visited_positions(r) for r in robots])
+        else:
+            visited = np.empty((n, 0))
+        x = np.array([r.x for r in robots])
+        y = np.array([r.y for r in robots])
+        poses = np.zeros((n, 3))
+        if _sends(mask, "position"):
+            poses[:, 0], poses[:, 1] = x, y
+        if _sends(mask, "orientation"):
+            poses[:, 2] = [r.orientation for r in robots]
+        cells = b""
+        if mask.visited_delta:
+            cells = (
+                (y.astype(np.int64) * int(self.width) + x.astype(np.int64))
+                .astype("<i4")
+                .tobytes()
+            )
+        flags = np.zeros((n, 2), dtype="<f4")
+        flags[:, 0] = [terminateds[a] for a in agent_ids]
+        return rl_pb2.StepTensors(
+            observations=rl_pb2.ObservationTensors(
+                agent_ids=agent_ids,
+                num_proximity=proximity.shape[1],
+                num_light=light.shape[1],
+                num_visited=visited.shape[1],
+                proximity=proximity.astype("<f4").tobytes(),
+                light=light.astype("<f4").tobytes(),
+                poses=poses.astype("<f4").tobytes(),
+                visited=visited.astype("<f4").tobytes(),
+                states=states,
+                visited_cells=cells,
+                visited_paths=np.array(
+                    [paths[a] for a in agent_ids], dtype="<i4"
+                ).tobytes(),
+            ),
+            rewards=np.array([rewards[a] for a in agent_ids], dtype="<f4").tobytes(),
+            flags=flags.tobytes(),
+        )
+
+    def _tick(self, wheels: dict[str, tuple[float, float]]) -> tuple[dict, dict]:
+        rewards, terminateds = {}, {}
+        for agent_id, robot in self.robots.items():
+            before = self._light_distance(robot)
+            action = wheels.get(agent_id)
+            if action is not None:
+                self._move(robot, *action)
+            self._visit(robot)
+            after = self._light_distance(robot)
+            rewards[agent_id] = before - after
+            terminateds[agent_id] = (
+                after < LIGHT_REACHED_DISTANCE
+                or self._wall_distance(robot) < CRASH_DISTANCE
+            )
+        return rewards, terminateds
+
+    def render(
+        self, width: int, height: int, fmt: str = "png"
+    ) -> rl_pb2.RenderResponse:
+        """Draw robots and lights on a blank canvas, as PNG or raw RGB bytes."""
+        frame = np.full((height, width, 3), 255, dtype=np.uint8)
+        marks = [((r.x, r.y), (0, 0, 255)) for r in self.robots.values()]
+        marks += [(light, (255, 200, 0)) for light in self.lights]
+        for (x, y), color in marks:
+            px = int(np.clip(x / max(self.width, 1e-9) * width, 0, width - 1))
+            py = int(np.clip(y / max(self.height, 1e-9) * height, 0, height - 1))
+            frame[max(py - 3, 0) : py + 4, max(px - 3, 0) : px + 4] = color
+        if fmt == "raw":
+            image = frame.tobytes()
+        else:
+            fmt = "png"
+            buffer = io.BytesIO()
+            Image.fromarray(frame).save(buffer, format="PNG")
+            image = buffer.getvalue()
+        return rl_pb2.RenderResponse(
+            image=image,
+            format=fmt,
+            width=width,
+            height=height,
+            channels=3,
+        )
+
+    def _move(self, robot: _Robot, left: float, right: float) -> None:
+        left, right = np.clip(left, -1.0, 1.0), np.clip(right, -1.0, 1.0)
+        linear = (left + right) / 2.0 * robot.speed
+        angular = math.degrees((right - left) * robot.speed / (2.0 * robot.radius))
+        theta = math.radians(robot.orientation)
+        # keep robots in the cells of the arena, the far walls excluded
+        robot.x = float(
+            np.clip(
+                robot.x + linear * math.cos(theta) * DT,
+                0.0,
+                np.nextafter(self.width, 0.0),
+            )
+        )
+        robot.y = float(
+            np.clip(
+                robot.y + linear * math.sin(theta) * DT,
+                0.0,
+                np.nextafter(self.height, 0.0),
+            )
+        )
+        robot.orientation = (robot.orientation + angular * DT) % 360.0
+
+    def _visit(self, robot: _Robot) -> None:
+        robot.visited = {k: v * VISITED_DECAY for k, v in robot.visited.items()}
+        robot.visited[(int(robot.x), int(robot.y))] = 1.0
+
+    def _visited_positions(self, robot: _Robot) -> list[float]:
+        cx, cy = int(robot.x), int(robot.y)
+        values = []
+        for dx in range(-VISITED_RADIUS, VISITED_RADIUS + 1):
+            for dy in range(-VISITED_RADIUS, VISITED_RADIUS + 1):
+                px, py = cx + dx, cy + dy
+                if 0 <= px < int(self.width) and 0 <= py < int(self.height):
+                    values.append(robot.visited.get((px, py), 0.0))
+                else:
+                    values.append(-1.0)
+        return values
+
+    def _wall_distance(self, robot: _Robot) -> float:
+        return min(robot.x, robot.y, self.width - robot.x, self.height - robot.y)
+
+    def _light_distance(self, robot: _Robot) -> float:
+        if not self.lights:
+            return 0.0
+        return min(math.hypot(lx - robot.x, ly - robot.y) for lx, ly in self.lights)
+
+    def _sense_all(self, robots: list[_Robot]) -> tuple[np.ndarray, np.ndarray]:
+        """Proximity and light readings of robots, one row of `NUM_SENSORS`
+        each: the distance to the walls along every sensor ray, relative to
+        `SENSOR_RANGE`, and the intensity of the lights in front of it."""
+        x = np.array([r.x for r in robots])[:, np.newaxis]
+        y = np.array([r.y for r in robots])[:, np.newaxis]
+        orientation = np.array([r.orientation for r in robots])[:, np.newaxis]
+        angles = np.radians(orientation + np.arange(NUM_SENSORS) * 360.0 / NUM_SENSORS)
+        dx, dy = np.cos(angles), np.sin(angles)
+        with np.errstate(divide="ignore"):
+            to_x = np.where(
+                dx > 1e-9,
+                (self.width - x) / dx,
+                np.where(dx < -1e-9, -x / dx, np.inf),
+            )
+            to_y = np.where(
+                dy > 1e-9,
+                (self.height - y) / dy,
+                np.where(dy < -1e-9, -y / dy, np.inf),
+            )
+        distances = np.minimum(to_x, to_y)
+        distances[np.isinf(distances)] = SENSOR_RANGE
+        intensity = np.zeros_like(angles)
+        for lx, ly in self.lights:
+            distance = np.hypot(lx - x, ly - y)
+            alignment = np.cos(np.arctan2(ly - y, lx - x) - angles)
+            intensity += np.maximum(alignment, 0.0) / (1.0 + distance**2)
+        return np.minimum(distances / SENSOR_RANGE, 1.0), np.minimum(intensity, 1.0)
+
+    def _readings(self) -> dict[str, tuple[list[float], list[float]]]:
+        """The proximity and light readings of every robot, by agent ID."""
+        proximity, light = self._sense_all(list(self.robots.values()))
+        return dict(
+            zip(
+                self.robots,
+                zip(proximity.tolist(), light.tolist(), strict=True),
+                strict=True,
+            )
+        )
+
+    def _fields(self, robot: _Robot, readings: tuple) -> tuple[list, list, list]:
+        """Proximity, light and visited values of a robot, as selected by the mask."""
+        mask = self.mask
+        proximity, light = readings
+        dense = _sends(mask, "visited") and not mask.visited_delta
+        visited = self._visited_positions(robot) if dense else []
+        return (
+            _select(mask, "proximity", proximity, mask.proximity_indices),
+            _select(mask, "light", light, mask.light_indices),
+            visited,
+        )
+
+    def _pose(self, robot: _Robot) -> tuple[float, float, float]:
+        x, y = (robot.x, robot.y) if _sends(self.mask, "position") else (0.0, 0.0)
+        orientation = robot.orientation if _sends(self.mask, "orientation") else 0.0
+        return x, y, orientation
+
+    def _cell_index(self, robot: _Robot) -> int:
+        return int(robot.y) * int(self.width) + int(robot.x)
+
+    def _visited_grid(self, robot: _Robot) -> rl_pb2.VisitedGrid:
+        """The visited cells of a robot and their ages, for the delta mode."""
+        width, height = int(self.width), int(self.height)
+        ages = {
+            y * width + x: round(math.log(value) / math.log(VISITED_DECAY))
+            for (x, y), value in robot.visited.items()
+            if 0 <= x < width and 0 <= y < height and value > 0.0
+        }
+        cells = np.zeros(width * height, dtype=bool)
+        cells[list(ages)] = True
+        return rl_pb2.VisitedGrid(
+            width=width,
+            height=height,
+            cells=np.packbits(cells, bitorder="little").tobytes(),
+            ages=[ages[i] for i in sorted(ages)],
+        )
+
+    def _sends_state(self) -> bool:
+        return self.encoder is not None and _sends(self.mask, "state")
+
+    def _observe(
+        self, robot: _Robot, readings: tuple, sync: bool = False
+    ) -> rl_pb2.Observation:
+        """Observation of a robot given its `readings`; in delta mode, the
+        whole visited grid on reset and restore, `sync`, and the cell of the
+        robot on steps."""
+        proximity, light, visited = self._fields(robot, readings)
+        observation = rl_pb2.Observation(
+            proximity_values=proximity,
+            light_values=light,
+            orientation=self._pose(robot)[2],
+            visited_positions=visited,
+        )
+        if _sends(self.mask, "position"):
+            observation.position.x = robot.x
+            observation.position.y = robot.y
+        if self._sends_state():
+            observation.state = evaluate(self.encoder, *readings)
+        if self.mask.visited_delta and sync:
+            observation.visited_grid.CopyFrom(self._visited_grid(robot))
+        elif self.mask.visited_delta:
+            observation.visited_cell = self._cell_index(robot)
+        return observation
+
+
+class LocalRLServicer(rl_pb2_grpc.RLServicer):
+    """gRPC servicer backed by one `LocalSimulation` per requested instance.
+
+    Parameters
+    ----------
+    step_delay : float, optional (default=0.0)
+        Artificial time in seconds added to every step, to mimic a slower simulator.
+    step_jitter : float, optional (default=0.0)
+        Mean of an exponentially distributed extra delay in seconds, drawn for
+        every step, to mimic simulations with a varying per-step cost.
+    """
+
+    def __init__(self, step_delay: float = 0.0, step_jitter: float = 0.0) -> None:
+        self.instances: dict[int, LocalSimulation] = defaultdict(LocalSimulation)
+        self.step_delay = step_delay
+        self.step_jitter = step_jitter
+        self._rng = np.random.default_rng()
+        self.configs: dict[str, dict] = {}
+        self.snapshots: dict[str, LocalSimulation] = {}
+        self.rings: dict[int, asyncio.Task] = {}
+
+    async def _delay(self) -> None:
+        delay = self.step_delay
+        if self.step_jitter > 0:
+            delay += self._rng.exponential(self.step_jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _step(self, request: rl_pb2.StepRequest) -> rl_pb2.StepResponse:
+        await self._delay()
+        return self.instances[request.instance].step(
+            request.actions, request.packed, request.repeat
+        )
+
+    async def Init(self, request, context):  # noqa: N802
+        return self.instances[request.instance].init(
+            request.config, request.mask, _encoder(request)
+        )
+
+    async def Reset(self, request, context):  # noqa: N802
+        return self.instances[request.instance].reset(request.seed)
+
+    async def RegisterConfig(self, request, context):  # noqa: N802
+        handle = config_handle(request.config)
+        if handle not in self.configs:
+            try:
+                self.configs[handle] = parse_config(request.config)
+            except ValueError as e:
+                return rl_pb2.RegisterConfigResponse(
+                    ok=False, message=str(e), handle=handle
+                )
+        return rl_pb2.RegisterConfigResponse(ok=True, handle=handle)
+
+    async def InitReset(self, request, context):  # noqa: N802
+        config = self.configs.get(request.handle)
+        if config is None:
+            await context.abort(
+                grpc.StatusCode.NOT_FOUND, f"Config {request.handle} is not registered"
+            )
+        simulation = self.instances[request.instance]
+        simulation.load(config, request.mask, _encoder(request))
+        return simulation.reset(request.seed)
+
+    async def Snapshot(self, request, context):  # noqa: N802
+        snapshot_id = uuid.uuid4().hex
+        self.snapshots[snapshot_id] = copy.deepcopy(self.instances[request.instance])
+        return rl_pb2.SnapshotResponse(snapshot_id=snapshot_id)
+
+    async def Restore(self, request, context):  # noqa: N802
+        snapshot = self.snapshots.get(request.snapshot_id)
+        if snapshot is None:
+            await context.abort(
+                grpc.StatusCode.NOT_FOUND,
+                f"Snapshot {request.snapshot_id} does not exist",
+            )
+        simulation = self.instances[request.instance] = copy.deepcopy(snapshot)
+        return simulation.observe()
+
+    async def ReleaseSnapshots(self, request, context):  # noqa: N802
+        released = sum(
+            self.snapshots.pop(i, None) is not None for i in request.snapshot_ids
+        )
+        return rl_pb2.ReleaseSnapshotsResponse(released=released)
+
+    async def AttachSharedMemory(self, request, context):  # noqa: N802
+        try:
+            ring = SharedMemoryRing.attach(
+                request.name,
+                request.slots,
+                list(request.agent_ids),
+                request.num_proximity,
+                request.num_light,
+                request.num_visited,
+            )
+        except (FileNotFoundError, ValueError) as e:
+            return rl_pb2.SharedMemoryResponse(ok=False, message=str(e))
+        previous = self.rings.pop(request.instance, None)
+        if previous is not None:
+            previous.cancel()
+
+        async def step(actions, observations, rewards, flags):
+            await self._delay()
+            self.instances[request.instance].step_into(
+                ring.agent_ids, actions, observations, rewards, flags
+            )
+
+        self.rings[request.instance] = asyncio.get_running_loop().create_task(
+            ring.serve(step)
+        )
+        return rl_pb2.SharedMemoryResponse(ok=True)
+
+    async def Step(self, request, context):  # noqa: N802
+        return await self._step(request)
+
+    async def StepBatch(self, request, context):  # noqa: N802
+        steps = await asyncio.gather(*(self._step(step) for step in request.steps))
+        return rl_pb2.StepBatchResponse(steps=steps)
+
+    async def StepStream(self, request_iterator, context):  # noqa: N802
+        async for request in request_iterator:
+            yield await self._step(request)
+
+    async def Render(self, request, context):  # noqa: N802
+        width = request.width if request.HasField("width") else 800
+        height = request.height if request.HasField("height") else 600
+        fmt = request.format if request.HasField("format") else "png"
+        return self.instances[request.instance].render(width, height, fmt)
+
+    async def Close(self, request, context):  # noqa: N802
+        return rl_pb2.CloseResponse(ok=True)
+
+
+async def start_server(
+    address: str = "localhost:50051", servicer: rl_pb2_grpc.RLServicer | None = None
+) -> grpc.aio.Server:
+    """Start a stand-in server on the given address.
+
+    Parameters
+    ----------
+    address : str
+        The address to bind the server to.
+    servicer : rl_pb2_grpc.RLServicer | None
+        The servicer to expose; a new `LocalRLServicer` is created if None.
+
+    Returns
+    -------
+    grpc.aio.Server
+        The started server, to be stopped by the caller.
+    """
+    server = grpc.aio.server()
+    rl_pb2_grpc.add_RLServicer_to_server(servicer or LocalRLServicer(), server)
+    server.add_insecure_port(address)
+    await server.start()
+    logger.info(f"✓ Local RL server listening on {address}")
+    return server
+
+
+async def _serve(address: str, step_delay: float, step_jitter: float) -> None:
+    servicer = LocalRLServicer(step_delay=step_delay, step_jitter=step_jitter)
+    server = await start_server(address, servicer)
+    await server.wait_for_termination()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Local stand-in for the Scala RL server.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("--host", type=str, default="localhost", help="Host to bind.")
+    p.add_argument("--port", type=int, default=50051, help="Port to bind.")
+    p.add_argument(
+        "--step-delay",
+        type=float,
+        default=0.0,
+        help="Artificial delay in seconds added to every step.",
+    )
+    p.add_argument(
+        "--step-jitter",
+        type=float,
+        default=0.0,
+        help="Mean of a random exponential delay in seconds added to every step.",
+    )
+    args = p.parse_args()
+    asyncio.run(_serve(f"{args.host}:{args.port}", args.step_delay, args.step_jitter))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
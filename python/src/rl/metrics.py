@@ -0,0 +1,273 @@
+import bisect
+import csv
+import itertools
+import json
+import math
+import threading
+import time
+from pathlib import Path
+
+import grpc
+
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies with logarithmic buckets.
+
+    Recording a value is a single bucket increment, and percentiles are
+    estimated from the buckets, within their relative width.
+
+    Parameters
+    ----------
+    min_s : float, optional (default=1e-6)
+        Upper bound of the first bucket, in seconds.
+    max_s : float, optional (default=100.0)
+        Lower bound of the last bucket, in seconds.
+    buckets_per_decade : int, optional (default=20)
+        Resolution of the histogram, about 12% relative width per bucket.
+    """
+
+    def __init__(
+        self, min_s: float = 1e-6, max_s: float = 100.0, buckets_per_decade: int = 20
+    ) -> None:
+        self.min_s = min_s
+        self.buckets_per_decade = buckets_per_decade
+        decades = math.log10(max_s / min_s)
+        self.counts = [0] * (int(decades * buckets_per_decade) + 2)
+        self.clear()
+
+    def clear(self) -> None:
+        self.counts[:] = [0] * len(self.counts)
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.min_s:
+            return 0
+        bucket = int(math.log10(seconds / self.min_s) * self.buckets_per_decade) + 1
+        return min(bucket, len(self.counts) - 1)
+
+    def _upper_bound(self, bucket: int) -> float:
+        return self.min_s * 10 ** (bucket / self.buckets_per_decade)
+
+    def record(self, seconds: float) -> None:
+        self.counts[self._bucket(seconds)] += 1
+        self.count += 1
+        self.total_s += seconds
+        self.max_s = max(self.max_s, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Estimate a percentile, in seconds, as the upper bound of its bucket.
+
+        Parameters
+        ----------
+        q : float
+            The percentile, between 0 and 100.
+
+        Returns
+        -------
+        float
+            The estimated latency, 0.0 if nothing was recorded.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = math.ceil(q / 100 * self.count)
+        cumulative = list(itertools.accumulate(self.counts))
+        bucket = bisect.bisect_left(cumulative, max(rank, 1))
+        return min(self._upper_bound(bucket), self.max_s)
+
+
+class RPCStats:
+    """
+    Counters of the calls of one method on one endpoint.
+
+    Attributes
+    ----------
+    latency : LatencyHistogram
+        Latencies of the successful calls.
+    request_bytes : int
+        Serialized size of all the requests sent.
+    response_bytes : int
+        Serialized size of all the responses received.
+    errors : dict[str, int]
+        Failed calls by gRPC status code or exception name.
+    """
+
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()
+        self.clear()
+
+    def clear(self) -> None:
+        self.latency.clear()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.errors: dict[str, int] = {}
+
+    def record(self, seconds: float, request_bytes: int, response_bytes: int) -> None:
+        self.latency.record(seconds)
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+
+    def record_error(self, error: BaseException) -> None:
+        if isinstance(error, (grpc.aio.AioRpcError, grpc.Call)):
+            name = error.code().name
+        else:
+            name = type(error).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+
+class RPCMetrics:
+    """
+    Always-on per-endpoint and per-method metrics of the RL client calls.
+
+    Every `RLClient` records into `DEFAULT_METRICS` unless given its own
+    registry, so the clients of a pool are aggregated by endpoint.
+
+    Attributes
+    ----------
+    stats : dict[tuple[str, str], RPCStats]
+        The counters, keyed by (endpoint, method).
+    """
+
+    FIELDS = (
+        "endpoint",
+        "method",
+        "calls",
+        "errors",
+        "mean_us",
+        "p50_us",
+        "p90_us",
+        "p99_us",
+        "max_us",
+        "calls_per_s",
+        "request_bytes",
+        "response_bytes",
+        "error_codes",
+    )
+
+    def __init__(self) -> None:
+        self.stats: dict[tuple[str, str], RPCStats] = {}
+        self._started = time.perf_counter()
+        self._dump_thread = None
+        self._dump_stop = threading.Event()
+
+    def get(self, endpoint: str, method: str) -> RPCStats:
+        """Return the counters of a method on an endpoint, creating them."""
+        key = (endpoint, method)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = RPCStats()
+        return stats
+
+    def reset(self) -> None:
+        """Forget every recorded call.
+
+        The counters are zeroed in place, since clients keep the ones of
+        their methods and go on recording into them.
+        """
+        for stats in list(self.stats.values()):
+            stats.clear()
+        self._started = time.perf_counter()
+
+    def snapshot(self) -> list[dict]:
+        """Summarize the counters recorded so far.
+
+        Returns
+        -------
+        list[dict]
+            One row per (endpoint, method) with the `FIELDS` keys: call and
+            error counts, latency statistics in microseconds, throughput since
+            the metrics were created or reset, and payload sizes.
+        """
+        elapsed_s = max(time.perf_counter() - self._started, 1e-9)
+        rows = []
+        for (endpoint, method), stats in list(self.stats.items()):
+            latency = stats.latency
+            rows.append(
+                {
+                    "endpoint": endpoint,
+                    "method": method,
+                    "calls": latency.count,
+                    "errors": sum(stats.errors.values()),
+                    "mean_us": latency.total_s / latency.count * 1e6
+                    if latency.count
+                    else 0.0,
+                    "p50_us": latency.percentile(50) * 1e6,
+                    "p90_us": latency.percentile(90) * 1e6,
+                    "p99_us": latency.percentile(99) * 1e6,
+                    "max_us": latency.max_s * 1e6,
+                    "calls_per_s": latency.count / elapsed_s,
+                    "request_bytes": stats.request_bytes,
+                    "response_bytes": stats.response_bytes,
+                    "error_codes": dict(stats.errors),
+                }
+            )
+        return rows
+
+    def dump(self, path: str | Path) -> None:
+        """Write a snapshot to a JSON or, by the file suffix, CSV file.
+
+        Parameters
+        ----------
+        path : str | Path
+            The output file, overwritten; `.csv` files get one line per row.
+        """
+        path = Path(path)
+        rows = self.snapshot()
+        if path.suffix == ".csv":
+            with path.open("w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+                writer.writeheader()
+                for row in rows:
+                    writer.writerow(
+                        {**row, "error_codes": json.dumps(row["error_codes"])}
+                    )
+        else:
+            path.write_text(json.dumps(rows, indent=2))
+
+    def start_periodic_dump(self, path: str | Path, interval_s: float = 30.0) -> None:
+        """Dump a snapshot every `interval_s` seconds from a background thread.
+
+        Parameters
+        ----------
+        path : str | Path
+            The output file, see `dump`.
+        interval_s : float, optional (default=30.0)
+            Seconds between two dumps.
+        """
+        self.stop_periodic_dump()
+        self._dump_stop.clear()
+
+        def _run():
+            while not self._dump_stop.wait(interval_s):
+                self.dump(path)
+            self.dump(path)
+
+        self._dump_thread = threading.Thread(target=_run, daemon=True)
+        self._dump_thread.start()
+        logger.info(f"✓ Dumping RPC metrics to {path} every {interval_s}s")
+
+    def stop_periodic_dump(self) -> None:
+        """Stop the periodic dump, if running, after a last dump."""
+        if self._dump_thread is not None:
+            self._dump_stop.set()
+            self._dump_thread.join()
+            self._dump_thread = None
+
+    def log_summary(self) -> None:
+        """Log one line per (endpoint, method) with the main figures."""
+        for row in self.snapshot():
+            logger.info(
+                f"{row['endpoint']} {row['method']:<9} calls={row['calls']} "
+                f"errors={row['errors']} p50={row['p50_us']:.0f}us "
+                f"p90={row['p90_us']:.0f}us p99={row['p99_us']:.0f}us "
+                f"in={row['response_bytes']}B out={row['request_bytes']}B"
+            )
+
+
+DEFAULT_METRICS = RPCMetrics()
@@ -0,0 +1,383 @@
+from collections.abc import Iterator, Mapping
+
+import numpy as np
+
+
+class ObservationBatch:
+    """
+    Columnar view of the observations of every known agent.
+
+    Row `i` of each array belongs to `agent_ids[i]`. The arrays are views into
+    the buffers of the decoder that produced them, so they are overwritten by
+    the next decode: copy anything that must outlive the current step.
+
+    Attributes
+    ----------
+    agent_ids : list[str]
+        The agent IDs, in row order.
+    present : np.ndarray
+        Boolean mask of shape (n_agents,) of the agents in the last response.
+    proximity : np.ndarray
+        Array of shape (n_agents, n_proximity).
+    light : np.ndarray
+        Array of shape (n_agents, n_light).
+    position : np.ndarray
+        Float64 array of shape (n_agents, 2) with the (x, y) positions.
+    orientation : np.ndarray
+        Float64 array of shape (n_agents,) with the orientations in degrees.
+    visited : np.ndarray
+        Array of shape (n_agents, n_visited) with the visited cells.
+    """
+
+    def __init__(
+        self, agent_ids, present, proximity, light, position, orientation, visited
+    ) -> None:
+        self.agent_ids = agent_ids
+        self.present = present
+        self.proximity = proximity
+        self.light = light
+        self.position = position
+        self.orientation = orientation
+        self.visited = visited
+
+    def to_dict(self, encoded) -> dict:
+        """Map the rows of an encoded array back to the present agents."""
+        return {
+            agent_id: value
+            for agent_id, value, present in zip(
+                self.agent_ids, encoded, self.present, strict=False
+            )
+            if present
+        }
+
+
+class PackedPosition:
+    """The (x, y) position of a `PackedObservation`."""
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: float, y: float) -> None:
+        self.x = x
+        self.y = y
+
+
+class PackedObservation:
+    """
+    Observation of one agent read from a row of `PackedObservations`.
+
+    It has the attributes of `rl_pb2.Observation` that the encoders use, so
+    agent-by-agent encoders work unchanged on packed responses.
+    """
+
+    __slots__ = (
+        "proximity_values",
+        "light_values",
+        "position",
+        "orientation",
+        "visited_positions",
+    )
+
+    def __init__(self, packed: "PackedObservations", i: int) -> None:
+        self.proximity_values = packed.proximity[i].tolist()
+        self.light_values = packed.light[i].tolist()
+        x, y = packed.position[i].tolist()
+        self.position = PackedPosition(x, y)
+        self.orientation = float(packed.orientation[i])
+        self.visited_positions = packed.visited[i].tolist()
+
+
+class PackedObservations(Mapping):
+    """
+    Observations of several agents as one array per field.
+
+    It is the counterpart of the `map<string, Observation>` of the responses
+    for transports that exchange arrays, and maps agent IDs to
+    `PackedObservation` rows. `ObservationDecoder` copies whole columns from
+    it instead of reading the agents one by one.
+
+    Parameters
+    ----------
+    agent_ids : list[str]
+        The agent IDs, in row order.
+    proximity : np.ndarray
+        Array of shape (n_agents, n_proximity).
+    light : np.ndarray
+        Array of shape (n_agents, n_light).
+    position : np.ndarray
+        Array of shape (n_agents, 2) with the (x, y) positions.
+    orientation : np.ndarray
+        Array of shape (n_agents,) with the orientations in degrees.
+    visited : np.ndarray
+        Array of shape (n_agents, n_visited) with the visited cells.
+    states : np.ndarray | None, optional (default=None)
+        Array of shape (n_agents,) with the discrete states computed by the
+        server, see `rl_pb2.EncoderSpec`.
+    """
+
+    def __init__(
+        self, agent_ids, proximity, light, position, orientation, visited, states=None
+    ) -> None:
+        self.agent_ids = agent_ids
+        self.proximity = proximity
+        self.light = light
+        self.position = position
+        self.orientation = orientation
+        self.visited = visited
+        self.states = states
+        self._rows = {agent_id: i for i, agent_id in enumerate(agent_ids)}
+
+    @classmethod
+    def from_tensors(cls, tensors) -> "PackedObservations":
+        """Wrap the float32 blobs of an `rl_pb2.ObservationTensors` as arrays.
+
+        The arrays are read-only views over the bytes of the response;
+        `ObservationDecoder` still copies them into its own columns.
+
+        Parameters
+        ----------
+        tensors : rl_pb2.ObservationTensors
+            The packed observations of a step response.
+        """
+        agent_ids = list(tensors.agent_ids)
+        n = len(agent_ids)
+        poses = np.frombuffer(tensors.poses, dtype="<f4").reshape(n, 3)
+        return cls(
+            agent_ids,
+            np.frombuffer(tensors.proximity, dtype="<f4").reshape(n, -1),
+            np.frombuffer(tensors.light, dtype="<f4").reshape(n, -1),
+            poses[:, :2],
+            poses[:, 2],
+            np.frombuffer(tensors.visited, dtype="<f4").reshape(n, -1),
+            np.frombuffer(tensors.states, dtype="<i4") if tensors.states else None,
+        )
+
+    def __getitem__(self, agent_id: str) -> PackedObservation:
+        return PackedObservation(self, self._rows[agent_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.agent_ids)
+
+    def __len__(self) -> int:
+        return len(self.agent_ids)
+
+
+class ObservationDecoder:
+    """
+    Decoder of `Observation` maps into preallocated arrays.
+
+    Each column is filled with a single conversion over all agents, and only
+    the columns an encoder asks for are decoded. `PackedObservations` are
+    copied column by column, while `Observation` maps are first flattened
+    into Python lists, agent by agent.
+
+    Agents get a stable row index the first time they are seen, which is kept
+    until `clear` is called. Sensor readings shorter than the configured width
+    are padded: proximity with 1.0 (nothing in range), light with 0.0 and
+    visited cells with -1.0 (outside the map). Positions and orientations are
+    always kept in float64, so discretizing them gives the same cells as the
+    original doubles.
+
+    When the server sends a subset of the sensors, see `ObservationMask`,
+    `proximity_indices` and `light_indices` give the sensor of each received
+    value: they are scattered back to their column, the others being padded,
+    so encoders index the sensors as if all of them were received.
+
+    Parameters
+    ----------
+    num_proximity : int, optional (default=8)
+        Number of proximity sensors.
+    num_light : int, optional (default=8)
+        Number of light sensors.
+    num_visited : int, optional (default=25)
+        Number of visited cells around each agent.
+    capacity : int, optional (default=1)
+        Initial number of rows, grown as new agents appear.
+    dtype : np.dtype, optional (default=np.float32)
+        Data type of the sensor and visited cells arrays.
+
+    Attributes
+    ----------
+    proximity_indices, light_indices : tuple[int, ...] | None
+        The sensors of the received values, None if all of them are received.
+    """
+
+    FIELDS = ("proximity", "light", "position", "orientation", "visited")
+    PROXIMITY_PAD = 1.0
+    LIGHT_PAD = 0.0
+    VISITED_PAD = -1.0
+
+    def __init__(
+        self,
+        num_proximity: int = 8,
+        num_light: int = 8,
+        num_visited: int = 25,
+        capacity: int = 1,
+        dtype=np.float32,
+    ) -> None:
+        self.dtype = dtype
+        self.num_proximity = num_proximity
+        self.num_light = num_light
+        self.num_visited = num_visited
+        self.index: dict[str, int] = {}
+        self.agent_ids: list[str] = []
+        self.proximity_indices = None
+        self.light_indices = None
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        columns = {
+            "_proximity": ((self.num_proximity,), self.dtype),
+            "_light": ((self.num_light,), self.dtype),
+            "_position": ((2,), np.float64),
+            "_orientation": ((), np.float64),
+            "_visited": ((self.num_visited,), self.dtype),
+            "_present": ((), bool),
+        }
+        for name, (row_shape, dtype) in columns.items():
+            new = np.zeros((capacity, *row_shape), dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                new[: len(old)] = old
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def _add(self, agent_id: str) -> int:
+        i = len(self.agent_ids)
+        if i == self.capacity:
+            self._allocate(2 * self.capacity)
+        self.index[agent_id] = i
+        self.agent_ids.append(agent_id)
+        return i
+
+    def clear(self) -> None:
+        """Forget the agent-index mapping, e.g. before a new configuration."""
+        self.index = {}
+        self.agent_ids = []
+        self._present[:] = False
+
+    @staticmethod
+    def _copy_sensor(
+        column: np.ndarray,
+        rows: list[int],
+        readings: np.ndarray,
+        pad: float,
+        indices=None,
+    ) -> None:
+        if indices is not None:
+            column[rows] = pad
+            k = min(readings.shape[1], len(indices))
+            column[np.ix_(rows, indices[:k])] = readings[:, :k]
+            return
+        k = min(readings.shape[1], column.shape[1])
+        column[rows, :k] = readings[:, :k]
+        column[rows, k:] = pad
+
+    @classmethod
+    def _decode_sensor(
+        cls,
+        column: np.ndarray,
+        rows: list[int],
+        readings: list,
+        pad: float,
+        indices=None,
+    ) -> None:
+        if indices is not None:
+            width = len(indices)
+            flat = [x for r in readings for x in (list(r) + [pad] * width)[:width]]
+            values = np.asarray(flat, dtype=column.dtype).reshape(-1, width)
+            cls._copy_sensor(column, rows, values, pad, indices)
+            return
+        width = column.shape[1]
+        if all(len(r) == width for r in readings):
+            flat = [x for r in readings for x in r]
+            column[rows] = np.asarray(flat, dtype=column.dtype).reshape(-1, width)
+            return
+        for i, r in zip(rows, readings, strict=True):
+            k = min(len(r), width)
+            column[i, :k] = r[:k]
+            column[i, k:] = pad
+
+    def decode(
+        self, observations, fields: tuple[str, ...] = FIELDS
+    ) -> ObservationBatch:
+        """Decode an observation map in a single pass.
+
+        Parameters
+        ----------
+        observations : Mapping[str, rl_pb2.Observation] | PackedObservations
+            The observations of a reset or step response.
+        fields : tuple[str, ...], optional (default=FIELDS)
+            The columns to decode; the others keep their previous content.
+
+        Returns
+        -------
+        ObservationBatch
+            Views of the decoded arrays, one row per known agent.
+        """
+        rows = [
+            self.index[agent_id] if agent_id in self.index else self._add(agent_id)
+            for agent_id in observations.keys()
+        ]
+        self._present[:] = False
+        self._present[rows] = True
+        if isinstance(observations, PackedObservations):
+            self._decode_packed(observations, rows, fields)
+        else:
+            self._decode_messages(list(observations.values()), rows, fields)
+        n = len(self.agent_ids)
+        return ObservationBatch(
+            self.agent_ids,
+            self._present[:n],
+            self._proximity[:n],
+            self._light[:n],
+            self._position[:n],
+            self._orientation[:n],
+            self._visited[:n],
+        )
+
+    def _decode_packed(
+        self, packed: PackedObservations, rows: list[int], fields: tuple[str, ...]
+    ) -> None:
+        if "proximity" in fields:
+            self._copy_sensor(
+                self._proximity,
+                rows,
+                packed.proximity,
+                self.PROXIMITY_PAD,
+                self.proximity_indices,
+            )
+        if "light" in fields:
+            self._copy_sensor(
+                self._light, rows, packed.light, self.LIGHT_PAD, self.light_indices
+            )
+        if "visited" in fields:
+            self._copy_sensor(self._visited, rows, packed.visited, self.VISITED_PAD)
+        if "position" in fields:
+            self._position[rows] = packed.position
+        if "orientation" in fields:
+            self._orientation[rows] = packed.orientation
+
+    def _decode_messages(
+        self, values: list, rows: list[int], fields: tuple[str, ...]
+    ) -> None:
+        if "proximity" in fields:
+            readings = [v.proximity_values for v in values]
+            self._decode_sensor(
+                self._proximity,
+                rows,
+                readings,
+                self.PROXIMITY_PAD,
+                self.proximity_indices,
+            )
+        if "light" in fields:
+            readings = [v.light_values for v in values]
+            self._decode_sensor(
+                self._light, rows, readings, self.LIGHT_PAD, self.light_indices
+            )
+        if "visited" in fields:
+            readings = [v.visited_positions for v in values]
+            self._decode_sensor(self._visited, rows, readings, self.VISITED_PAD)
+        if "position" in fields:
+            self._position[rows] = [(v.position.x, v.position.y) for v in values]
+        if "orientation" in fields:
+            self._orientation[rows] = [v.orientation for v in values]
@@ -0,0 +1,77 @@
+import grpc
+
+
+class ReconnectPolicy:
+    """
+    Where and how persistently an environment looks for a simulator when the
+    connection to its own one is lost.
+
+    Every attempt tries the spare endpoints after the lost one, in order, and
+    the lost one last, in case it was restarted; the attempts are separated
+    by an exponential backoff.
+
+    Parameters
+    ----------
+    endpoints : list[str] | None, optional (default=None)
+        The addresses of the spare simulator servers, see `parse_endpoints`.
+        Without them only the lost server is retried. Environments connected
+        through a pool fail over to its endpoints instead.
+    attempts : int, optional (default=5)
+        The number of rounds over the endpoints before giving up.
+    backoff_s : float, optional (default=0.5)
+        Seconds to wait after the first unsuccessful round, doubled after
+        every following one.
+    max_backoff_s : float, optional (default=8.0)
+        Upper bound of the wait between two rounds.
+    connect_timeout_s : float, optional (default=2.0)
+        Seconds to wait for an endpoint to become ready.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[str] | None = None,
+        attempts: int = 5,
+        backoff_s: float = 0.5,
+        max_backoff_s: float = 8.0,
+        connect_timeout_s: float = 2.0,
+    ) -> None:
+        self.endpoints = list(endpoints or ())
+        self.attempts = attempts
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.connect_timeout_s = connect_timeout_s
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before the given attempt, counted from 0."""
+        if attempt == 0:
+            return 0.0
+        return min(self.max_backoff_s, self.backoff_s * 2 ** (attempt - 1))
+
+    def candidates(self, lost: str) -> list[str]:
+        """The addresses to try, in order, after losing `lost`."""
+        if lost not in self.endpoints:
+            return [*self.endpoints, lost]
+        i = self.endpoints.index(lost)
+        return self.endpoints[i + 1 :] + self.endpoints[:i] + [lost]
+
+
+def connection_lost(error: BaseException) -> bool:
+    """Whether a call failed because the simulator could not be reached.
+
+    Parameters
+    ----------
+    error : BaseException
+        The error raised by an `RLClient` call.
+
+    Returns
+    -------
+    bool
+        True for UNAVAILABLE errors, of blocking and asyncio calls alike, and
+        for Step streams closed by the server.
+    """
+    if isinstance(error, ConnectionError):
+        return True
+    return (
+        isinstance(error, (grpc.aio.AioRpcError, grpc.Call))
+        and error.code() == grpc.StatusCode.UNAVAILABLE
+    )
@@ -0,0 +1,42 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+import rl_pb2
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+
+def render_request(width: int, height: int, instance: int) -> rl_pb2.RenderRequest:
+    """A request for uncompressed RGB pixels, skipping the PNG encode and
+    decode; servers that only produce PNG answer with it anyway."""
+    return rl_pb2.RenderRequest(
+        width=width, height=height, instance=instance, format="raw"
+    )
+
+
+def decode_frame(response: rl_pb2.RenderResponse, out: np.ndarray | None) -> np.ndarray:
+    """The RGB frame of a render response, written to `out` if given.
+
+    Without `out` the frame is copied into a new array, since the decoded
+    pixels are a read-only view of the response; callers rendering in a loop
+    pass the previous frame back to skip the allocation.
+    """
+    logger.debug(
+        f"✓ Rendered {response.format} image: {response.width}x{response.height}"
+    )
+    if response.format == "raw":
+        frame = np.frombuffer(response.image, dtype=np.uint8).reshape(
+            response.height, response.width, response.channels
+        )
+    else:
+        image = Image.open(io.BytesIO(response.image))
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        frame = np.asarray(image)
+    if out is None:
+        return frame.copy()
+    np.copyto(out, frame)
+    return out
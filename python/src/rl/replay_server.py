@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Replay server for RPC traces recorded with `RLClient.start_recording`.
+
+It implements the `rl.proto` service by answering every request with the next
+recorded response of the same method and simulation instance, either as fast as
+possible or after the recorded latency. The content of the requests is not
+checked, so the Python side (encoders, agents, trainers) can be benchmarked and
+profiled on a fixed trajectory without the JVM simulator.
+
+How to run:
+python -m rl.replay_server trace.bin --port 50051
+python -m rl.replay_server trace.bin --port 50051 --realtime --loop
+"""
+
+import argparse
+import asyncio
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+import grpc
+
+import rl_pb2
+import rl_pb2_grpc
+from rl.local_server import start_server
+from rl.trace import read_trace
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+
+class ReplayRLServicer(rl_pb2_grpc.RLServicer):
+    """gRPC servicer answering with the responses of a recorded trace.
+
+    Parameters
+    ----------
+    path : str | Path
+        The trace file.
+    realtime : bool, optional (default=False)
+        If True, every response is delayed by its recorded latency.
+    loop : bool, optional (default=False)
+        If True, the responses of a method start over once exhausted, instead
+        of failing the call with OUT_OF_RANGE.
+    """
+
+    def __init__(
+        self, path: str | Path, realtime: bool = False, loop: bool = False
+    ) -> None:
+        self.realtime = realtime
+        self.loop = loop
+        self.responses: dict[tuple[str, int], list[tuple[float, object]]] = defaultdict(
+            list
+        )
+        for record in read_trace(path):
+            self.responses[record.method, record.instance].append(
+                (record.latency_s, record.parse_response())
+            )
+        self._cursors: dict[tuple[str, int], int] = defaultdict(int)
+        logger.info(
+            f"✓ Loaded {sum(map(len, self.responses.values()))} responses from {path}"
+        )
+
+    async def _replay(self, method: str, instance: int, context):
+        key = (method, instance)
+        responses = self.responses.get(key, [])
+        cursor = self._cursors[key]
+        if cursor == len(responses) and self.loop and responses:
+            cursor = 0
+        if cursor == len(responses):
+            await context.abort(
+                grpc.StatusCode.OUT_OF_RANGE,
+                f"No recorded {method} response left for instance {instance}",
+            )
+        self._cursors[key] = cursor + 1
+        latency_s, response = responses[cursor]
+        if self.realtime:
+            await asyncio.sleep(latency_s)
+        return response
+
+    async def Init(self, request, context):  # noqa: N802
+        return await self._replay("Init", request.instance, context)
+
+    async def Reset(self, request, context):  # noqa: N802
+        return await self._replay("Reset", request.instance, context)
+
+    async def RegisterConfig(self, request, context):  # noqa: N802
+        return await self._replay("RegisterConfig", 0, context)
+
+    async def InitReset(self, request, context):  # noqa: N802
+        return await self._replay("InitReset", request.instance, context)
+
+    async def Snapshot(self, request, context):  # noqa: N802
+        return await self._replay("Snapshot", request.instance, context)
+
+    async def Restore(self, request, context):  # noqa: N802
+        return await self._replay("Restore", request.instance, context)
+
+    async def ReleaseSnapshots(self, request, context):  # noqa: N802
+        return await self._replay("ReleaseSnapshots", 0, context)
+
+    async def AttachSharedMemory(self, request, context):  # noqa: N802
+        # recorded steps are replayed over gRPC, see `RLClient.step`
+        return rl_pb2.SharedMemoryResponse(
+            ok=False, message="Replayed traces are served over gRPC"
+        )
+
+    async def Step(self, request, context):  # noqa: N802
+        return await self._replay("Step", request.instance, context)
+
+    async def StepBatch(self, request, context):  # noqa: N802
+        return await self._replay("StepBatch", 0, context)
+
+    async def StepStream(self, request_iterator, context):  # noqa: N802
+        async for request in request_iterator:
+            yield await self._replay("Step", request.instance, context)
+
+    async def Render(self, request, context):  # noqa: N802
+        return await self._replay("Render", request.instance, context)
+
+    async def Close(self, request, context):  # noqa: N802
+        return rl_pb2.CloseResponse(ok=True)
+
+
+async def _serve(address: str, servicer: ReplayRLServicer) -> None:
+    server = await start_server(address, servicer)
+    await server.wait_for_termination()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Replay server for recorded RPC traces.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("trace", type=str, help="Trace file to replay.")
+    p.add_argument("--host", type=str, default="localhost", help="Host to bind.")
+    p.add_argument("--port", type=int, default=50051, help="Port to bind.")
+    p.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Delay every response by its recorded latency.",
+    )
+    p.add_argument(
+        "--loop",
+        action="store_true",
+        help="Start over once the recorded responses are exhausted.",
+    )
+    args = p.parse_args()
+    servicer = ReplayRLServicer(args.trace, realtime=args.realtime, loop=args.loop)
+    asyncio.run(_serve(f"{args.host}:{args.port}", servicer))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
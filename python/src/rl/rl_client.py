@@ -1,12 +1,22 @@
 import asyncio
-import io
+import hashlib
+import time
+from pathlib import Path
 
 import grpc
 import numpy as np
-from PIL import Image
 
 import rl_pb2
 import rl_pb2_grpc
+from rl.action_table import EncodedActions
+from rl.encoded_step import EncodedStepRequest, encoded_step_rpc, step_template
+from rl.metrics import DEFAULT_METRICS, RPCMetrics, RPCStats
+from rl.render import decode_frame, render_request
+from rl.shm_transport import SharedMemoryRing
+from rl.step_result import accumulate, done, unpack_step
+from rl.sync_transport import SyncTransport
+from rl.trace import TraceWriter
+from rl.visited_delta import advance_grids, reset_grids
 from utils.log import Logger
 
 logger = Logger(__name__)
@@ -15,45 +25,435 @@ logger = Logger(__name__)
 class RLClient:
     """Client for bidirectional RL communication with gRPC server"""
 
-    def __init__(self, server_address: str, client_name: str):
+    def __init__(
+        self,
+        server_address: str,
+        client_name: str,
+        instance: int = 0,
+        channel: grpc.aio.Channel | None = None,
+        metrics: RPCMetrics | None = None,
+        shared_memory: bool = False,
+        shared_memory_slots: int = 4,
+        packed_steps: bool = False,
+        sync_transport: bool = False,
+    ):
         self.server_address = server_address
         self.client_name = client_name
-        self.channel = None
-        self.stub = None
+        self.instance = instance
+        self.channel = channel
+        self.stub = rl_pb2_grpc.RLStub(channel) if channel is not None else None
+        self._encoded_step = encoded_step_rpc(channel) if channel is not None else None
+        # serialized StepRequest fields but actions, by (instance, packed, repeat)
+        self._step_templates = {}
+        self.step_stream = None
+        self._step_stream_lock = asyncio.Lock()
+        self.trace = None
+        # per-method latency, payload and error counters of this endpoint
+        self.metrics = metrics if metrics is not None else DEFAULT_METRICS
+        self._rpc_stats = {}
+        # handles of the configs already registered on the server
+        self._registered_configs = set()
+        # steps go through a shared memory ring once a reset gives the agents
+        self.shared_memory = shared_memory
+        self.shared_memory_slots = shared_memory_slots
+        self.ring = None
+        # ask for float32 blobs instead of per-agent step maps
+        self.packed_steps = packed_steps
+        # `VisitedGrid` of the agents of every instance, in visited delta mode
+        self.visited_grids: dict[int, dict] = {}
+        # a channel passed in is shared, e.g. by a pool, and closed by its owner
+        self._owns_channel = channel is None
+        # opt-in blocking channel of the `*_sync` calls, opened on first use
+        self.sync_transport = sync_transport
+        self.sync = SyncTransport(server_address)
 
-    async def connect(self):
-        """Establish connection to the server"""
-        self.channel = grpc.aio.insecure_channel(self.server_address)
-        self.stub = rl_pb2_grpc.RLStub(self.channel)
+    async def connect(self, timeout: float = 5.0):
+        """Establish connection to the server, waiting up to `timeout` seconds"""
+        if self._owns_channel:
+            self.channel = grpc.aio.insecure_channel(self.server_address)
+            self.stub = rl_pb2_grpc.RLStub(self.channel)
+            self._encoded_step = encoded_step_rpc(self.channel)
 
         # Test connection
-        await asyncio.wait_for(self.channel.channel_ready(), timeout=5.0)
+        await asyncio.wait_for(self.channel.channel_ready(), timeout=timeout)
         logger.info(f"✓ Connected to {self.server_address}\n")
 
     async def close(self):
         """Close the connection"""
-        if self.channel:
+        await self.close_step_stream()
+        self.stop_recording()
+        self.detach_shared_memory()
+        self.sync.close()
+        if self.channel and self._owns_channel:
             logger.info(f"✓ Closed connection to {self.server_address}")
             await self.channel.close()
 
-    async def init(self, yaml_config: str) -> tuple[bool, str | None]:
+    def start_recording(self, path: str | Path):
+        """
+        Record every call to the simulator, e.g. Init, Reset and Step, with its
+        timing, to a binary trace file that `rl.replay_server` can serve.
+        Args:
+            path: trace file, overwritten if it exists
+        """
+        self.stop_recording()
+        self.trace = TraceWriter(path)
+        logger.info(f"✓ Recording RPC trace to {path}")
+
+    def stop_recording(self):
+        """Stop recording and close the trace file, if any."""
+        if self.trace is not None:
+            trace, self.trace = self.trace, None
+            trace.close()
+            logger.info(f"✓ Recorded {trace.records} calls to {trace.path}")
+
+    @property
+    def sync_ready(self) -> bool:
+        """Whether the `*_sync` calls can serve this client: it opted into
+        `sync_transport`, and they go through a blocking channel, without the
+        event loop, so they do not drive the shared memory ring or the Step
+        stream."""
+        return (
+            self.sync_transport and not self.shared_memory and self.step_stream is None
+        )
+
+    def _stats(self, method: str) -> RPCStats:
+        stats = self._rpc_stats.get(method)
+        if stats is None:
+            stats = self._rpc_stats[method] = self.metrics.get(
+                self.server_address, method
+            )
+        return stats
+
+    def _record(
+        self, method: str, stats: RPCStats, start: float, request, response
+    ) -> None:
+        latency_s = time.perf_counter() - start
+        stats.record(latency_s, request.ByteSize(), response.ByteSize())
+        if self.trace is not None:
+            instance = getattr(request, "instance", 0)
+            self.trace.write(method, instance, start, latency_s, request, response)
+
+    async def _call(self, method: str, rpc, request):
+        stats = self._stats(method)
+        start = time.perf_counter()
+        try:
+            response = await rpc(request)
+        except Exception as e:
+            stats.record_error(e)
+            raise
+        self._record(method, stats, start, request, response)
+        return response
+
+    def _call_sync(self, method: str, rpc, request):
+        """`_call` of a blocking stub method."""
+        stats = self._stats(method)
+        start = time.perf_counter()
+        try:
+            response = rpc(request)
+        except Exception as e:
+            stats.record_error(e)
+            raise
+        self._record(method, stats, start, request, response)
+        return response
+
+    async def open_step_stream(self):
+        """
+        Open a long-lived bidirectional Step stream.
+        While it is open, `step` sends its requests on the stream instead of
+        issuing one unary call each, falling back to unary calls if the server
+        does not implement streaming.
+        """
+        if self.step_stream is None:
+            self.step_stream = self.stub.StepStream()
+            logger.debug("✓ Step stream opened")
+
+    async def close_step_stream(self):
+        """Half-close the Step stream, if open, and go back to unary calls."""
+        if self.step_stream is not None:
+            stream, self.step_stream = self.step_stream, None
+            await stream.done_writing()
+            logger.debug("✓ Step stream closed")
+
+    async def _stream_step(self, request: rl_pb2.StepRequest) -> rl_pb2.StepResponse:
+        async with self._step_stream_lock:
+            try:
+                await self.step_stream.write(request)
+                response = await self.step_stream.read()
+            except grpc.aio.AioRpcError as e:
+                if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                    raise
+                logger.warning("✗ Step stream not supported, using unary steps")
+                self.step_stream = None
+                return await self.stub.Step(request)
+        if response is grpc.aio.EOF:
+            self.step_stream = None
+            raise ConnectionError("Step stream closed by the server")
+        return response
+
+    async def attach_shared_memory(self, observations) -> bool:
+        """
+        Create a shared memory ring for the agents of a reset and ask the
+        server to serve the steps of this client's instance through it.
+        Args:
+            observations: observations of the reset, giving the agents and
+                the observation layout
+        Returns:
+            Whether the server attached; if not, steps keep using gRPC
+        """
+        self.detach_shared_memory()
+        ring = SharedMemoryRing.for_observations(self.shared_memory_slots, observations)
+        request = rl_pb2.SharedMemoryRequest(
+            name=ring.name,
+            slots=ring.slots,
+            agent_ids=ring.agent_ids,
+            num_proximity=ring.num_proximity,
+            num_light=ring.num_light,
+            num_visited=ring.num_visited,
+            instance=self.instance,
+        )
+        try:
+            response = await self._call(
+                "AttachSharedMemory", self.stub.AttachSharedMemory, request
+            )
+        except grpc.aio.AioRpcError as e:
+            if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                ring.close()
+                raise
+            response = rl_pb2.SharedMemoryResponse(ok=False, message=e.details())
+        if not response.ok:
+            ring.close()
+            logger.warning(
+                f"✗ Shared memory not supported, using gRPC steps: {response.message}"
+            )
+            self.shared_memory = False
+            return False
+        ring.connect()
+        self.ring = ring
+        logger.debug(f"✓ Steps go through shared memory {ring.name}")
+        return True
+
+    def detach_shared_memory(self):
+        """Close the shared memory ring, if any, and go back to gRPC steps."""
+        if self.ring is not None:
+            ring, self.ring = self.ring, None
+            ring.close()
+
+    async def _sync_shared_memory(self, observations, instance: int | None) -> None:
+        if not self.shared_memory or self._instance(instance) != self.instance:
+            return
+        if self.ring is None or self.ring.agent_ids != list(observations.keys()):
+            await self.attach_shared_memory(observations)
+
+    def _sync_visited(self, observations, instance: int | None) -> None:
+        """Keep the visited grids of a reset and fill in the neighbourhoods."""
+        self.visited_grids[self._instance(instance)] = reset_grids(observations)
+
+    def _advance_visited(self, response, observations, instance: int | None) -> None:
+        """Move the visited grids by the cells of a step, in visited delta mode."""
+        grids = self.visited_grids.get(self._instance(instance))
+        if grids:
+            advance_grids(grids, response, observations)
+
+    async def _shm_step(self, actions: dict) -> tuple:
+        ring = self.ring
+        stats = self._stats("StepShm")
+        wheels = ring.wheels(actions)
+        start = time.perf_counter()
+        try:
+            seq = ring.submit(wheels)
+            observations, rewards, terminateds, truncateds = await ring.wait(seq)
+        except Exception as e:
+            stats.record_error(e)
+            raise
+        stats.record(time.perf_counter() - start, wheels.nbytes, ring.response_nbytes)
+        agent_ids = ring.agent_ids
+        return (
+            observations,
+            dict(zip(agent_ids, rewards.tolist(), strict=True)),
+            dict(zip(agent_ids, terminateds.tolist(), strict=True)),
+            dict(zip(agent_ids, truncateds.tolist(), strict=True)),
+            dict.fromkeys(agent_ids, ""),
+        )
+
+    def _instance(self, instance: int | None) -> int:
+        return self.instance if instance is None else instance
+
+    async def init(
+        self,
+        yaml_config: str,
+        instance: int | None = None,
+        mask: rl_pb2.ObservationMask | None = None,
+        encoder: rl_pb2.EncoderSpec | None = None,
+    ) -> tuple[bool, str | None]:
         """
         Initialize the simulation environment.
         Args:
             yaml_config: YAML configuration string
+            instance: simulation instance to address, defaults to the client's one
+            mask: observation fields and sensors to receive until the next
+                init, all of them if None. With `visited_delta` the visited
+                cells are kept in `visited_grids` and only the cell of every
+                agent is sent on steps; the observations returned still have
+                their `visited_positions`
+            encoder: discrete state the server adds to every observation
+                until the next init, as `state`, none if None
         Returns:
             Tuple of (success, error_message)
         """
-        request = rl_pb2.InitRequest(config=yaml_config)
-        response = await self.stub.Init(request)
-        if response.ok:
-            logger.debug("✓ Initialization successful")
-        else:
-            logger.warning(f"✗ Initialization failed: {response.message}")
-        return response.ok, response.message
+        request = rl_pb2.InitRequest(
+            config=yaml_config,
+            instance=self._instance(instance),
+            mask=mask,
+            encoder=encoder,
+        )
+        return _init_result(await self._call("Init", self.stub.Init, request))
+
+    def init_sync(
+        self,
+        yaml_config: str,
+        instance: int | None = None,
+        mask: rl_pb2.ObservationMask | None = None,
+        encoder: rl_pb2.EncoderSpec | None = None,
+    ) -> tuple[bool, str | None]:
+        """Blocking `init` through the sync transport, see `sync_ready`."""
+        request = rl_pb2.InitRequest(
+            config=yaml_config,
+            instance=self._instance(instance),
+            mask=mask,
+            encoder=encoder,
+        )
+        return _init_result(self._call_sync("Init", self.sync.open().Init, request))
+
+    async def register_config(self, yaml_config: str) -> str:
+        """
+        Upload a configuration once, so that `init_reset` can refer to it.
+        Args:
+            yaml_config: YAML configuration string
+        Returns:
+            The handle of the configuration, see `config_handle`
+        Raises:
+            ValueError: if the server rejects the configuration
+        """
+        request = rl_pb2.RegisterConfigRequest(config=yaml_config)
+        response = await self._call("RegisterConfig", self.stub.RegisterConfig, request)
+        if not response.ok:
+            raise ValueError(f"Invalid configuration: {response.message}")
+        self._registered_configs.add(response.handle)
+        logger.debug(f"✓ Registered config {response.handle[:12]}")
+        return response.handle
+
+    async def init_reset(
+        self,
+        yaml_config: str,
+        seed: int,
+        instance: int | None = None,
+        mask: rl_pb2.ObservationMask | None = None,
+        encoder: rl_pb2.EncoderSpec | None = None,
+    ) -> tuple[dict[str, dict], dict[str, str]]:
+        """
+        Re-initialize the simulation with a configuration and reset it in a
+        single round trip. The configuration is uploaded only the first time,
+        and then referred to by its content hash. Servers without the
+        InitReset call get a separate Init and Reset.
+        Args:
+            yaml_config: YAML configuration string
+            seed: integer seed for reproducibility
+            instance: simulation instance to address, defaults to the client's one
+            mask: observation fields and sensors to receive, see `init`
+            encoder: discrete state to receive, see `init`
+        Returns:
+            Tuple of (observations, infos)
+        """
+        handle = config_handle(yaml_config)
+        request = rl_pb2.InitResetRequest(
+            handle=handle,
+            seed=seed,
+            instance=self._instance(instance),
+            mask=mask,
+            encoder=encoder,
+        )
+        try:
+            if handle not in self._registered_configs:
+                await self.register_config(yaml_config)
+            response = await self._call("InitReset", self.stub.InitReset, request)
+        except grpc.aio.AioRpcError as e:
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                # the server forgot the config, e.g. after a restart
+                await self.register_config(yaml_config)
+                response = await self._call("InitReset", self.stub.InitReset, request)
+            elif e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                ok, message = await self.init(yaml_config, instance, mask, encoder)
+                if not ok:
+                    raise ValueError(f"Invalid configuration: {message}") from e
+                return await self.reset(seed, instance)
+            else:
+                raise
+        if logger.debug_enabled():
+            logger.debug(
+                f"✓ Environment re-initialized and reset: observations={response.observations}, infos={response.infos}"
+            )
+        self._sync_visited(response.observations, instance)
+        await self._sync_shared_memory(response.observations, instance)
+        return response.observations, response.infos
+
+    async def snapshot(self, instance: int | None = None) -> str:
+        """
+        Save the current simulation state on the server, mid-episode included.
+        Args:
+            instance: simulation instance to address, defaults to the client's one
+        Returns:
+            The id of the saved state, for `restore` and `release_snapshots`
+        """
+        request = rl_pb2.SnapshotRequest(instance=self._instance(instance))
+        response = await self._call("Snapshot", self.stub.Snapshot, request)
+        logger.debug(f"✓ Saved snapshot {response.snapshot_id}")
+        return response.snapshot_id
+
+    async def restore(
+        self, snapshot_id: str, instance: int | None = None
+    ) -> tuple[dict[str, dict], dict[str, str]]:
+        """
+        Continue the simulation from a saved state, instead of replaying
+        Init, Reset and the steps that led to it. The state stays saved, so it
+        can be restored any number of times.
+        Args:
+            snapshot_id: id returned by `snapshot`
+            instance: simulation instance to address, defaults to the client's one
+        Returns:
+            Tuple of (observations, infos) in the saved state
+        Raises:
+            grpc.aio.AioRpcError: NOT_FOUND if the snapshot was released or
+                the server restarted
+        """
+        request = rl_pb2.RestoreRequest(
+            snapshot_id=snapshot_id, instance=self._instance(instance)
+        )
+        response = await self._call("Restore", self.stub.Restore, request)
+        if logger.debug_enabled():
+            logger.debug(
+                f"✓ Snapshot {snapshot_id} restored: observations={response.observations}, infos={response.infos}"
+            )
+        self._sync_visited(response.observations, instance)
+        await self._sync_shared_memory(response.observations, instance)
+        return response.observations, response.infos
+
+    async def release_snapshots(self, snapshot_ids: list[str]) -> int:
+        """
+        Free the server memory held by saved states.
+        Args:
+            snapshot_ids: ids returned by `snapshot`, unknown ones are ignored
+        Returns:
+            The number of states actually released
+        """
+        request = rl_pb2.ReleaseSnapshotsRequest(snapshot_ids=snapshot_ids)
+        response = await self._call(
+            "ReleaseSnapshots", self.stub.ReleaseSnapshots, request
+        )
+        logger.debug(f"✓ Released {response.released} snapshots")
+        return response.released
 
     async def step(
-        self, actions: dict[str, dict]
+        self, actions: dict[str, dict], instance: int | None = None, repeat: int = 1
     ) -> tuple[
         dict[str, dict],
         dict[str, float],
@@ -64,54 +464,243 @@ class RLClient:
         """
         Take a simulation step with the provided actions.
         Args:
-            actions: Dictionary mapping agent IDs to their action dictionaries
+            actions: Dictionary mapping agent IDs to their action dictionaries,
+                or `EncodedActions` of an `ActionTable`, sent already serialized
+            instance: simulation instance to address, defaults to the client's one
+            repeat: ticks to apply the actions for, stopping after a tick
+                where an agent is terminated or truncated. The server repeats
+                them in a single call; with servers that do not, and over
+                shared memory, the ticks are stepped one call each
         Returns:
-            Tuple of (observations, rewards, terminateds, truncateds, infos)
+            Tuple of (observations, rewards, terminateds, truncateds, infos),
+            the observations of the last tick with the rewards summed and the
+            flags OR-ed over the ticks
         """
-        request = rl_pb2.StepRequest(actions=actions)
-        response = await self.stub.Step(request)
-        logger.debug(
-            f"✓ Step taken: observations={response.observations}, rewards={response.rewards}, terminateds={response.terminateds}, truncateds={response.truncateds}, infos={response.infos}"
+        step, ticks = await self._step(actions, instance, repeat)
+        while ticks < repeat and not done(step):
+            step = accumulate(step, (await self._step(actions, instance, 1))[0])
+            ticks += 1
+        return step
+
+    def step_sync(
+        self, actions: dict[str, dict], instance: int | None = None, repeat: int = 1
+    ) -> tuple[
+        dict[str, dict],
+        dict[str, float],
+        dict[str, bool],
+        dict[str, bool],
+        dict[str, str],
+    ]:
+        """Blocking `step` through the sync transport, see `sync_ready`."""
+        step, ticks = self._step_sync(actions, instance, repeat)
+        while ticks < repeat and not done(step):
+            step = accumulate(step, self._step_sync(actions, instance, 1)[0])
+            ticks += 1
+        return step
+
+    async def _step(
+        self, actions: dict[str, dict], instance: int | None, repeat: int
+    ) -> tuple[tuple, int]:
+        """One step call, with the number of ticks the server applied."""
+        if (
+            self.ring is not None
+            and self.trace is None
+            and self._instance(instance) == self.instance
+        ):
+            return await self._shm_step(actions), 1
+        request = self._step_request(actions, instance, repeat)
+        if isinstance(request, EncodedStepRequest):
+            rpc = self._encoded_step
+        elif self.step_stream is not None:
+            rpc = self._stream_step
+        else:
+            rpc = self.stub.Step
+        return self._stepped(await self._call("Step", rpc, request), instance)
+
+    def _step_sync(
+        self, actions: dict[str, dict], instance: int | None, repeat: int
+    ) -> tuple[tuple, int]:
+        stub = self.sync.open()
+        request = self._step_request(actions, instance, repeat)
+        if isinstance(request, EncodedStepRequest):
+            rpc = self.sync.encoded_step
+        else:
+            rpc = stub.Step
+        return self._stepped(self._call_sync("Step", rpc, request), instance)
+
+    def _step_request(
+        self, actions: dict[str, dict], instance: int | None, repeat: int
+    ):
+        """The request of a step, already serialized for `EncodedActions`
+        unless it goes through the Step stream."""
+        if isinstance(actions, EncodedActions) and self.step_stream is None:
+            return EncodedStepRequest(
+                actions.payload + self._step_template(instance, repeat),
+                self._instance(instance),
+            )
+        if isinstance(actions, EncodedActions):
+            actions = actions.messages
+        return rl_pb2.StepRequest(
+            actions=actions,
+            instance=self._instance(instance),
+            packed=self.packed_steps,
+            repeat=repeat,
         )
-        return (
-            response.observations,
-            response.rewards,
-            response.terminateds,
-            response.truncateds,
-            response.infos,
+
+    def _stepped(
+        self, response: rl_pb2.StepResponse, instance: int | None
+    ) -> tuple[tuple, int]:
+        """The step tuple of a response, with the number of ticks applied."""
+        if logger.debug_enabled():
+            logger.debug(
+                f"✓ Step taken: observations={response.observations}, rewards={response.rewards}, terminateds={response.terminateds}, truncateds={response.truncateds}, infos={response.infos}"
+            )
+        step = unpack_step(response)
+        self._advance_visited(response, step[0], instance)
+        return step, max(response.ticks, 1)
+
+    def _step_template(self, instance: int | None, repeat: int) -> bytes:
+        """The fields of a StepRequest but the actions, serialized once."""
+        key = (self._instance(instance), self.packed_steps, repeat)
+        template = self._step_templates.get(key)
+        if template is None:
+            template = self._step_templates[key] = step_template(*key)
+        return template
+
+    async def step_batch(
+        self, actions: dict[int, dict[str, dict]], repeat: int = 1
+    ) -> dict[
+        int,
+        tuple[
+            dict[str, dict],
+            dict[str, float],
+            dict[str, bool],
+            dict[str, bool],
+            dict[str, str],
+        ],
+    ]:
+        """
+        Take a simulation step on several instances in a single round trip.
+        The Scala server hosts only instance 0, so against it the batch holds
+        a single step; several instances need the local stand-in.
+        Args:
+            actions: Dictionary mapping instance indices to the agents' actions
+            repeat: ticks to apply the actions for on every instance, see `step`
+        Returns:
+            Dictionary mapping instance indices to
+            (observations, rewards, terminateds, truncateds, infos)
+        """
+        steps = await self._step_batch(actions, repeat)
+        while pending := {
+            i: actions[i]
+            for i, (step, ticks) in steps.items()
+            if ticks < repeat and not done(step)
+        }:
+            for i, (step, _) in (await self._step_batch(pending, 1)).items():
+                steps[i] = accumulate(steps[i][0], step), steps[i][1] + 1
+        return {i: step for i, (step, _) in steps.items()}
+
+    async def _step_batch(
+        self, actions: dict[int, dict[str, dict]], repeat: int
+    ) -> dict[int, tuple[tuple, int]]:
+        """One StepBatch call, with the number of ticks applied per instance."""
+        request = rl_pb2.StepBatchRequest(
+            steps=[
+                rl_pb2.StepRequest(
+                    actions=a.messages if isinstance(a, EncodedActions) else a,
+                    instance=i,
+                    packed=self.packed_steps,
+                    repeat=repeat,
+                )
+                for i, a in actions.items()
+            ]
         )
+        response = await self._call("StepBatch", self.stub.StepBatch, request)
+        logger.debug(f"✓ Batch step taken on {len(response.steps)} instances")
+        steps = {}
+        for i, step in zip(actions.keys(), response.steps, strict=True):
+            steps[i] = unpack_step(step), max(step.ticks, 1)
+            self._advance_visited(step, steps[i][0][0], i)
+        return steps
 
-    async def render(self, width: int = 800, height: int = 600) -> np.ndarray:
+    async def render(
+        self,
+        width: int = 800,
+        height: int = 600,
+        instance: int | None = None,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
         """
         Render the current environment state.
+        Uncompressed RGB pixels are requested, skipping the PNG encode and
+        decode; servers that only produce PNG are still supported.
         Args:
             width: Image width in pixels
             height: Image height in pixels
+            instance: simulation instance to address, defaults to the client's one
+            out: uint8 array of shape (height, width, 3) the frame is written
+                to; without it every call copies the frame into a new array
         Returns:
-            Numpy array of the rendered RGB image
+            Numpy array of the rendered RGB image, `out` if given
         """
-        request = rl_pb2.RenderRequest(width=width, height=height)
-        response = await self.stub.Render(request)
-        logger.debug(
-            f"✓ Rendered {response.format} image: {response.width}x{response.height}"
-        )
+        request = render_request(width, height, self._instance(instance))
+        response = await self._call("Render", self.stub.Render, request)
+        return decode_frame(response, out)
 
-        image = Image.open(io.BytesIO(response.image))
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-        return np.array(image)
+    def render_sync(
+        self,
+        width: int = 800,
+        height: int = 600,
+        instance: int | None = None,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Blocking `render` through the sync transport, see `sync_ready`."""
+        request = render_request(width, height, self._instance(instance))
+        response = self._call_sync("Render", self.sync.open().Render, request)
+        return decode_frame(response, out)
 
-    async def reset(self, seed: int) -> tuple[dict[str, dict], dict[str, str]]:
+    async def reset(
+        self, seed: int, instance: int | None = None
+    ) -> tuple[dict[str, dict], dict[str, str]]:
         """
         Reset the simulation environment with a specific seed.
         Args:
             seed: integer seed for reproducibility
+            instance: simulation instance to address, defaults to the client's one
         Returns:
             Tuple of (observations, infos)
         """
-        request = rl_pb2.ResetRequest(seed=seed)
-        response = await self.stub.Reset(request)
-        logger.debug(
-            f"✓ Environment reset: observations={response.observations}, infos={response.infos}"
-        )
+        request = rl_pb2.ResetRequest(seed=seed, instance=self._instance(instance))
+        response = await self._call("Reset", self.stub.Reset, request)
+        self._reset_done(response, instance)
+        await self._sync_shared_memory(response.observations, instance)
+        return response.observations, response.infos
+
+    def reset_sync(
+        self, seed: int, instance: int | None = None
+    ) -> tuple[dict[str, dict], dict[str, str]]:
+        """Blocking `reset` through the sync transport, see `sync_ready`."""
+        request = rl_pb2.ResetRequest(seed=seed, instance=self._instance(instance))
+        response = self._call_sync("Reset", self.sync.open().Reset, request)
+        self._reset_done(response, instance)
         return response.observations, response.infos
+
+    def _reset_done(self, response: rl_pb2.ResetResponse, instance: int | None) -> None:
+        if logger.debug_enabled():
+            logger.debug(
+                f"✓ Environment reset: observations={response.observations}, infos={response.infos}"
+            )
+        self._sync_visited(response.observations, instance)
+
+
+def config_handle(yaml_config: str) -> str:
+    """Content hash identifying a configuration: hex SHA-256 of its UTF-8 bytes."""
+    return hashlib.sha256(yaml_config.encode("utf-8")).hexdigest()
+
+
+def _init_result(response: rl_pb2.InitResponse) -> tuple[bool, str | None]:
+    if response.ok:
+        logger.debug("✓ Initialization successful")
+    else:
+        logger.warning(f"✗ Initialization failed: {response.message}")
+    return response.ok, response.message
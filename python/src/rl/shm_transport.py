@@ -0,0 +1,355 @@
+import asyncio
+import contextlib
+import socket
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from rl.action_table import EncodedActions
+from rl.observation_batch import PackedObservations
+
+# control words at the start of the segment, the first one is the closed flag
+CONTROL_WORDS = 8
+REQUEST, RESPONSE = 0, 1
+DOORBELL = b"\x01"
+
+
+def _doorbell_path(name: str, side: str) -> str:
+    return str(Path(tempfile.gettempdir()) / f"{name.lstrip('/')}.{side}")
+
+
+class SharedMemoryRing:
+    """
+    Ring buffer of step slots in a shared memory segment.
+
+    It carries the steps of one simulation instance between a client and a
+    simulator on the same host, while gRPC stays the control channel. Every
+    slot holds fixed-layout float32 rows, one per agent in `agent_ids` order:
+    the (left, right) wheel actions, NaN for no action, and the response with
+    the observation, the reward and the terminated and truncated flags.
+
+    The segment starts with `CONTROL_WORDS` int64 words, the first one set
+    when the client closes the ring, then one (request, response) int64
+    sequence pair per slot, followed by the action, observation, reward and
+    flag arrays of all the slots. Step `seq` uses slot `seq % slots`, and
+    each side publishes a slot by writing its sequence number last, then
+    rings the other side through a Unix datagram socket, so neither side
+    spins while waiting and the payload never goes through the kernel.
+
+    Parameters
+    ----------
+    shm : shared_memory.SharedMemory
+        The segment, sized with `size`.
+    slots : int
+        Number of slots, the maximum number of steps in flight.
+    agent_ids : list[str]
+        The agent IDs, in row order.
+    num_proximity, num_light, num_visited : int
+        Widths of the observation fields.
+    owner : bool
+        Whether this side created the segment and unlinks it on `close`.
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        slots: int,
+        agent_ids: list[str],
+        num_proximity: int,
+        num_light: int,
+        num_visited: int,
+        owner: bool,
+    ) -> None:
+        self.shm = shm
+        self.doorbell = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.doorbell.setblocking(False)
+        self._doorbell_path = _doorbell_path(shm.name, "client" if owner else "server")
+        self.doorbell.bind(self._doorbell_path)
+        self.slots = slots
+        self.agent_ids = list(agent_ids)
+        self.rows = {agent_id: i for i, agent_id in enumerate(self.agent_ids)}
+        self.num_proximity = num_proximity
+        self.num_light = num_light
+        self.num_visited = num_visited
+        self.owner = owner
+        n = len(self.agent_ids)
+        width = self.observation_width(num_proximity, num_light, num_visited)
+        offset = 0
+
+        def view(dtype, shape):
+            nonlocal offset
+            array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            offset += array.nbytes
+            return array
+
+        self.control = view(np.int64, (CONTROL_WORDS,))
+        self.seqs = view(np.int64, (slots, 2))
+        self.actions = view(np.float32, (slots, n, 2))
+        self.observations = view(np.float32, (slots, n, width))
+        self.rewards = view(np.float32, (slots, n))
+        self.flags = view(np.float32, (slots, n, 2))
+        self._next_seq = 1
+        self._acked = 0
+        # a single reader of the doorbell at a time, see `wait`
+        self._waiting = asyncio.Lock()
+
+    @staticmethod
+    def observation_width(num_proximity: int, num_light: int, num_visited: int) -> int:
+        """Floats per observation row: sensors, x, y, orientation, visited."""
+        return num_proximity + num_light + 3 + num_visited
+
+    @classmethod
+    def size(
+        cls,
+        slots: int,
+        num_agents: int,
+        num_proximity: int,
+        num_light: int,
+        num_visited: int,
+    ) -> int:
+        """Bytes of a segment with the given layout."""
+        width = cls.observation_width(num_proximity, num_light, num_visited)
+        floats = slots * num_agents * (2 + width + 1 + 2)
+        return 8 * (CONTROL_WORDS + 2 * slots) + 4 * floats
+
+    @classmethod
+    def create(
+        cls,
+        slots: int,
+        agent_ids: list[str],
+        num_proximity: int = 8,
+        num_light: int = 8,
+        num_visited: int = 25,
+    ) -> "SharedMemoryRing":
+        """Create a new zeroed segment, on the client side."""
+        size = cls.size(slots, len(agent_ids), num_proximity, num_light, num_visited)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        return cls(shm, slots, agent_ids, num_proximity, num_light, num_visited, True)
+
+    @classmethod
+    def attach(
+        cls,
+        name: str,
+        slots: int,
+        agent_ids: list[str],
+        num_proximity: int,
+        num_light: int,
+        num_visited: int,
+    ) -> "SharedMemoryRing":
+        """Attach to a segment created by the client, on the simulator side.
+
+        Raises
+        ------
+        FileNotFoundError
+            If there is no segment with this name.
+        ValueError
+            If the segment is smaller than the layout.
+        """
+        shm = shared_memory.SharedMemory(name=name)
+        # the client owns the segment: keep the tracker from unlinking it at exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        size = cls.size(slots, len(agent_ids), num_proximity, num_light, num_visited)
+        if shm.size < size:
+            shm.close()
+            raise ValueError(f"Segment {name} has {shm.size} bytes, {size} needed")
+        ring = cls(shm, slots, agent_ids, num_proximity, num_light, num_visited, False)
+        ring.doorbell.connect(_doorbell_path(name, "client"))
+        return ring
+
+    @classmethod
+    def for_observations(cls, slots: int, observations) -> "SharedMemoryRing":
+        """Create a segment for the agents and the observation layout of a
+        reset, on the client side."""
+        first = next(iter(observations.values()))
+        return cls.create(
+            slots,
+            list(observations.keys()),
+            len(first.proximity_values),
+            len(first.light_values),
+            len(first.visited_positions),
+        )
+
+    def connect(self) -> None:
+        """Connect the client doorbell, once the simulator has attached."""
+        self.doorbell.connect(_doorbell_path(self.shm.name, "server"))
+
+    def _ring(self) -> None:
+        # a full socket buffer already holds a wake-up for the other side
+        with contextlib.suppress(OSError):
+            self.doorbell.send(DOORBELL)
+
+    async def _wait_doorbell(self, timeout: float | None = None) -> None:
+        loop = asyncio.get_running_loop()
+        await asyncio.wait_for(loop.sock_recv(self.doorbell, 64), timeout)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def closed(self) -> bool:
+        return bool(self.control[0])
+
+    def close(self) -> None:
+        """Release the segment; the owner also flags it closed and unlinks it."""
+        if self.owner:
+            self.control[0] = 1
+            self._ring()
+        self.doorbell.close()
+        Path(self._doorbell_path).unlink(missing_ok=True)
+        del self.control, self.seqs, self.actions
+        del self.observations, self.rewards, self.flags
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    # client side
+
+    def submit(self, actions: np.ndarray) -> int:
+        """Write the actions of the next step to its slot and publish it.
+
+        Parameters
+        ----------
+        actions : np.ndarray
+            Array of shape (n_agents, 2) with the wheel actions.
+
+        Returns
+        -------
+        int
+            The sequence number to pass to `wait`.
+
+        Raises
+        ------
+        RuntimeError
+            If all the slots are in flight.
+        """
+        seq = self._next_seq
+        if seq - self._acked > self.slots:
+            raise RuntimeError(f"All the {self.slots} slots are in flight")
+        slot = seq % self.slots
+        self.actions[slot] = actions
+        self.seqs[slot, REQUEST] = seq
+        self._next_seq = seq + 1
+        self._ring()
+        return seq
+
+    async def wait(
+        self, seq: int, timeout: float = 10.0
+    ) -> tuple[PackedObservations, np.ndarray, np.ndarray, np.ndarray]:
+        """Wait for the response of a step, without blocking the event loop.
+
+        The steps in flight can be waited for concurrently, e.g. from several
+        tasks; the waiters read the doorbell one at a time.
+
+        Parameters
+        ----------
+        seq : int
+            The sequence number returned by `submit`.
+        timeout : float, optional (default=10.0)
+            Seconds to wait for the simulator.
+
+        Returns
+        -------
+        tuple[PackedObservations, np.ndarray, np.ndarray, np.ndarray]
+            Copies of the observations, rewards, terminated and truncated flags.
+
+        Raises
+        ------
+        TimeoutError
+            If the simulator did not answer in time.
+        """
+        slot = seq % self.slots
+        deadline = time.perf_counter() + timeout
+        # a doorbell ring wakes a single reader of the socket, so concurrent
+        # waiters take turns; the simulator answering in order, the later
+        # steps are usually in by the time theirs comes
+        async with self._waiting:
+            while self.seqs[slot, RESPONSE] != seq:
+                remaining = deadline - time.perf_counter()
+                try:
+                    await self._wait_doorbell(max(remaining, 0.0))
+                except asyncio.TimeoutError:
+                    raise TimeoutError(
+                        f"No response to shared memory step {seq}"
+                    ) from None
+        block = self.observations[slot].copy()
+        rewards = self.rewards[slot].copy()
+        flags = self.flags[slot] != 0
+        self._acked = max(self._acked, seq)
+        p, light = self.num_proximity, self.num_proximity + self.num_light
+        observations = PackedObservations(
+            self.agent_ids,
+            block[:, :p],
+            block[:, p:light],
+            block[:, light : light + 2],
+            block[:, light + 2],
+            block[:, light + 3 :],
+        )
+        return observations, rewards, flags[:, 0], flags[:, 1]
+
+    def wheels(self, actions) -> np.ndarray:
+        """The (n_agents, 2) action array of a step, NaN for no action.
+
+        Parameters
+        ----------
+        actions : dict | EncodedActions
+            The actions by agent ID, as `ContinuousAction` messages or
+            dicts with the wheel speeds.
+        """
+        wheels = np.full((len(self.agent_ids), 2), np.nan, dtype=np.float32)
+        if isinstance(actions, EncodedActions):
+            actions = actions.messages
+        for agent_id, action in actions.items():
+            if isinstance(action, dict):
+                wheels[self.rows[agent_id]] = (
+                    action.get("left_wheel", 0.0),
+                    action.get("right_wheel", 0.0),
+                )
+            else:
+                wheels[self.rows[agent_id]] = (action.left_wheel, action.right_wheel)
+        return wheels
+
+    @property
+    def response_nbytes(self) -> int:
+        """Bytes of the response of a step."""
+        return (
+            self.observations[0].nbytes + self.rewards[0].nbytes + self.flags[0].nbytes
+        )
+
+    # simulator side
+
+    async def serve(
+        self,
+        step: Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], Awaitable],
+    ) -> None:
+        """Answer the steps in order until the client closes the ring.
+
+        Parameters
+        ----------
+        step : Callable
+            Coroutine function called with the actions of a slot and its
+            observation, reward and flag arrays, to be filled in place.
+        """
+        seq = 1
+        try:
+            while not self.closed:
+                slot = seq % self.slots
+                if self.seqs[slot, REQUEST] != seq:
+                    await self._wait_doorbell()
+                    continue
+                await step(
+                    self.actions[slot],
+                    self.observations[slot],
+                    self.rewards[slot],
+                    self.flags[slot],
+                )
+                self.seqs[slot, RESPONSE] = seq
+                self._ring()
+                seq += 1
+        finally:
+            self.close()
@@ -0,0 +1,54 @@
+import numpy as np
+
+import rl_pb2
+from rl.observation_batch import PackedObservations
+
+
+def unpack_step(response: rl_pb2.StepResponse) -> tuple:
+    """Split a step response into the gymnasium-style step tuple.
+
+    Packed responses give `PackedObservations` and plain dicts; servers that
+    ignore the `packed` request flag answer with maps, handled the same way.
+    """
+    if response.HasField("packed"):
+        packed = response.packed
+        observations = PackedObservations.from_tensors(packed.observations)
+        agent_ids = observations.agent_ids
+        rewards = np.frombuffer(packed.rewards, dtype="<f4").tolist()
+        flags = np.frombuffer(packed.flags, dtype="<f4").reshape(-1, 2) != 0
+        return (
+            observations,
+            dict(zip(agent_ids, rewards, strict=True)),
+            dict(zip(agent_ids, flags[:, 0].tolist(), strict=True)),
+            dict(zip(agent_ids, flags[:, 1].tolist(), strict=True)),
+            response.infos,
+        )
+    return (
+        response.observations,
+        response.rewards,
+        response.terminateds,
+        response.truncateds,
+        response.infos,
+    )
+
+
+def done(step: tuple) -> bool:
+    """Whether an agent of a step tuple is terminated or truncated."""
+    return any(step[2].values()) or any(step[3].values())
+
+
+def accumulate(step: tuple, following: tuple) -> tuple:
+    """Step tuple of two consecutive ticks: the observations and infos of the
+    second one, with the rewards summed and the flags OR-ed.
+
+    Action repeat falls back on it with servers that apply a single tick per
+    call, and over shared memory.
+    """
+    _, rewards, terminateds, truncateds, _ = step
+    return (
+        following[0],
+        {k: rewards.get(k, 0.0) + v for k, v in following[1].items()},
+        {k: terminateds.get(k, False) or v for k, v in following[2].items()},
+        {k: truncateds.get(k, False) or v for k, v in following[3].items()},
+        following[4],
+    )
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Supervisor of local simulator server processes.
+
+It starts one server per port of a range, waits until every one accepts gRPC
+connections, restarts the ones that exit, and stops them all when closed or
+when the Python process exits. The server is any executable implementing the
+`rl.proto` service, given as a command whose `{port}` arguments are replaced
+by the port of each server; the local stand-in is the default.
+
+How to run:
+python -m rl.supervisor --ports 50051-50054
+python -m rl.supervisor --ports 50051-50054 -- java -jar PPS-22-srs.jar --rl --headless --port {port}
+"""
+
+import argparse
+import atexit
+import contextlib
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+import grpc
+
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+LOCAL_SERVER_COMMAND = (sys.executable, "-m", "rl.local_server", "--port", "{port}")
+
+
+def parse_ports(spec: str) -> list[int]:
+    """Expand a port specification, e.g. "50051-50054" or "50051,50060"."""
+    ports = []
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        ports.extend(range(int(first), int(last or first) + 1))
+    return ports
+
+
+class SimulatorProcess:
+    """
+    A supervised server process.
+
+    Attributes
+    ----------
+    port : int
+        The localhost port the server listens on.
+    process : subprocess.Popen | None
+        The running process, None once stopped.
+    restarts : int
+        The number of times the server was restarted after exiting.
+    ready : threading.Event
+        Set while the server accepts connections, cleared when it exits.
+    """
+
+    def __init__(self, port: int) -> None:
+        self.port = port
+        self.process = None
+        self.restarts = 0
+        self.ready = threading.Event()
+
+
+class SimulatorSupervisor:
+    """
+    Start, monitor and restart a simulator server on each of a range of ports.
+
+    A background thread polls the processes and restarts the ones that exit,
+    waiting until they are ready again, so a client failing over to the lost
+    endpoint later finds it back. Use it as a context manager, or call
+    `start` and `stop`; the servers are also stopped when the interpreter
+    exits.
+
+    Parameters
+    ----------
+    ports : Sequence[int]
+        The ports of the servers, one process each.
+    command : Sequence[str], optional (default=LOCAL_SERVER_COMMAND)
+        The command starting a server, `{port}` standing for its port.
+    host : str, optional (default="localhost")
+        The host the servers are reached on.
+    ready_timeout : float, optional (default=60.0)
+        Seconds to wait for a started server to accept connections.
+    check_interval : float, optional (default=1.0)
+        Seconds between two polls of the processes.
+    max_restarts : int, optional (default=5)
+        Restarts allowed per server; a server exiting more often stays down.
+    log_dir : str | Path | None, optional (default=None)
+        Directory of the `simulator-<port>.log` output files, None to
+        inherit the output of this process.
+    """
+
+    def __init__(
+        self,
+        ports: Sequence[int],
+        command: Sequence[str] = LOCAL_SERVER_COMMAND,
+        host: str = "localhost",
+        ready_timeout: float = 60.0,
+        check_interval: float = 1.0,
+        max_restarts: int = 5,
+        log_dir: str | Path | None = None,
+    ) -> None:
+        self.command = list(command)
+        self.host = host
+        self.ready_timeout = ready_timeout
+        self.check_interval = check_interval
+        self.max_restarts = max_restarts
+        self.log_dir = Path(log_dir) if log_dir is not None else None
+        self.servers = [SimulatorProcess(port) for port in ports]
+        self._stopping = threading.Event()
+        self._monitor = None
+
+    @property
+    def addresses(self) -> list[str]:
+        return [f"{self.host}:{server.port}" for server in self.servers]
+
+    @property
+    def endpoints(self) -> str:
+        """The addresses as an endpoint specification, see `parse_endpoints`."""
+        return ",".join(self.addresses)
+
+    def start(self) -> "SimulatorSupervisor":
+        """Start every server and wait until they are all ready.
+
+        Raises
+        ------
+        RuntimeError
+            If a server exits or is not ready in time; the others are stopped.
+        """
+        self._stopping.clear()
+        atexit.register(self.stop)
+        try:
+            for server in self.servers:
+                self._launch(server)
+            for server in self.servers:
+                self._wait_ready(server)
+                server.ready.set()
+        except RuntimeError:
+            self.stop()
+            raise
+        logger.info(f"✓ Started {len(self.servers)} simulators on {self.endpoints}")
+        self._monitor = threading.Thread(
+            target=self._monitor_loop, name="simulator-supervisor", daemon=True
+        )
+        self._monitor.start()
+        return self
+
+    def _launch(self, server: SimulatorProcess) -> None:
+        args = [arg.replace("{port}", str(server.port)) for arg in self.command]
+        log = None
+        if self.log_dir is not None:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            log = self.log_dir / f"simulator-{server.port}.log"
+        # the local stand-in is run as a module of this source tree
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            p for p in (str(SRC_ROOT), env.get("PYTHONPATH")) if p
+        )
+        # the child keeps its own handle on the log file
+        with open(log, "ab") if log is not None else contextlib.nullcontext() as output:
+            server.process = subprocess.Popen(
+                args, stdout=output, stderr=output, env=env
+            )
+
+    def _wait_ready(self, server: SimulatorProcess) -> None:
+        address = f"{self.host}:{server.port}"
+        deadline = time.monotonic() + self.ready_timeout
+        with grpc.insecure_channel(address) as channel:
+            ready = grpc.channel_ready_future(channel)
+            while True:
+                try:
+                    ready.result(timeout=min(0.5, self.ready_timeout))
+                    return
+                except grpc.FutureTimeoutError:
+                    pass
+                code = server.process.poll()
+                if code is not None:
+                    ready.cancel()
+                    raise RuntimeError(
+                        f"Simulator on {address} exited with code {code} before being ready"
+                    )
+                if time.monotonic() > deadline:
+                    ready.cancel()
+                    raise RuntimeError(
+                        f"Simulator on {address} not ready after {self.ready_timeout}s"
+                    )
+
+    def _monitor_loop(self) -> None:
+        while not self._stopping.wait(self.check_interval):
+            for server in self.servers:
+                if self._stopping.is_set():
+                    return
+                process = server.process
+                if process is None or process.poll() is None:
+                    continue
+                server.ready.clear()
+                if server.restarts >= self.max_restarts:
+                    logger.error(
+                        f"✗ Simulator on port {server.port} exited with code"
+                        f" {process.returncode}, restarted too often"
+                    )
+                    server.process = None
+                    continue
+                server.restarts += 1
+                logger.warning(
+                    f"✗ Simulator on port {server.port} exited with code"
+                    f" {process.returncode}, restarting"
+                    f" ({server.restarts}/{self.max_restarts})"
+                )
+                try:
+                    self._launch(server)
+                    self._wait_ready(server)
+                except (OSError, RuntimeError) as e:
+                    logger.error(f"✗ Restart on port {server.port} failed: {e}")
+                    continue
+                server.ready.set()
+                logger.info(f"✓ Simulator on port {server.port} restarted")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the monitoring and every server, killing those that do not
+        terminate within `timeout` seconds."""
+        self._stopping.set()
+        if self._monitor is not None:
+            self._monitor.join()
+            self._monitor = None
+        processes = [s.process for s in self.servers if s.process is not None]
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            try:
+                process.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        for server in self.servers:
+            server.process = None
+            server.ready.clear()
+        atexit.unregister(self.stop)
+        if processes:
+            logger.info(f"✓ Stopped {len(processes)} simulators")
+
+    def __enter__(self) -> "SimulatorSupervisor":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Start and supervise local simulator servers until interrupted.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument(
+        "--ports",
+        type=str,
+        default="50051-50054",
+        help="Ports of the servers, e.g. 50051-50054 or 50051,50060.",
+    )
+    p.add_argument("--host", type=str, default="localhost")
+    p.add_argument("--ready-timeout", type=float, default=60.0)
+    p.add_argument("--max-restarts", type=int, default=5)
+    p.add_argument(
+        "--log-dir",
+        type=str,
+        default=None,
+        help="Directory of the server output files, the console if omitted.",
+    )
+    p.add_argument(
+        "command",
+        nargs=argparse.REMAINDER,
+        help="Server command after --, with {port} for the port; "
+        "the local stand-in if omitted.",
+    )
+    args = p.parse_args()
+    command = [arg for arg in args.command if arg != "--"] or LOCAL_SERVER_COMMAND
+    supervisor = SimulatorSupervisor(
+        parse_ports(args.ports),
+        command,
+        host=args.host,
+        ready_timeout=args.ready_timeout,
+        max_restarts=args.max_restarts,
+        log_dir=args.log_dir,
+    )
+    with supervisor:
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
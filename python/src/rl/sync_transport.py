@@ -0,0 +1,59 @@
+import grpc
+
+import rl_pb2_grpc
+from rl.encoded_step import encoded_step_rpc
+
+
+class SyncTransport:
+    """
+    Blocking gRPC channel of the `*_sync` calls of an `RLClient`.
+
+    The calls block on this channel's stub instead of awaiting the asyncio
+    one, so the synchronous API does not go through an event loop. The
+    channel is opened on first use and waited for like `RLClient.connect`
+    waits for the asyncio one. It is a second channel of the client, not
+    shared with the other clients of an `RLClientPool`.
+
+    Parameters
+    ----------
+    server_address : str
+        The address of the server.
+    ready_timeout : float, optional (default=5.0)
+        Seconds to wait for the channel to become ready when it is opened.
+    """
+
+    def __init__(self, server_address: str, ready_timeout: float = 5.0) -> None:
+        self.server_address = server_address
+        self.ready_timeout = ready_timeout
+        self.channel: grpc.Channel | None = None
+        self.stub: rl_pb2_grpc.RLStub | None = None
+        self.encoded_step = None
+
+    def open(self) -> rl_pb2_grpc.RLStub:
+        """The stub of the channel, opening it on first use.
+
+        Raises
+        ------
+        ConnectionError
+            If the server is not ready within `ready_timeout` seconds.
+        """
+        if self.stub is None:
+            channel = grpc.insecure_channel(self.server_address)
+            try:
+                grpc.channel_ready_future(channel).result(timeout=self.ready_timeout)
+            except grpc.FutureTimeoutError:
+                channel.close()
+                raise ConnectionError(
+                    f"{self.server_address} not ready in {self.ready_timeout}s"
+                ) from None
+            self.channel = channel
+            self.stub = rl_pb2_grpc.RLStub(channel)
+            self.encoded_step = encoded_step_rpc(channel)
+        return self.stub
+
+    def close(self) -> None:
+        """Close the channel, if open; the next call opens a new one."""
+        if self.channel is not None:
+            channel, self.channel = self.channel, None
+            self.stub = self.encoded_step = None
+            channel.close()
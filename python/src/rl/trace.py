@@ -0,0 +1,172 @@
+import struct
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import rl_pb2
+
+MAGIC = b"SRSTRACE"
+VERSION = 1
+
+# method, instance, start offset (s), latency (s), request size, response size
+_HEADER = struct.Struct("<BiddII")
+_VERSION = struct.Struct("<H")
+
+METHODS = {
+    "Init": (rl_pb2.InitRequest, rl_pb2.InitResponse),
+    "Reset": (rl_pb2.ResetRequest, rl_pb2.ResetResponse),
+    "Step": (rl_pb2.StepRequest, rl_pb2.StepResponse),
+    "StepBatch": (rl_pb2.StepBatchRequest, rl_pb2.StepBatchResponse),
+    "Render": (rl_pb2.RenderRequest, rl_pb2.RenderResponse),
+    "RegisterConfig": (rl_pb2.RegisterConfigRequest, rl_pb2.RegisterConfigResponse),
+    "InitReset": (rl_pb2.InitResetRequest, rl_pb2.ResetResponse),
+    "Snapshot": (rl_pb2.SnapshotRequest, rl_pb2.SnapshotResponse),
+    "Restore": (rl_pb2.RestoreRequest, rl_pb2.ResetResponse),
+    "ReleaseSnapshots": (
+        rl_pb2.ReleaseSnapshotsRequest,
+        rl_pb2.ReleaseSnapshotsResponse,
+    ),
+    "AttachSharedMemory": (rl_pb2.SharedMemoryRequest, rl_pb2.SharedMemoryResponse),
+}
+_METHOD_IDS = {name: i for i, name in enumerate(METHODS)}
+_METHOD_NAMES = list(METHODS)
+
+
+class TraceRecord:
+    """
+    One recorded RPC.
+
+    Attributes
+    ----------
+    method : str
+        The RPC name, one of `METHODS`.
+    instance : int
+        The simulation instance addressed by the request.
+    start_s : float
+        Seconds between the start of the recording and the call.
+    latency_s : float
+        Seconds the call took, as seen by the client.
+    request : bytes
+        The serialized request.
+    response : bytes
+        The serialized response.
+    """
+
+    def __init__(self, method, instance, start_s, latency_s, request, response):
+        self.method = method
+        self.instance = instance
+        self.start_s = start_s
+        self.latency_s = latency_s
+        self.request = request
+        self.response = response
+
+    def parse_request(self):
+        """Deserialize the request into its protobuf message."""
+        return METHODS[self.method][0].FromString(self.request)
+
+    def parse_response(self):
+        """Deserialize the response into its protobuf message."""
+        return METHODS[self.method][1].FromString(self.response)
+
+
+class TraceWriter:
+    """
+    Writer of RPC traces in a compact binary format.
+
+    The file starts with `MAGIC` and a format version, followed by one record
+    per call: a fixed-size header with the method, the instance, the timing and
+    the payload sizes, then the serialized request and response.
+
+    Parameters
+    ----------
+    path : str | Path
+        The trace file, overwritten if it exists.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.records = 0
+        self._file = self.path.open("wb")
+        self._file.write(MAGIC + _VERSION.pack(VERSION))
+        self._origin = time.perf_counter()
+
+    def write(
+        self,
+        method: str,
+        instance: int,
+        start: float,
+        latency_s: float,
+        request,
+        response,
+    ) -> None:
+        """Append a call to the trace.
+
+        Parameters
+        ----------
+        method : str
+            The RPC name, one of `METHODS`.
+        instance : int
+            The simulation instance addressed by the request.
+        start : float
+            The `time.perf_counter()` value at the start of the call.
+        latency_s : float
+            Seconds the call took.
+        request, response : google.protobuf.message.Message
+            The messages exchanged.
+        """
+        request_bytes = request.SerializeToString()
+        response_bytes = response.SerializeToString()
+        self._file.write(
+            _HEADER.pack(
+                _METHOD_IDS[method],
+                instance,
+                start - self._origin,
+                latency_s,
+                len(request_bytes),
+                len(response_bytes),
+            )
+        )
+        self._file.write(request_bytes)
+        self._file.write(response_bytes)
+        self.records += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_trace(path: str | Path) -> Iterator[TraceRecord]:
+    """Iterate over the records of a trace written by `TraceWriter`.
+
+    Parameters
+    ----------
+    path : str | Path
+        The trace file.
+
+    Returns
+    -------
+    Iterator[TraceRecord]
+        The recorded calls, in call order.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a trace or has an unsupported version.
+    """
+    with Path(path).open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an RPC trace")
+        (version,) = _VERSION.unpack(f.read(_VERSION.size))
+        if version != VERSION:
+            raise ValueError(f"Unsupported trace version {version}")
+        while header := f.read(_HEADER.size):
+            method, instance, start_s, latency_s, request_size, response_size = (
+                _HEADER.unpack(header)
+            )
+            yield TraceRecord(
+                _METHOD_NAMES[method],
+                instance,
+                start_s,
+                latency_s,
+                f.read(request_size),
+                f.read(response_size),
+            )
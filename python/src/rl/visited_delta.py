@@ -0,0 +1,66 @@
+import numpy as np
+
+from rl.visited_grid import VisitedGrid
+
+
+def reset_grids(observations) -> dict[str, VisitedGrid]:
+    """The visited grids sent with the observations of a reset or restore,
+    filling in their neighbourhoods as `visited_positions`.
+
+    Parameters
+    ----------
+    observations : Mapping[str, rl_pb2.Observation]
+        The observations of the response, by agent ID.
+
+    Returns
+    -------
+    dict[str, VisitedGrid]
+        The grids by agent ID, empty when the server sent none.
+    """
+    grids = {
+        agent_id: VisitedGrid.from_message(observation.visited_grid)
+        for agent_id, observation in observations.items()
+        if observation.HasField("visited_grid")
+    }
+    for agent_id, grid in grids.items():
+        observations[agent_id].visited_positions.extend(grid.neighbourhood().tolist())
+    return grids
+
+
+def advance_grids(grids: dict[str, VisitedGrid], response, observations) -> None:
+    """Move the visited grids by the cells of a step, those of the earlier
+    ticks of a repeated step first, and fill in the neighbourhoods.
+
+    Parameters
+    ----------
+    grids : dict[str, VisitedGrid]
+        The grids of `reset_grids`, updated in place.
+    response : rl_pb2.StepResponse
+        The step response, packed or not.
+    observations : Mapping
+        Its unpacked observations, given their visited values.
+    """
+    if response.HasField("packed"):
+        tensors = response.packed.observations
+        agent_ids = observations.agent_ids
+        cells = np.frombuffer(tensors.visited_cells, dtype="<i4")
+        paths = np.frombuffer(tensors.visited_paths, dtype="<i4")
+        rows = np.column_stack([paths.reshape(len(agent_ids), -1), cells]).tolist()
+        for agent_id, row in zip(agent_ids, rows, strict=True):
+            for cell in row:
+                if cell >= 0:
+                    grids[agent_id].visit(cell)
+        observations.visited = np.array(
+            [grids[a].neighbourhood() for a in observations.agent_ids],
+            dtype=np.float32,
+        )
+        return
+    for agent_id, observation in observations.items():
+        grid = grids.get(agent_id)
+        if grid is None:
+            continue
+        if observation.HasField("visited_cell"):
+            for cell in observation.visited_path:
+                grid.visit(cell)
+            grid.visit(observation.visited_cell)
+        observation.visited_positions.extend(grid.neighbourhood().tolist())
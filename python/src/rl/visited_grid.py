@@ -0,0 +1,102 @@
+import numpy as np
+
+import rl_pb2
+
+# the values of `visited_positions` decay at every step, see `VisitedGrid`
+VISITED_DECAY = 0.999
+VISITED_RADIUS = 2
+
+# VISITED_DECAY ** age, by successive products as the simulator computes it
+_decay = np.ones(1)
+
+
+def decay(ages: np.ndarray) -> np.ndarray:
+    """The visited value of cells last visited `ages` steps ago."""
+    global _decay
+    needed = int(ages.max(initial=0)) + 1
+    if needed > len(_decay):
+        size = max(needed, 2 * len(_decay))
+        tail = np.full(size - len(_decay) + 1, VISITED_DECAY)
+        tail[0] = _decay[-1]
+        _decay = np.concatenate([_decay[:-1], np.cumprod(tail)])
+    return _decay[ages]
+
+
+class VisitedGrid:
+    """
+    Client-side copy of the cells visited by an agent.
+
+    It is built from the whole grid sent on reset and updated with the cell of
+    the agent sent on every step, see `ObservationMask.visited_delta`, so the
+    responses do not repeat the visited neighbourhood of every agent. The
+    neighbourhood is rebuilt as the simulator computes it: `VISITED_DECAY` to
+    the number of steps since the last visit of a cell, 0 for the cells never
+    visited and -1 outside the grid.
+
+    Parameters
+    ----------
+    width, height : int
+        Size of the grid, in cells.
+
+    Attributes
+    ----------
+    last_visit : np.ndarray
+        Array of shape (width, height) with the step of the last visit of
+        every cell, -1 for the cells never visited.
+    clock : int
+        The current step.
+    cell : tuple[int, int]
+        The (x, y) cell of the agent.
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.last_visit = np.full((width, height), -1, dtype=np.int64)
+        self.clock = 0
+        self.cell = (0, 0)
+
+    @classmethod
+    def from_message(cls, message: rl_pb2.VisitedGrid) -> "VisitedGrid":
+        """Rebuild the grid of a reset or restore response."""
+        grid = cls(message.width, message.height)
+        cells = np.unpackbits(
+            np.frombuffer(message.cells, dtype=np.uint8), bitorder="little"
+        )[: message.width * message.height]
+        indices = np.flatnonzero(cells)
+        ages = np.asarray(message.ages, dtype=np.int64)
+        grid.clock = int(ages.max(initial=0))
+        grid.last_visit[indices % message.width, indices // message.width] = (
+            grid.clock - ages
+        )
+        current = indices[ages == 0]
+        if len(current):
+            grid.cell = (
+                int(current[0] % message.width),
+                int(current[0] // message.width),
+            )
+        return grid
+
+    @property
+    def visited(self) -> np.ndarray:
+        """Boolean bitmap of shape (width, height) of the visited cells."""
+        return self.last_visit >= 0
+
+    def visit(self, cell: int) -> None:
+        """Advance one step, with the agent in the cell of index y * width + x."""
+        self.clock += 1
+        self.cell = (cell % self.width, cell // self.width)
+        self.last_visit[self.cell] = self.clock
+
+    def neighbourhood(self) -> np.ndarray:
+        """The visited values around the agent, in `visited_positions` order."""
+        r = VISITED_RADIUS
+        x, y = self.cell
+        xs = np.arange(x - r, x + r + 1)[:, np.newaxis]
+        ys = np.arange(y - r, y + r + 1)[np.newaxis, :]
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        last = self.last_visit[
+            np.clip(xs, 0, self.width - 1), np.clip(ys, 0, self.height - 1)
+        ]
+        values = np.where(last >= 0, decay(np.maximum(self.clock - last, 0)), 0.0)
+        return np.where(inside, values, -1.0).ravel()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the client CPU time to turn the discrete actions of a step
+into a serialized `StepRequest`: one `ContinuousAction` per agent and a new
+request every step, against the pre-built `ActionTable` entries joined with a
+reused request template.
+
+It times the encoding alone for a swarm, and the submit phase of `env.step`
+with the stand-in simulator started in a separate process.
+tests/test_action_table.py checks that both give the same request.
+
+How to run:
+python bench-action-table.py --agents 50 --repeat 5000
+"""
+
+from __future__ import annotations
+
+import sys
+
+sys.path.append("..")
+
+import argparse
+
+import numpy as np
+
+import rl_pb2
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+from scripts.lib.benchmark import (
+    latency_summary,
+    log_comparison,
+    spawn_local_server,
+    time_calls,
+)
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+DEFAULTS = {
+    "port": 50161,
+    "agents": 50,
+    "repeat": 5000,
+    "steps": 500,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Per-step action encoding, per message vs pre-built table.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("--port", type=int, default=DEFAULTS["port"])
+    p.add_argument("--agents", type=int, default=DEFAULTS["agents"])
+    p.add_argument("--repeat", type=int, default=DEFAULTS["repeat"])
+    p.add_argument(
+        "--steps",
+        type=int,
+        default=DEFAULTS["steps"],
+        help="Steps of the end-to-end run on the stand-in simulator.",
+    )
+    return p.parse_args()
+
+
+def make_config(agents: int) -> str:
+    """A 20x20 arena with one light and `agents` robots on a grid."""
+    lines = ["environment:", "  width: 20", "  height: 20", "  entities:"]
+    lines += ["    - light:", "        position: [18.0, 18.0]"]
+    for i in range(agents):
+        lines += [
+            "    - agent:",
+            f"        id: 00000000-0000-0000-0000-{i + 1:012d}",
+            f"        position: [{1.0 + i % 18}, {1.0 + i // 18}]",
+            "        orientation: 45.0",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def agent_ids(agents: int) -> list[str]:
+    return [f"00000000-0000-0000-0000-{i + 1:012d}" for i in range(agents)]
+
+
+def message_request(env, actions: dict) -> bytes:
+    """The request as built before the action table."""
+    return rl_pb2.StepRequest(
+        actions={k: env._decode_action(v) for k, v in actions.items()},
+        instance=0,
+        packed=False,
+        repeat=1,
+    ).SerializeToString()
+
+
+def table_request(env, actions: dict) -> bytes:
+    """The request as `RLClient.step` sends it with an action table."""
+    return env._decode_actions(actions).payload + env.client._step_template(None, 1)
+
+
+def run_steps(env, config: str, args: argparse.Namespace) -> float:
+    """Mean submit time of `env.step` in seconds on a seeded episode."""
+    env.connect_to_client()
+    env.init(config)
+    observations, _ = env.reset(7)
+    rng = np.random.default_rng(7)
+    for _ in range(args.steps):
+        actions = {k: int(rng.integers(env.action_space.n)) for k in observations}
+        observations, *_ = env.step(actions)
+    env.close()
+    return env.step_stats.submit_s / env.step_stats.steps
+
+
+def main() -> None:
+    args = parse_args()
+    ids = agent_ids(args.agents)
+    rng = np.random.default_rng(7)
+
+    env = PhototaxisEnv("localhost:0", "BenchmarkClient", action_set="pivot6")
+    actions = dict(
+        zip(ids, rng.integers(env.action_space.n, size=len(ids)), strict=True)
+    )
+    results = {
+        "messages": latency_summary(
+            time_calls(lambda: message_request(env, actions), args.repeat)
+        ),
+        "table": latency_summary(
+            time_calls(lambda: table_request(env, actions), args.repeat)
+        ),
+    }
+    logger.info(f"Action encoding of {args.agents} agents")
+    log_comparison(results, baseline="messages")
+
+    address = f"localhost:{args.port}"
+    config = make_config(args.agents)
+    server = spawn_local_server(args.port)
+    try:
+        submit_s = {}
+        for name in ("messages", "table"):
+            env = PhototaxisEnv(address, "BenchmarkClient", action_set="pivot6")
+            if name == "messages":
+                env.action_table = lambda: None
+            submit_s[name] = run_steps(env, config, args)
+    finally:
+        server.terminate()
+        server.wait()
+    for name, seconds in submit_s.items():
+        logger.info(
+            f"{name:<8} env.step submit phase: {seconds * 1e6:8.1f} us per step"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the bytes per step saved by the observation field mask that every
+environment declares at Init, against receiving all the fields.
+
+For each environment the same seeded episode is run twice on the stand-in
+simulator, started in a separate process: once with the environment mask and
+once with an empty mask, and the request and response bytes per step are
+reported. tests/test_observation_mask.py checks that both give the same
+encoded observations.
+
+How to run:
+python bench-observation-mask.py --steps 500
+python bench-observation-mask.py --packed
+"""
+
+from __future__ import annotations
+
+import sys
+
+sys.path.append("..")
+
+import argparse
+
+import numpy as np
+
+import rl_pb2
+from environment.deepqlearning.exploration_env import (
+    ExplorationEnv as DeepExplorationEnv,
+)
+from environment.deepqlearning.obstacle_avoidance_env import (
+    ObstacleAvoidanceEnv as DeepObstacleAvoidanceEnv,
+)
+from environment.deepqlearning.phototaxis_env import (
+    PhototaxisEnv as DeepPhototaxisEnv,
+)
+from environment.qlearning.exploration_env import ExplorationEnv
+from environment.qlearning.obstacle_avoidance_env import ObstacleAvoidanceEnv
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+from rl.metrics import RPCMetrics
+from rl.rl_client import RLClient
+from scripts.lib.benchmark import spawn_local_server
+from utils.log import Logger
+from utils.reader import get_yaml_path, read_file
+
+logger = Logger(__name__)
+
+DEFAULTS = {
+    "port": 50157,
+    "steps": 500,
+    "config_root": ("resources", "configurations"),
+}
+
+ENVIRONMENTS = {
+    "qlearning obstacle avoidance": (ObstacleAvoidanceEnv, "obstacle-avoidance.yml"),
+    "qlearning phototaxis": (PhototaxisEnv, "phototaxis.yml"),
+    "qlearning exploration": (ExplorationEnv, "exploration5.yml"),
+    "deepq obstacle avoidance": (DeepObstacleAvoidanceEnv, "obstacle-avoidance.yml"),
+    "deepq phototaxis": (DeepPhototaxisEnv, "phototaxis.yml"),
+    "deepq exploration": (DeepExplorationEnv, "exploration5.yml"),
+}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Bytes per step with and without the observation field mask.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("--port", type=int, default=DEFAULTS["port"])
+    p.add_argument("--steps", type=int, default=DEFAULTS["steps"])
+    p.add_argument(
+        "--config-root",
+        type=str,
+        nargs="*",
+        default=DEFAULTS["config_root"],
+        help="Path components to the configuration root directory.",
+    )
+    p.add_argument(
+        "--packed",
+        action="store_true",
+        help="Ask for packed float32 step responses.",
+    )
+    return p.parse_args()
+
+
+def run_episode(
+    env_class, address: str, config: str, args: argparse.Namespace, masked: bool
+) -> dict:
+    """Bytes per step of the Step calls of a seeded episode."""
+    metrics = RPCMetrics()
+    env = env_class(address, "BenchmarkClient")
+    env.client = RLClient(
+        address, "BenchmarkClient", metrics=metrics, packed_steps=args.packed
+    )
+    if not masked:
+        env.observation_mask = rl_pb2.ObservationMask
+    env.connect_to_client()
+    env.init(config)
+    observations, _ = env.reset(7)
+    rng = np.random.default_rng(7)
+    for _ in range(args.steps):
+        actions = {k: int(rng.integers(env.action_space.n)) for k in observations}
+        observations, *_ = env.step(actions)
+    env.close()
+    stats = metrics.get(address, "Step")
+    return {
+        "request": stats.request_bytes / args.steps,
+        "response": stats.response_bytes / args.steps,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    address = f"localhost:{args.port}"
+    root = get_yaml_path(*args.config_root)
+    server = spawn_local_server(args.port)
+    try:
+        for name, (env_class, config_name) in ENVIRONMENTS.items():
+            config = read_file(root / config_name)
+            full_bytes = run_episode(env_class, address, config, args, False)
+            masked_bytes = run_episode(env_class, address, config, args, True)
+            saved = 1.0 - masked_bytes["response"] / full_bytes["response"]
+            logger.info(
+                f"{name:<28} response {full_bytes['response']:7.1f}"
+                f" -> {masked_bytes['response']:7.1f} bytes/step ({saved:.0%} saved),"
+                f" request {masked_bytes['request']:.1f} bytes/step"
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark of packed float32 step responses against the
+per-agent `Observation` maps.
+
+Responses are produced by the stand-in simulation with the given number of
+agents, so the benchmark needs no server. It compares their size, the server
+side build and serialization, and the client side parsing and decoding into
+`ObservationDecoder` arrays. tests/test_packed_steps.py checks that both
+decode to the same values.
+
+How to run:
+python bench-packed.py --agents 50 --repeat 2000
+"""
+
+from __future__ import annotations
+
+import sys
+
+sys.path.append("..")
+
+import argparse
+
+import rl_pb2
+from rl.local_server import LocalSimulation
+from rl.observation_batch import ObservationDecoder
+from rl.step_result import unpack_step
+from scripts.lib.benchmark import latency_summary, log_comparison, time_calls
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+DEFAULTS = {
+    "agents": 50,
+    "repeat": 2000,
+}
+
+ACTION = rl_pb2.ContinuousAction(left_wheel=0.6, right_wheel=0.4)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Packed vs map step response serialization benchmark.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("--agents", type=int, default=DEFAULTS["agents"])
+    p.add_argument("--repeat", type=int, default=DEFAULTS["repeat"])
+    return p.parse_args()
+
+
+def make_config(agents: int) -> str:
+    """A 20x20 arena with one light and `agents` robots on a grid."""
+    lines = ["environment:", "  width: 20", "  height: 20", "  entities:"]
+    lines += ["    - light:", "        position: [18.0, 18.0]"]
+    for i in range(agents):
+        lines += [
+            "    - agent:",
+            f"        id: 00000000-0000-0000-0000-{i + 1:012d}",
+            f"        position: [{1.0 + i % 18}, {1.0 + i // 18}]",
+            "        orientation: 45.0",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def decode(payload: bytes, decoder: ObservationDecoder) -> tuple:
+    observations, rewards, *_ = unpack_step(rl_pb2.StepResponse.FromString(payload))
+    batch = decoder.decode(observations)
+    return batch, rewards
+
+
+def main() -> None:
+    args = parse_args()
+    simulation = LocalSimulation()
+    simulation.init(make_config(args.agents))
+    observations = simulation.reset(7).observations
+    actions = dict.fromkeys(observations, ACTION)
+
+    def step_from_reset(packed: bool) -> bytes:
+        simulation.reset(7)
+        for _ in range(10):
+            simulation.step(actions)
+        return simulation.step(actions, packed=packed).SerializeToString()
+
+    payloads = {
+        "maps": step_from_reset(packed=False),
+        "packed": step_from_reset(packed=True),
+    }
+
+    for name, payload in payloads.items():
+        logger.info(f"{name:<6} response: {len(payload)} bytes")
+
+    build = {}
+    for name, packed_flag in (("maps", False), ("packed", True)):
+        build[name] = latency_summary(
+            time_calls(
+                lambda p=packed_flag: simulation.step(
+                    actions, packed=p
+                ).SerializeToString(),
+                args.repeat,
+            )
+        )
+    logger.info(f"Server step, build and serialize with {args.agents} agents")
+    log_comparison(build, baseline="maps")
+
+    parse = {}
+    for name, payload in payloads.items():
+        decoder = ObservationDecoder()
+        parse[name] = latency_summary(
+            time_calls(lambda p=payload, d=decoder: decode(p, d), args.repeat)
+        )
+    logger.info(f"Client parse and decode with {args.agents} agents")
+    log_comparison(parse, baseline="maps")
+
+
+if __name__ == "__main__":
+    main()
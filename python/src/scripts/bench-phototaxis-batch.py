@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Parity check and benchmark of the batch encoder of the Q-learning phototaxis
+environment.
+
+It checks that `_encode_observation_batch` gives the same states as the
+per-agent `_encode_observation` for every combination of the light and
+proximity encoders, on random sensor readings with many ties, some of them
+shorter than the sensors to exercise the padding. Then it times the states of
+a step response encoded agent by agent, and in one batch with and without
+decoding the observations.
+
+How to run:
+python bench-phototaxis-batch.py --samples 2000 --agents 50
+"""
+
+from __future__ import annotations
+
+import sys
+
+sys.path.append("..")
+
+import argparse
+import itertools
+import logging
+
+import numpy as np
+
+import rl_pb2
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+from scripts.lib.benchmark import latency_summary, log_comparison, time_calls
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+DEFAULTS = {
+    "samples": 2000,
+    "agents": 50,
+    "repeat": 2000,
+}
+
+PHOTOTAXIS_OPTIONS = {
+    "light_direction": ["none", "light4", "light8"],
+    "light_has_no_light_state": [False, True],
+    "light_intensity_bins": [1, 2, 3],
+    "prox_direction": [
+        "none",
+        "front_min",
+        "prox4",
+        "prox8",
+        "prox4_threat",
+        "prox8_threat",
+    ],
+    "prox_intensity_bins": [1, 2, 3],
+}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Phototaxis batch encoder parity check and benchmark.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("--samples", type=int, default=DEFAULTS["samples"])
+    p.add_argument("--agents", type=int, default=DEFAULTS["agents"])
+    p.add_argument("--repeat", type=int, default=DEFAULTS["repeat"])
+    return p.parse_args()
+
+
+def readings(rng: np.random.Generator, samples: int) -> np.ndarray:
+    """Sensor readings in [0, 1], rounded so that ties are frequent."""
+    values = np.round(rng.uniform(0.0, 1.0, (samples, 8)), 1)
+    values[rng.uniform(size=samples) < 0.2] *= 0.01
+    return values
+
+
+def observations(rng: np.random.Generator, samples: int) -> dict:
+    """Observation messages of `samples` agents, one in ten with a sensor
+    reading cut short."""
+    proximity, light = readings(rng, samples), readings(rng, samples)
+    result = {}
+    for i, (prox, lig) in enumerate(zip(proximity, light, strict=True)):
+        if i % 10 == 3:
+            prox = prox[: i % 4]
+        elif i % 10 == 7:
+            lig = lig[: i % 8]
+        result[f"agent-{i}"] = rl_pb2.Observation(
+            proximity_values=prox, light_values=lig
+        )
+    return result
+
+
+def per_agent(env: PhototaxisEnv, observations: dict) -> dict:
+    """The states of the per-agent encoder, given lists as it pads them."""
+    return {
+        k: env._encode_observation(list(v.proximity_values), list(v.light_values))
+        for k, v in observations.items()
+    }
+
+
+def make_env(options: dict) -> PhototaxisEnv:
+    thresholds = {2: [0.4], 3: [0.2, 0.6]}.get(options["light_intensity_bins"])
+    return PhototaxisEnv(
+        "localhost:0", light_intensity_thresholds=thresholds, **options
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(7)
+    samples = observations(rng, args.samples)
+
+    # the environments log their settings, and the padding on every reading
+    env_logger = logging.getLogger(PhototaxisEnv.__module__)
+    level = env_logger.level
+    env_logger.setLevel(logging.ERROR)
+    combinations = [
+        dict(zip(PHOTOTAXIS_OPTIONS, values, strict=True))
+        for values in itertools.product(*PHOTOTAXIS_OPTIONS.values())
+    ]
+    for options in combinations:
+        env = make_env(options)
+        expected = per_agent(env, samples)
+        actual = env._encode_observations(samples)
+        if expected != actual:
+            diff = next(k for k in expected if expected[k] != actual[k])
+            raise AssertionError(
+                f"PhototaxisEnv{options}: state {actual[diff]} for {diff},"
+                f" {expected[diff]} expected"
+            )
+    logger.info(
+        f"✓ Same states as the per-agent encoder for {len(combinations)} phototaxis"
+        f" configurations, on {args.samples} readings"
+    )
+
+    env = make_env(
+        {
+            "light_direction": "light8",
+            "light_has_no_light_state": True,
+            "light_intensity_bins": 3,
+            "prox_direction": "prox4_threat",
+            "prox_intensity_bins": 2,
+        }
+    )
+    env_logger.setLevel(level)
+    step = {
+        f"agent-{i}": rl_pb2.Observation(proximity_values=prox, light_values=lig)
+        for i, (prox, lig) in enumerate(
+            zip(readings(rng, args.agents), readings(rng, args.agents), strict=True)
+        )
+    }
+    batch = env.observation_decoder.decode(step, env._observation_fields)
+    results = {
+        "per agent": latency_summary(
+            time_calls(
+                lambda: {
+                    k: env._encode_observation(v.proximity_values, v.light_values)
+                    for k, v in step.items()
+                },
+                args.repeat,
+            )
+        ),
+        "batch": latency_summary(
+            time_calls(lambda: env._encode_observations(step), args.repeat)
+        ),
+        "batch encode": latency_summary(
+            time_calls(lambda: env._encode_observation_batch(batch), args.repeat)
+        ),
+    }
+    logger.info(f"States of {len(step)} agents, batch decode included or not")
+    log_comparison(results, baseline="per agent")
+
+
+if __name__ == "__main__":
+    main()
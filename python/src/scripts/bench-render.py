@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the Render latency with PNG frames against raw RGB frames.
+
+The PNG variant decodes every frame with Pillow, the raw one copies the
+uncompressed pixels into a reused buffer; tests/test_render.py checks both
+give the same frames. By default a local stand-in server is started
+in-process, so the benchmark runs without the Scala simulator.
+
+How to run:
+python bench-render.py --width 800 --height 600 --frames 300
+python bench-render.py --no-local --server-host localhost --port 50051
+"""
+
+from __future__ import annotations
+
+import sys
+
+sys.path.append("..")
+
+import argparse
+import asyncio
+import io
+
+import numpy as np
+from PIL import Image
+
+import rl_pb2
+from rl.local_server import start_server
+from rl.rl_client import RLClient
+from scripts.lib.benchmark import latency_summary, log_comparison, time_async_calls
+from utils.log import Logger
+from utils.reader import get_yaml_path, read_file
+
+logger = Logger(__name__)
+
+DEFAULTS = {
+    "server_host": "localhost",
+    "port": 50151,
+    "config": ("resources", "configurations", "phototaxis.yml"),
+    "width": 800,
+    "height": 600,
+    "frames": 300,
+    "warmup": 20,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="PNG vs raw RGB Render latency benchmark.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("--server-host", type=str, default=DEFAULTS["server_host"])
+    p.add_argument("--port", type=int, default=DEFAULTS["port"])
+    p.add_argument(
+        "--local",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Start a local stand-in server instead of using a running one.",
+    )
+    p.add_argument(
+        "--config",
+        type=str,
+        nargs="*",
+        default=DEFAULTS["config"],
+        help="Path components to the configuration file.",
+    )
+    p.add_argument("--width", type=int, default=DEFAULTS["width"])
+    p.add_argument("--height", type=int, default=DEFAULTS["height"])
+    p.add_argument("--frames", type=int, default=DEFAULTS["frames"])
+    p.add_argument("--warmup", type=int, default=DEFAULTS["warmup"])
+    return p.parse_args()
+
+
+async def run(args: argparse.Namespace) -> None:
+    server_address = f"{args.server_host}:{args.port}"
+    server = await start_server(server_address) if args.local else None
+
+    client = RLClient(server_address, "BenchmarkClient")
+    await client.connect()
+    await client.init(read_file(get_yaml_path(*args.config)))
+    await client.reset(42)
+
+    async def render_png():
+        request = rl_pb2.RenderRequest(
+            width=args.width, height=args.height, format="png"
+        )
+        response = await client.stub.Render(request)
+        return np.array(Image.open(io.BytesIO(response.image)).convert("RGB"))
+
+    frame = np.empty((args.height, args.width, 3), dtype=np.uint8)
+
+    async def render_raw():
+        return await client.render(args.width, args.height, out=frame)
+
+    results = {}
+    for name, fn in (("png", render_png), ("raw", render_raw)):
+        await time_async_calls(fn, args.warmup)
+        results[name] = latency_summary(await time_async_calls(fn, args.frames))
+    log_comparison(results, baseline="png")
+
+    await client.close()
+    if server is not None:
+        await server.stop(None)
+
+
+def main() -> None:
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
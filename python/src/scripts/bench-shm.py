@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the per-step latency of the shared memory transport against plain
+gRPC Step calls, with the stand-in simulator in a separate process on the same
+host. tests/test_shm_transport.py checks that both give the same trajectory.
+
+How to run:
+python bench-shm.py --agents 16 --steps 2000
+"""
+
+from __future__ import annotations
+
+import sys
+
+sys.path.append("..")
+
+import argparse
+import asyncio
+
+import rl_pb2
+from rl.rl_client import RLClient
+from scripts.lib.benchmark import (
+    latency_summary,
+    log_comparison,
+    spawn_local_server,
+    time_async_calls,
+)
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+DEFAULTS = {
+    "port": 50156,
+    "agents": 16,
+    "steps": 2000,
+    "warmup": 200,
+}
+
+ACTION = rl_pb2.ContinuousAction(left_wheel=0.6, right_wheel=0.4)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Shared memory vs gRPC Step latency benchmark.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("--port", type=int, default=DEFAULTS["port"])
+    p.add_argument("--agents", type=int, default=DEFAULTS["agents"])
+    p.add_argument("--steps", type=int, default=DEFAULTS["steps"])
+    p.add_argument("--warmup", type=int, default=DEFAULTS["warmup"])
+    return p.parse_args()
+
+
+def make_config(agents: int) -> str:
+    """A 20x20 arena with one light and `agents` robots on a row."""
+    lines = ["environment:", "  width: 20", "  height: 20", "  entities:"]
+    lines += ["    - light:", "        position: [18.0, 18.0]"]
+    for i in range(agents):
+        lines += [
+            "    - agent:",
+            f"        id: 00000000-0000-0000-0000-{i + 1:012d}",
+            f"        position: [{1.0 + i % 18}, {1.0 + i // 18}]",
+            "        orientation: 45.0",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+async def run(args: argparse.Namespace) -> None:
+    address = f"localhost:{args.port}"
+    config = make_config(args.agents)
+    grpc_client = RLClient(address, "BenchmarkClient", instance=0)
+    shm_client = RLClient(address, "BenchmarkClient", instance=1, shared_memory=True)
+    for client in (grpc_client, shm_client):
+        await client.connect()
+        ok, message = await client.init(config)
+        if not ok:
+            raise ValueError(f"Invalid configuration: {message}")
+
+    results = {}
+    for name, client in (("grpc", grpc_client), ("shared memory", shm_client)):
+        observations, _ = await client.reset(7)
+        actions = dict.fromkeys(observations, ACTION)
+        if client.shared_memory and client.ring is None:
+            raise RuntimeError("The server did not attach the shared memory ring")
+
+        async def step(client=client, actions=actions):
+            return await client.step(actions)
+
+        await time_async_calls(step, args.warmup)
+        results[name] = latency_summary(await time_async_calls(step, args.steps))
+    logger.info(f"Step latency with {args.agents} agents")
+    log_comparison(results, baseline="grpc")
+
+    for client in (grpc_client, shm_client):
+        await client.close()
+
+
+def main() -> None:
+    args = parse_args()
+    server = spawn_local_server(args.port)
+    try:
+        asyncio.run(run(args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark of blocking steps against step-ahead pipelining with `step_async`.
+
+A local stand-in server with an artificial step delay runs in a separate
+process, while the learner's update is mimicked by a busy loop between steps.
+
+How to run:
+python bench-step-pipeline.py --steps 500 --step-delay 0.002 --work 0.002
+"""
+
+from __future__ import annotations
+
+import sys
+
+sys.path.append("..")
+
+import argparse
+import time
+
+
+from environment.qlearning.obstacle_avoidance_env import ObstacleAvoidanceEnv
+from scripts.lib.benchmark import busy_wait, spawn_local_server
+from utils.log import Logger
+from utils.reader import get_yaml_path, read_file
+
+logger = Logger(__name__)
+
+DEFAULTS = {
+    "port": 50152,
+    "config": ("resources", "configurations", "obstacle-avoidance.yml"),
+    "steps": 500,
+    "step_delay": 0.002,
+    "work": 0.002,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Blocking vs pipelined step benchmark.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("--port", type=int, default=DEFAULTS["port"])
+    p.add_argument(
+        "--config",
+        type=str,
+        nargs="*",
+        default=DEFAULTS["config"],
+        help="Path components to the configuration file.",
+    )
+    p.add_argument("--steps", type=int, default=DEFAULTS["steps"])
+    p.add_argument(
+        "--step-delay",
+        type=float,
+        default=DEFAULTS["step_delay"],
+        help="Artificial simulator time per step, in seconds.",
+    )
+    p.add_argument(
+        "--work",
+        type=float,
+        default=DEFAULTS["work"],
+        help="Learner time per step, in seconds.",
+    )
+    return p.parse_args()
+
+
+def run_blocking(env: ObstacleAvoidanceEnv, steps: int, work: float) -> float:
+    start = time.perf_counter()
+    for _ in range(steps):
+        env.step(dict.fromkeys(env.agent_ids, 0))
+        busy_wait(work)
+    return time.perf_counter() - start
+
+
+def run_pipelined(env: ObstacleAvoidanceEnv, steps: int, work: float) -> float:
+    start = time.perf_counter()
+    env.step_async(dict.fromkeys(env.agent_ids, 0))
+    for t in range(steps):
+        env.step_wait()
+        if t + 1 < steps:
+            env.step_async(dict.fromkeys(env.agent_ids, 0))
+        busy_wait(work)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    args = parse_args()
+    server = spawn_local_server(args.port, "--step-delay", str(args.step_delay))
+    try:
+        env = ObstacleAvoidanceEnv(f"localhost:{args.port}", "BenchmarkClient")
+        env.connect_to_client()
+        env.init(read_file(get_yaml_path(*args.config)))
+        observations, _ = env.reset()
+        env.agent_ids = list(observations)
+
+        blocking_s = run_blocking(env, args.steps, args.work)
+        pipelined_s = run_pipelined(env, args.steps, args.work)
+
+        logger.info(f"blocking  : {blocking_s:.3f}s")
+        logger.info(f"pipelined : {pipelined_s:.3f}s")
+        logger.info(f"speedup   : {blocking_s / pipelined_s:.2f}x")
+        for name, value in env.step_stats.summary().items():
+            logger.info(f"  {name:<22}: {value:.4f}")
+        env.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
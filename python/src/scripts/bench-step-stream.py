@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the per-step latency of streaming against unary Step calls.
+
+By default a local stand-in server is started in-process, so the benchmark
+runs without the Scala simulator.
+
+How to run:
+python bench-step-stream.py --steps 5000
+python bench-step-stream.py --no-local --server-host localhost --port 50051
+"""
+
+from __future__ import annotations
+
+import sys
+
+sys.path.append("..")
+
+import argparse
+import asyncio
+
+import rl_pb2
+from rl.local_server import start_server
+from rl.rl_client import RLClient
+from scripts.lib.benchmark import latency_summary, log_comparison, time_async_calls
+from utils.log import Logger
+from utils.reader import get_yaml_path, read_file
+
+logger = Logger(__name__)
+
+DEFAULTS = {
+    "server_host": "localhost",
+    "port": 50151,
+    "config": ("resources", "configurations", "phototaxis.yml"),
+    "steps": 2000,
+    "warmup": 200,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Streaming vs unary Step latency benchmark.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("--server-host", type=str, default=DEFAULTS["server_host"])
+    p.add_argument("--port", type=int, default=DEFAULTS["port"])
+    p.add_argument(
+        "--local",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Start a local stand-in server instead of using a running one.",
+    )
+    p.add_argument(
+        "--config",
+        type=str,
+        nargs="*",
+        default=DEFAULTS["config"],
+        help="Path components to the configuration file.",
+    )
+    p.add_argument("--steps", type=int, default=DEFAULTS["steps"])
+    p.add_argument("--warmup", type=int, default=DEFAULTS["warmup"])
+    return p.parse_args()
+
+
+async def run(args: argparse.Namespace) -> None:
+    server_address = f"{args.server_host}:{args.port}"
+    server = await start_server(server_address) if args.local else None
+
+    client = RLClient(server_address, "BenchmarkClient")
+    await client.connect()
+    await client.init(read_file(get_yaml_path(*args.config)))
+    observations, _ = await client.reset(42)
+    actions = {
+        agent_id: rl_pb2.ContinuousAction(left_wheel=0.5, right_wheel=0.4)
+        for agent_id in observations
+    }
+
+    async def step():
+        return await client.step(actions)
+
+    results = {}
+    await time_async_calls(step, args.warmup)
+    results["unary"] = latency_summary(await time_async_calls(step, args.steps))
+
+    await client.open_step_stream()
+    await time_async_calls(step, args.warmup)
+    results["stream"] = latency_summary(await time_async_calls(step, args.steps))
+    await client.close_step_stream()
+
+    log_comparison(results, baseline="unary")
+
+    await client.close()
+    if server is not None:
+        await server.stop(None)
+
+
+def main() -> None:
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the per-step overhead of the synchronous environment API: every
+call run as a coroutine on the environment's event loop, against the
+blocking gRPC stub of the client's sync transport.
+
+The stand-in simulator is started in a separate process. It runs the same
+seeded single-agent Q-learning episodes both ways and reports the latency of
+`env.step`; tests/test_sync_transport.py checks they give the same steps.
+
+How to run:
+python bench-sync-transport.py --steps 5000
+"""
+
+from __future__ import annotations
+
+import sys
+
+sys.path.append("..")
+
+import argparse
+import time
+
+import numpy as np
+
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+from scripts.lib.benchmark import latency_summary, log_comparison, spawn_local_server
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+DEFAULTS = {
+    "port": 50163,
+    "steps": 5000,
+    "episode_steps": 200,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Sync-over-async vs blocking sync transport, per env.step.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("--port", type=int, default=DEFAULTS["port"])
+    p.add_argument("--steps", type=int, default=DEFAULTS["steps"])
+    p.add_argument(
+        "--episode-steps",
+        type=int,
+        default=DEFAULTS["episode_steps"],
+        help="Steps after which the episode is reset.",
+    )
+    return p.parse_args()
+
+
+def make_config() -> str:
+    """A 10x10 arena with one light and a single robot."""
+    return "\n".join(
+        [
+            "environment:",
+            "  width: 10",
+            "  height: 10",
+            "  entities:",
+            "    - light:",
+            "        position: [8.0, 8.0]",
+            "    - agent:",
+            "        id: 00000000-0000-0000-0000-000000000001",
+            "        position: [1.0, 1.0]",
+            "        orientation: 45.0",
+        ]
+    )
+
+
+def run_episodes(
+    address: str, config: str, sync_transport: bool, args: argparse.Namespace
+) -> list[float]:
+    """Latency of every `env.step` of seeded episodes."""
+    env = PhototaxisEnv(address, "BenchmarkClient")
+    env.client.sync_transport = sync_transport
+    env.connect_to_client()
+    env.init(config)
+    rng = np.random.default_rng(7)
+    samples = []
+    for step in range(args.steps):
+        if step % args.episode_steps == 0:
+            observations, _ = env.reset(step // args.episode_steps)
+        actions = {k: int(rng.integers(env.action_space.n)) for k in observations}
+        start = time.perf_counter()
+        observations, *_ = env.step(actions)
+        samples.append(time.perf_counter() - start)
+    env.close()
+    return samples
+
+
+def main() -> None:
+    args = parse_args()
+    address = f"localhost:{args.port}"
+    config = make_config()
+    server = spawn_local_server(args.port)
+    try:
+        runs = {
+            name: run_episodes(address, config, sync_transport, args)
+            for name, sync_transport in (("event loop", False), ("sync", True))
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+    results = {name: latency_summary(samples) for name, samples in runs.items()}
+    log_comparison(results, baseline="event loop")
+    saved_us = results["event loop"]["mean_us"] - results["sync"]["mean_us"]
+    logger.info(f"Saved per million steps: {saved_us:.0f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark of stepping several environments one after the other against the
+concurrent steps of a `VectorEnv`, both synchronous and asynchronous.
+
+A local stand-in server with an artificial step delay runs in a separate
+process, hosting one simulation instance per environment. A random jitter on
+the delay mimics simulations with a varying per-step cost, which the
+asynchronous mode tolerates by collecting only the first `--batch-size` ready
+sub-environments.
+
+How to run:
+python bench-vector-env.py --num-envs 8 --steps 200 --step-delay 0.005
+python bench-vector-env.py --step-jitter 0.01 --batch-size 4
+"""
+
+from __future__ import annotations
+
+import sys
+
+sys.path.append("..")
+
+import argparse
+import time
+
+import numpy as np
+
+from environment.qlearning.obstacle_avoidance_env import ObstacleAvoidanceEnv
+from environment.vector_env import VectorEnv
+from scripts.lib.benchmark import spawn_local_server
+from utils.log import Logger
+from utils.reader import get_yaml_path, read_file
+
+logger = Logger(__name__)
+
+DEFAULTS = {
+    "port": 50153,
+    "config": ("resources", "configurations", "obstacle-avoidance.yml"),
+    "num_envs": 8,
+    "steps": 200,
+    "step_delay": 0.005,
+    "step_jitter": 0.0,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Sequential vs vectorized environment step benchmark.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    p.add_argument("--port", type=int, default=DEFAULTS["port"])
+    p.add_argument(
+        "--config",
+        type=str,
+        nargs="*",
+        default=DEFAULTS["config"],
+        help="Path components to the configuration file.",
+    )
+    p.add_argument("--num-envs", type=int, default=DEFAULTS["num_envs"])
+    p.add_argument("--steps", type=int, default=DEFAULTS["steps"])
+    p.add_argument(
+        "--step-delay",
+        type=float,
+        default=DEFAULTS["step_delay"],
+        help="Artificial simulator time per step, in seconds.",
+    )
+    p.add_argument(
+        "--step-jitter",
+        type=float,
+        default=DEFAULTS["step_jitter"],
+        help="Mean random extra simulator time per step, in seconds.",
+    )
+    p.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Sub-environments collected by each asynchronous recv, "
+        "half of them if not given.",
+    )
+    return p.parse_args()
+
+
+def make_env(address: str, instance: int):
+    def _make() -> ObstacleAvoidanceEnv:
+        env = ObstacleAvoidanceEnv(address, f"BenchmarkClient-{instance}")
+        env.client.instance = instance
+        return env
+
+    return _make
+
+
+def run_sequential(vector_env: VectorEnv, steps: int) -> float:
+    actions = dict.fromkeys(vector_env.agent_ids, 0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        for env in vector_env.envs:
+            env.step(actions)
+    return time.perf_counter() - start
+
+
+def run_vectorized(vector_env: VectorEnv, steps: int) -> float:
+    actions = {
+        agent_id: np.zeros(vector_env.num_envs, dtype=np.int64)
+        for agent_id in vector_env.agent_ids
+    }
+    start = time.perf_counter()
+    for _ in range(steps):
+        vector_env.step(actions)
+    return time.perf_counter() - start
+
+
+def run_async(vector_env: VectorEnv, env_steps: int, batch_size: int) -> float:
+    start = time.perf_counter()
+    vector_env.async_reset()
+    collected = 0
+    while collected < env_steps:
+        *_, infos = vector_env.recv(batch_size)
+        env_ids = infos["env_id"]
+        collected += len(env_ids)
+        actions = {
+            agent_id: np.zeros(len(env_ids), dtype=np.int64)
+            for agent_id in vector_env.agent_ids
+        }
+        vector_env.send(actions, env_ids)
+    vector_env.recv()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    args = parse_args()
+    server = spawn_local_server(
+        args.port,
+        "--step-delay",
+        str(args.step_delay),
+        "--step-jitter",
+        str(args.step_jitter),
+    )
+    try:
+        address = f"localhost:{args.port}"
+        vector_env = VectorEnv([make_env(address, i) for i in range(args.num_envs)])
+        vector_env.connect()
+        vector_env.init(read_file(get_yaml_path(*args.config)))
+        vector_env.reset()
+
+        sequential_s = run_sequential(vector_env, args.steps)
+        vectorized_s = run_vectorized(vector_env, args.steps)
+        env_steps = args.steps * args.num_envs
+        batch_size = args.batch_size or max(args.num_envs // 2, 1)
+        async_s = run_async(vector_env, env_steps, batch_size)
+
+        for name, elapsed in (
+            ("sequential", sequential_s),
+            ("vectorized", vectorized_s),
+            (f"async/{batch_size}", async_s),
+        ):
+            logger.info(
+                f"{name:<12}: {elapsed:.3f}s ({env_steps / elapsed:.0f} env steps/s, "
+                f"{sequential_s / elapsed:.2f}x)"
+            )
+        vector_env.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,14 +18,11 @@ import argparse
 import os
 from pathlib import Path
 
-import nest_asyncio
 
 from environment.qlearning.obstacle_avoidance_env import ObstacleAvoidanceEnv
 from scripts.lib.environment_generator import generate_multiple_environments
 from utils.log import Logger
 
-nest_asyncio.apply()
-
 # Initialize logger
 logger = Logger(__name__)
 
@@ -0,0 +1,112 @@
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import grpc
+import numpy as np
+
+from utils.log import Logger
+
+logger = Logger(__name__)
+
+SRC_ROOT = Path(__file__).resolve().parents[2]
+
+
+def spawn_local_server(port: int, *args: str) -> subprocess.Popen:
+    """Start the local stand-in server in a separate process and wait for it.
+
+    Parameters
+    ----------
+    port : int
+        The localhost port the server binds to.
+    *args : str
+        Extra command line arguments for `rl.local_server`.
+
+    Returns
+    -------
+    subprocess.Popen
+        The server process, to be terminated by the caller.
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "rl.local_server", "--port", str(port), *args],
+        cwd=SRC_ROOT,
+    )
+    with grpc.insecure_channel(f"localhost:{port}") as channel:
+        grpc.channel_ready_future(channel).result(timeout=10.0)
+    return process
+
+
+def busy_wait(seconds: float) -> None:
+    """Keep the CPU busy, holding the GIL, for the given time."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def latency_summary(samples: list[float]) -> dict[str, float]:
+    """Summarize per-call latencies, given in seconds, in microseconds.
+
+    Parameters
+    ----------
+    samples : list[float]
+        Measured latencies in seconds.
+
+    Returns
+    -------
+    dict[str, float]
+        Mean, p50, p90 and p99 latencies in microseconds, plus calls per second.
+    """
+    us = np.asarray(samples, dtype=np.float64) * 1e6
+    return {
+        "mean_us": float(us.mean()),
+        "p50_us": float(np.percentile(us, 50)),
+        "p90_us": float(np.percentile(us, 90)),
+        "p99_us": float(np.percentile(us, 99)),
+        "calls_per_s": float(1e6 / us.mean()),
+    }
+
+
+def time_calls(fn: Callable[[], object], repeat: int) -> list[float]:
+    """Time `repeat` sequential calls of a synchronous function."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def time_async_calls(
+    fn: Callable[[], Awaitable[object]], repeat: int
+) -> list[float]:
+    """Time `repeat` sequential awaits of a coroutine function."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def log_comparison(results: dict[str, dict[str, float]], baseline: str) -> None:
+    """Log a summary table of several variants against a baseline.
+
+    Parameters
+    ----------
+    results : dict[str, dict[str, float]]
+        Summaries produced by `latency_summary`, keyed by variant name.
+    baseline : str
+        Name of the variant the speedups are computed against.
+    """
+    width = max(len(name) for name in results)
+    logger.info(
+        f"{'variant'.ljust(width)} | {'mean':>10} | {'p50':>10} | {'p90':>10} | {'p99':>10} | speedup"
+    )
+    for name, summary in results.items():
+        speedup = results[baseline]["mean_us"] / summary["mean_us"]
+        logger.info(
+            f"{name.ljust(width)} | {summary['mean_us']:>8.1f}us | {summary['p50_us']:>8.1f}us | "
+            f"{summary['p90_us']:>8.1f}us | {summary['p99_us']:>8.1f}us | {speedup:.2f}x"
+        )
@@ -16,7 +16,6 @@ import os
 import sys
 from pathlib import Path
 
-import nest_asyncio
 import numpy as np
 from tqdm import trange
 
@@ -27,8 +26,6 @@ from environment.qlearning.phototaxis_env import PhototaxisEnv
 from utils.log import Logger
 from utils.reader import get_yaml_path, read_file
 
-nest_asyncio.apply()
-
 
 # Initialize logger
 logger = Logger(__name__)
@@ -23,7 +23,6 @@ from tqdm import tqdm
 # Imports and async setup
 # -----------------------------------------------------------------------------
 sys.path.append("..")
-import nest_asyncio
 from utils.log import Logger
 from utils.reader import get_yaml_path, read_file
 from agent.qagent import QAgent
@@ -32,8 +31,6 @@ from environment.qlearning.phototaxis_env import PhototaxisEnv
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-nest_asyncio.apply()
-
 
 logger = Logger(__name__)
 
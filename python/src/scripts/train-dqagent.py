@@ -16,10 +16,10 @@ sys.path.append("..")
 
 import argparse
 import os
+import shlex
 import time
 from pathlib import Path
 
-import nest_asyncio
 import tensorflow as tf
 
 from agent.scala_dqagent import DQAgent
@@ -27,11 +27,12 @@ from environment.deepqlearning.obstacle_avoidance_env import ObstacleAvoidanceEn
 from environment.deepqlearning.exploration_env import ExplorationEnv
 from training.dqnetwork import DQNetwork
 from training.multi_agent_dqlearning import DQLearning
+from rl.client_pool import RLClientPool, parse_endpoints
+from rl.reconnect import ReconnectPolicy
+from rl.supervisor import LOCAL_SERVER_COMMAND, SimulatorSupervisor
 from utils.log import Logger
 from utils.reader import get_yaml_path, read_file
 
-nest_asyncio.apply()
-
 gpus = tf.config.experimental.list_physical_devices("GPU")
 if gpus:
     tf.config.experimental.set_memory_growth(gpus[0], True)
@@ -47,8 +48,17 @@ DEFAULTS = {
     "port": 50051,
     "episodes": 10,
     "steps": 5000,
+    "action_repeat": 1,
     "window_size": 50,
     "checkpoint_dir": None,  # inferred from config basename
+    "endpoints": None,
+    "failover_endpoints": None,
+    "reconnect_attempts": 5,
+    "simulators": 0,
+    "simulator_command": None,  # the local stand-in
+    "simulator_logs": None,
+    "record_trace": None,
+    "rpc_metrics": None,
     "client_name": "RLClient",
     "env": "exploration",
     "neurons": [64, 32],
@@ -95,6 +105,66 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULTS["port"],
         help="Server port (e.g., 5051, 5052, 5053).",
     )
+    p.add_argument(
+        "--endpoints",
+        type=str,
+        default=DEFAULTS["endpoints"],
+        help="Simulator endpoints to pick the least-loaded live one from, "
+        "e.g. localhost:50051-50066. Overrides --server-host and --port.",
+        required=False,
+    )
+    p.add_argument(
+        "--failover-endpoints",
+        type=str,
+        default=DEFAULTS["failover_endpoints"],
+        help="Spare simulator endpoints to fail over to if the simulator is lost, "
+        "e.g. localhost:50052-50053; with --endpoints the pool ones are used.",
+        required=False,
+    )
+    p.add_argument(
+        "--reconnect-attempts",
+        type=int,
+        default=DEFAULTS["reconnect_attempts"],
+        help="Rounds over the endpoints, with backoff, before giving up on a "
+        "lost simulator; 0 to stop at the first lost connection.",
+    )
+    p.add_argument(
+        "--simulators",
+        type=int,
+        default=DEFAULTS["simulators"],
+        help="Simulator servers to start and supervise on --port and the following "
+        "ports, stopped with the script; the extra ones are failover spares.",
+    )
+    p.add_argument(
+        "--simulator-command",
+        type=str,
+        default=DEFAULTS["simulator_command"],
+        help="Command starting a simulator server, with {port} for its port, e.g. "
+        "'java -jar PPS-22-srs.jar --rl --headless --port {port}'; "
+        "the local stand-in if omitted.",
+        required=False,
+    )
+    p.add_argument(
+        "--simulator-logs",
+        type=str,
+        default=DEFAULTS["simulator_logs"],
+        help="Directory of the supervised simulator outputs, the console if omitted.",
+        required=False,
+    )
+    p.add_argument(
+        "--record-trace",
+        type=str,
+        default=DEFAULTS["record_trace"],
+        help="File to record the simulator calls to, for rl.replay_server.",
+        required=False,
+    )
+    p.add_argument(
+        "--rpc-metrics",
+        type=str,
+        default=DEFAULTS["rpc_metrics"],
+        help="JSON or CSV file the simulator call metrics are dumped to.",
+        required=False,
+    )
     p.add_argument(
         "--episodes",
         type=int,
@@ -107,6 +177,12 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULTS["steps"],
         help="Max steps per episode.",
     )
+    p.add_argument(
+        "--action-repeat",
+        type=int,
+        default=DEFAULTS["action_repeat"],
+        help="Simulator ticks every action is applied for.",
+    )
     p.add_argument(
         "--window-size",
         type=int,
@@ -236,10 +312,18 @@ def print_effective_config(
 ) -> None:
     logger.info("== Effective settings ==========")
     logger.info(f"  resolved_config             : {config_path}")
-    logger.info(f"  server                      : {args.server_host}:{args.port}")
+    logger.info(
+        f"  server                      : {args.endpoints or f'{args.server_host}:{args.port}'}"
+    )
+    logger.info(f"  failover_endpoints          : {args.failover_endpoints or 'None'}")
+    logger.info(f"  reconnect_attempts          : {args.reconnect_attempts}")
+    logger.info(f"  simulators                  : {args.simulators}")
+    logger.info(f"  record_trace                : {args.record_trace or 'None'}")
+    logger.info(f"  rpc_metrics                 : {args.rpc_metrics or 'None'}")
     logger.info(f"  client_name                 : {args.client_name}")
     logger.info(f"  episodes                    : {args.episodes}")
     logger.info(f"  steps/episode               : {args.steps}")
+    logger.info(f"  action_repeat               : {args.action_repeat}")
     logger.info(f"  window_size                 : {args.window_size}")
     logger.info(f"  checkpoint_base             : {checkpoint_base}")
     logger.info(f"  env                         : {args.env}")
@@ -256,6 +340,27 @@ def print_effective_config(
     logger.info("================================\n")
 
 
+def start_simulators(args: argparse.Namespace) -> SimulatorSupervisor | None:
+    """Start the `--simulators` supervised servers, the ones after the first
+    becoming the failover spares unless endpoints are given."""
+    if args.simulators <= 0:
+        return None
+    command = (
+        shlex.split(args.simulator_command)
+        if args.simulator_command
+        else LOCAL_SERVER_COMMAND
+    )
+    supervisor = SimulatorSupervisor(
+        range(args.port, args.port + args.simulators),
+        command,
+        host=args.server_host,
+        log_dir=args.simulator_logs,
+    ).start()
+    if args.simulators > 1 and not (args.endpoints or args.failover_endpoints):
+        args.failover_endpoints = supervisor.endpoints
+    return supervisor
+
+
 def main() -> None:
     args = parse_args()
 
@@ -272,72 +377,103 @@ def main() -> None:
     # Build server address
     server_address = f"{args.server_host}:{args.port}"
 
-    # Init environment
-    env = resolve_env(args.env, server_address, args.client_name)
-    env.connect_to_client()
-    env.init(configs[0])
+    # Start the supervised simulators, if any
+    supervisor = start_simulators(args)
+
+    pool = None
+    try:
+        # Init environment
+        env = resolve_env(args.env, server_address, args.client_name)
+        if args.endpoints:
+            pool = RLClientPool(parse_endpoints(args.endpoints), args.client_name)
+            env.connect_to_pool(pool)
+        else:
+            env.connect_to_client()
+        if args.reconnect_attempts > 0:
+            env.reconnect = ReconnectPolicy(
+                parse_endpoints(args.failover_endpoints)
+                if args.failover_endpoints
+                else [],
+                attempts=args.reconnect_attempts,
+            )
+        if args.record_trace:
+            env.client.start_recording(args.record_trace)
+        if args.rpc_metrics:
+            env.client.metrics.start_periodic_dump(args.rpc_metrics)
+        env.init(configs[0])
+
+        action_net = DQNetwork(
+            env.observation_space.shape,
+            args.neurons,
+            env.action_space.n,
+            summary=False,
+        )
+        target_net = DQNetwork(
+            env.observation_space.shape,
+            args.neurons,
+            env.action_space.n,
+            summary=False,
+        )
 
-    action_net = DQNetwork(
-        env.observation_space.shape,
-        args.neurons,
-        env.action_space.n,
-        summary=False,
-    )
-    target_net = DQNetwork(
-        env.observation_space.shape,
-        args.neurons,
-        env.action_space.n,
-        summary=False,
-    )
+        # Agent(s)
+        agent = DQAgent(
+            env,
+            agent_id=FIXED_AGENT_ID,
+            action_model=action_net,
+            target_model=target_net,
+            epsilon_max=args.epsilon_max,
+            epsilon_min=args.epsilon_min,
+            gamma=args.gamma,
+            replay_memory_max_size=args.replay_memory_max_size,
+            replay_memory_init_size=args.replay_memory_init_size,
+            batch_size=args.batch_size,
+            step_per_update=args.step_per_update,
+            step_per_update_target_model=args.step_per_update_target_model,
+            moving_avg_window_size=args.window_size,
+            moving_avg_stop_thr=args.moving_avg_stop_thr,
+            episode_max_steps=args.steps,
+            episodes=args.episodes,
+        )
 
-    # Agent(s)
-    agent = DQAgent(
-        env,
-        agent_id=FIXED_AGENT_ID,
-        action_model=action_net,
-        target_model=target_net,
-        epsilon_max=args.epsilon_max,
-        epsilon_min=args.epsilon_min,
-        gamma=args.gamma,
-        replay_memory_max_size=args.replay_memory_max_size,
-        replay_memory_init_size=args.replay_memory_init_size,
-        batch_size=args.batch_size,
-        step_per_update=args.step_per_update,
-        step_per_update_target_model=args.step_per_update_target_model,
-        moving_avg_window_size=args.window_size,
-        moving_avg_stop_thr=args.moving_avg_stop_thr,
-        episode_max_steps=args.steps,
-        episodes=args.episodes,
-    )
+        train_start_time = time.time()
 
-    train_start_time = time.time()
+        trainer = DQLearning(
+            env,
+            [agent],
+            configs=configs,
+            episode_count=args.episodes,
+            episode_max_steps=args.steps,
+            action_repeat=args.action_repeat,
+        )
 
-    trainer = DQLearning(
-        env,
-        [agent],
-        configs=configs,
-        episode_count=args.episodes,
-        episode_max_steps=args.steps,
-    )
+        # # Compute checkpoint base & show effective settings
+        checkpoint_base = get_yaml_path(*args.checkpoint_dir)
+        print_effective_config(args, config_path, checkpoint_base)
 
-    # # Compute checkpoint base & show effective settings
-    checkpoint_base = get_yaml_path(*args.checkpoint_dir)
-    print_effective_config(args, config_path, checkpoint_base)
+        os.makedirs(os.path.dirname(checkpoint_base) or ".", exist_ok=True)
 
-    os.makedirs(os.path.dirname(checkpoint_base) or ".", exist_ok=True)
+        # Train
+        _ = trainer.simple_dqn_training(
+            checkpoint_base=checkpoint_base, variable_steps=True
+        )
 
-    # Train
-    _ = trainer.simple_dqn_training(
-        checkpoint_base=checkpoint_base, variable_steps=True
-    )
+        env.client.stop_recording()
+        env.client.metrics.stop_periodic_dump()
+        env.client.metrics.log_summary()
 
-    train_finish_time = time.time()
-    train_elapsed_time = train_finish_time - train_start_time
-    train_avg_episode_time = train_elapsed_time / args.episodes
+        train_finish_time = time.time()
+        train_elapsed_time = train_finish_time - train_start_time
+        train_avg_episode_time = train_elapsed_time / args.episodes
 
-    logger.info(
-        f"Train time: {train_elapsed_time / 60.0:.1f}m [{train_avg_episode_time:.1f}s]"
-    )
+        logger.info(
+            f"Train time: {train_elapsed_time / 60.0:.1f}m [{train_avg_episode_time:.1f}s]"
+        )
+
+    finally:
+        if pool is not None:
+            env.loop.run_until_complete(pool.close())
+        if supervisor is not None:
+            supervisor.stop()
 
 
 if __name__ == "__main__":
@@ -15,8 +15,8 @@ sys.path.append("..")
 
 import argparse
 import os
+import shlex
 
-import nest_asyncio
 import numpy as np
 from tqdm import trange
 
@@ -24,12 +24,13 @@ from agent.qagent import QAgent
 from environment.qlearning.exploration_env import ExplorationEnv
 from environment.qlearning.obstacle_avoidance_env import ObstacleAvoidanceEnv
 from environment.qlearning.phototaxis_env import PhototaxisEnv
+from rl.client_pool import RLClientPool, parse_endpoints
+from rl.reconnect import ReconnectPolicy
+from rl.supervisor import LOCAL_SERVER_COMMAND, SimulatorSupervisor
 from utils.log import Logger
 from utils.reader import get_yaml_path, read_file
 from utils.reproducibility import set_global_seed
 
-nest_asyncio.apply()
-
 
 # Initialize logger
 logger = Logger(__name__)
@@ -41,10 +42,19 @@ DEFAULTS = {
     "port": 50051,
     "episodes": 10,
     "steps": 5000,
+    "action_repeat": 1,
     "window_size": 50,
     "checkpoint_dir": None,  # inferred from config basename
     "load_checkpoint": None,
     "start_episode": 0,
+    "endpoints": None,
+    "failover_endpoints": None,
+    "reconnect_attempts": 5,
+    "simulators": 0,
+    "simulator_command": None,  # the local stand-in
+    "simulator_logs": None,
+    "record_trace": None,
+    "rpc_metrics": None,
     "client_name": "RLClient",
     "env": "exploration",
     "alpha": 0.5,
@@ -83,6 +93,66 @@ def parse_args() -> argparse.Namespace:
         help="Server port (e.g., 5051, 5052, 5053).",
         required=False,
     )
+    p.add_argument(
+        "--endpoints",
+        type=str,
+        default=DEFAULTS["endpoints"],
+        help="Simulator endpoints to pick the least-loaded live one from, "
+        "e.g. localhost:50051-50066. Overrides --server-host and --port.",
+        required=False,
+    )
+    p.add_argument(
+        "--failover-endpoints",
+        type=str,
+        default=DEFAULTS["failover_endpoints"],
+        help="Spare simulator endpoints to fail over to if the simulator is lost, "
+        "e.g. localhost:50052-50053; with --endpoints the pool ones are used.",
+        required=False,
+    )
+    p.add_argument(
+        "--reconnect-attempts",
+        type=int,
+        default=DEFAULTS["reconnect_attempts"],
+        help="Rounds over the endpoints, with backoff, before giving up on a "
+        "lost simulator; 0 to stop at the first lost connection.",
+    )
+    p.add_argument(
+        "--simulators",
+        type=int,
+        default=DEFAULTS["simulators"],
+        help="Simulator servers to start and supervise on --port and the following "
+        "ports, stopped with the script; the extra ones are failover spares.",
+    )
+    p.add_argument(
+        "--simulator-command",
+        type=str,
+        default=DEFAULTS["simulator_command"],
+        help="Command starting a simulator server, with {port} for its port, e.g. "
+        "'java -jar PPS-22-srs.jar --rl --headless --port {port}'; "
+        "the local stand-in if omitted.",
+        required=False,
+    )
+    p.add_argument(
+        "--simulator-logs",
+        type=str,
+        default=DEFAULTS["simulator_logs"],
+        help="Directory of the supervised simulator outputs, the console if omitted.",
+        required=False,
+    )
+    p.add_argument(
+        "--record-trace",
+        type=str,
+        default=DEFAULTS["record_trace"],
+        help="File to record the simulator calls to, for rl.replay_server.",
+        required=False,
+    )
+    p.add_argument(
+        "--rpc-metrics",
+        type=str,
+        default=DEFAULTS["rpc_metrics"],
+        help="JSON or CSV file the simulator call metrics are dumped to.",
+        required=False,
+    )
     p.add_argument(
         "--episodes",
         type=int,
@@ -95,6 +165,12 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULTS["steps"],
         help="Max steps per episode.",
     )
+    p.add_argument(
+        "--action-repeat",
+        type=int,
+        default=DEFAULTS["action_repeat"],
+        help="Simulator ticks every action is applied for.",
+    )
     p.add_argument(
         "--window-size",
         type=int,
@@ -170,10 +246,18 @@ def print_effective_config(
 ) -> None:
     logger.info("== Effective settings ==")
     logger.info(f"  resolved_config    : {config_path}")
-    logger.info(f"  server             : {args.server_host}:{args.port}")
+    logger.info(
+        f"  server             : {args.endpoints or f'{args.server_host}:{args.port}'}"
+    )
+    logger.info(f"  failover_endpoints : {args.failover_endpoints or 'None'}")
+    logger.info(f"  reconnect_attempts : {args.reconnect_attempts}")
+    logger.info(f"  simulators         : {args.simulators}")
+    logger.info(f"  record_trace       : {args.record_trace or 'None'}")
+    logger.info(f"  rpc_metrics        : {args.rpc_metrics or 'None'}")
     logger.info(f"  client_name        : {args.client_name}")
     logger.info(f"  episodes           : {args.episodes}")
     logger.info(f"  steps/episode      : {args.steps}")
+    logger.info(f"  action_repeat      : {args.action_repeat}")
     logger.info(f"  window_size        : {args.window_size}")
     logger.info(f"  checkpoint_base    : {checkpoint_base}")
     logger.info(f"  load_checkpoint    : {args.load_checkpoint or 'None'}")
@@ -211,8 +295,7 @@ def run_episodes(
             actual_episode = start_episode + ep_idx
 
             config = np.random.choice(configs)
-            _ = env.init(config)
-            obs, _ = env.reset()
+            obs, _ = env.init_reset(config)
             done = False
             step = 0
             total_reward = {agent_id: 0.0}
@@ -271,6 +354,27 @@ if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
+def start_simulators(args: argparse.Namespace) -> SimulatorSupervisor | None:
+    """Start the `--simulators` supervised servers, the ones after the first
+    becoming the failover spares unless endpoints are given."""
+    if args.simulators <= 0:
+        return None
+    command = (
+        shlex.split(args.simulator_command)
+        if args.simulator_command
+        else LOCAL_SERVER_COMMAND
+    )
+    supervisor = SimulatorSupervisor(
+        range(args.port, args.port + args.simulators),
+        command,
+        host=args.server_host,
+        log_dir=args.simulator_logs,
+    ).start()
+    if args.simulators > 1 and not (args.endpoints or args.failover_endpoints):
+        args.failover_endpoints = supervisor.endpoints
+    return supervisor
+
+
 def main() -> None:
     args = parse_args()
     set_global_seed(seed=42)
@@ -287,38 +391,69 @@ def main() -> None:
     # Build server address
     server_address = f"{args.server_host}:{args.port}"
 
-    # Init environment
-    env = resolve_env(args.env, server_address, args.client_name)
-    env.connect_to_client()
-
-    # Agent(s)
-    agent = QAgent(env, episodes=args.episodes, alpha=args.alpha)
-    agents = {FIXED_AGENT_ID: agent}
-
-    # Compute checkpoint base & show effective settings
-    checkpoint_base = get_yaml_path(*args.checkpoint_dir)
-    print_effective_config(args, config_path, checkpoint_base)
-
-    # Train
-    run_episodes(
-        env=env,
-        configs=configs,
-        agents=agents,
-        agent_id=FIXED_AGENT_ID,
-        episode_count=args.episodes,
-        episode_max_steps=args.steps,
-        window_size=args.window_size,
-        checkpoint_base=checkpoint_base,
-        start_episode=args.start_episode,
-        load_checkpoint=args.load_checkpoint,
-    )
+    # Start the supervised simulators, if any
+    supervisor = start_simulators(args)
 
-    # Quick stats
-    logger.info(f"Q-table shape: {agent.Q.shape}")
-    logger.info(f"Non-zero entries: {np.count_nonzero(agent.Q)}")
-    logger.info(f"Q-table min/max: {agent.Q.min():.4f} / {agent.Q.max():.4f}")
-    visited_states = np.where(np.any(agent.Q != 0, axis=1))[0]
-    logger.info(f"States visited: {len(visited_states)} / {agent.Q.shape[0]}")
+    pool = None
+    try:
+        # Init environment
+        env = resolve_env(args.env, server_address, args.client_name)
+        env.action_repeat = args.action_repeat
+        if args.endpoints:
+            pool = RLClientPool(parse_endpoints(args.endpoints), args.client_name)
+            env.connect_to_pool(pool)
+        else:
+            env.connect_to_client()
+        if args.reconnect_attempts > 0:
+            env.reconnect = ReconnectPolicy(
+                parse_endpoints(args.failover_endpoints)
+                if args.failover_endpoints
+                else [],
+                attempts=args.reconnect_attempts,
+            )
+        if args.record_trace:
+            env.client.start_recording(args.record_trace)
+        if args.rpc_metrics:
+            env.client.metrics.start_periodic_dump(args.rpc_metrics)
+
+        # Agent(s)
+        agent = QAgent(env, episodes=args.episodes, alpha=args.alpha)
+        agents = {FIXED_AGENT_ID: agent}
+
+        # Compute checkpoint base & show effective settings
+        checkpoint_base = get_yaml_path(*args.checkpoint_dir)
+        print_effective_config(args, config_path, checkpoint_base)
+
+        # Train
+        run_episodes(
+            env=env,
+            configs=configs,
+            agents=agents,
+            agent_id=FIXED_AGENT_ID,
+            episode_count=args.episodes,
+            episode_max_steps=args.steps,
+            window_size=args.window_size,
+            checkpoint_base=checkpoint_base,
+            start_episode=args.start_episode,
+            load_checkpoint=args.load_checkpoint,
+        )
+
+        env.client.stop_recording()
+        env.client.metrics.stop_periodic_dump()
+        env.client.metrics.log_summary()
+
+        # Quick stats
+        logger.info(f"Q-table shape: {agent.Q.shape}")
+        logger.info(f"Non-zero entries: {np.count_nonzero(agent.Q)}")
+        logger.info(f"Q-table min/max: {agent.Q.min():.4f} / {agent.Q.max():.4f}")
+        visited_states = np.where(np.any(agent.Q != 0, axis=1))[0]
+        logger.info(f"States visited: {len(visited_states)} / {agent.Q.shape[0]}")
+
+    finally:
+        if pool is not None:
+            env.loop.run_until_complete(pool.close())
+        if supervisor is not None:
+            supervisor.stop()
 
 
 if __name__ == "__main__":
@@ -193,6 +193,8 @@ class DQLearning:
         pygame.display.set_caption("DQN Agent Playing")
         clock = pygame.time.Clock()
         running = True
+        # frame buffer reused by every render call
+        rgb_array = None
 
         for ep in range(episodes):
             state, _ = self.env.reset()
@@ -212,7 +214,7 @@ class DQLearning:
                 total_reward += reward
                 state = next_state
 
-                rgb_array = self.env.render()
+                rgb_array = self.env.render(out=rgb_array)
                 surface = pygame.surfarray.make_surface(
                     np.transpose(rgb_array, (1, 0, 2))
                 )
@@ -23,6 +23,14 @@ class QLearning:
         Total number of training episodes.
     max_steps_per_episode : int, optional (default=200)
         Maximum number of steps per episode before it is truncated.
+    pipelined : bool, optional (default=False)
+        If True, the next step is submitted with `env.step_async` before the
+        Q-value updates of the current one, so they overlap with the RPC.
+        Ignored while rendering.
+    action_repeat : int, optional (default=1)
+        Simulator ticks every chosen action is applied for, set on
+        `env.action_repeat`; a step then counts as one towards
+        `max_steps_per_episode` and its rewards are summed over the ticks.
 
     Attributes
     ----------
@@ -37,13 +45,24 @@ class QLearning:
         agents: dict[str, QAgent],
         episode_count: int = 2000,
         max_steps_per_episode: int = 200,
+        pipelined: bool = False,
+        action_repeat: int = 1,
     ):
         self.env = env
+        self.env.action_repeat = action_repeat
         self.agents = agents
         self.episode_count = episode_count
         self.episode_max_steps = max_steps_per_episode
+        self.pipelined = pipelined
         self.learning_history = {agent_id: [] for agent_id in agents.keys()}
 
+    def _choose_actions(self, obs: dict, training: bool) -> dict:
+        """Chooses an action for every observed agent."""
+        return {
+            k: self.agents[k].choose_action(v, epsilon_greedy=training)
+            for k, v in obs.items()
+        }
+
     def _run_episode(
         self,
         render: bool,
@@ -94,14 +113,30 @@ class QLearning:
         )
         running = True
         step_count = 0
+        pipelined = self.pipelined and not render
+        # frame buffer reused by every render call
+        rgb_array = None
 
-        while not all(done.values()) and step_count < self.episode_max_steps:
-            actions = {
-                k: self.agents[k].choose_action(v, epsilon_greedy=training)
-                for k, v in obs.items()
-            }
+        if pipelined:
+            actions = self._choose_actions(obs, training)
+            self.env.step_async(actions)
 
-            next_obs, rewards, terminateds, truncateds, _ = self.env.step(actions)
+        while not all(done.values()) and step_count < self.episode_max_steps:
+            if pipelined:
+                next_obs, rewards, terminateds, truncateds, _ = self.env.step_wait()
+                next_actions = self._submit_next_step(
+                    obs,
+                    next_obs,
+                    rewards,
+                    terminateds,
+                    truncateds,
+                    done,
+                    step_count,
+                    training,
+                )
+            else:
+                actions = self._choose_actions(obs, training)
+                next_obs, rewards, terminateds, truncateds, _ = self.env.step(actions)
 
             for agent_id in self.agents.keys():
                 if (
@@ -140,10 +175,12 @@ class QLearning:
                     )
 
             obs = next_obs
+            if pipelined:
+                actions = next_actions
             step_count += 1
 
             if render:
-                rgb_array = self.env.render()
+                rgb_array = self.env.render(out=rgb_array)
                 _render_frame(rgb_array, screen, clock)
                 running = _check_quit_event()
                 if not running:
@@ -164,6 +201,36 @@ class QLearning:
 
         return total_reward, step_count, running, episode_history
 
+    def _submit_next_step(
+        self,
+        obs: dict,
+        next_obs: dict,
+        rewards: dict,
+        terminateds: dict,
+        truncateds: dict,
+        done: dict[str, bool],
+        step_count: int,
+        training: bool,
+    ) -> dict | None:
+        """Submits the next step with `env.step_async` if the episode goes on.
+
+        Returns
+        -------
+        dict | None
+            The submitted actions, or None if the episode ends with this step.
+        """
+        next_done = done | {
+            agent_id: terminateds.get(agent_id, False)
+            or truncateds.get(agent_id, False)
+            for agent_id in self.agents.keys()
+            if agent_id in obs and agent_id in next_obs and agent_id in rewards
+        }
+        if all(next_done.values()) or step_count + 1 >= self.episode_max_steps:
+            return None
+        next_actions = self._choose_actions(next_obs, training)
+        self.env.step_async(next_actions)
+        return next_actions
+
     def train(
         self, render: bool = False, record_history: bool = True
     ) -> dict[str, list[float]]:
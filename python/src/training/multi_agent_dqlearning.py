@@ -25,6 +25,14 @@ class DQLearning:
         Number of training episodes.
     episode_max_steps : int, optional (default=200)
         Maximum number of steps per episode.
+    pipelined : bool, optional (default=False)
+        If True, the next step is submitted with `env.step_async` before the
+        learning updates of the current one, so they overlap with the RPC.
+        Actions are then chosen before the network update of the previous step.
+    action_repeat : int, optional (default=1)
+        Simulator ticks every chosen action is applied for, set on
+        `env.action_repeat`; a step then counts as one towards
+        `episode_max_steps` and its rewards are summed over the ticks.
     """
 
     def __init__(
@@ -36,14 +44,27 @@ class DQLearning:
         episode_max_steps: int = 200,
         steps_start=100,
         steps_end=20000,
+        pipelined: bool = False,
+        action_repeat: int = 1,
     ):
         self.env = env
+        self.env.action_repeat = action_repeat
         self.agents = agents
         self.configs = configs
         self.episode_count = episode_count
         self.episode_max_steps = episode_max_steps
         self.steps_start = steps_start
         self.steps_end = steps_end
+        self.pipelined = pipelined
+
+    def _choose_actions(self, states: dict, dones: dict | None = None) -> dict:
+        """Chooses the actions of the agents that are still running."""
+        dones = dones or {}
+        return {
+            agent.id: agent.choose_action(states[agent.id])
+            for agent in self.agents
+            if not agent.terminated and not dones.get(agent.id, False)
+        }
 
     def simple_dqn_training(
         self, checkpoint_base: str | None = None, variable_steps: bool = False
@@ -64,8 +85,7 @@ class DQLearning:
                 max_steps = self.episode_max_steps
 
             config = np.random.choice(self.configs)
-            _ = self.env.init(config)
-            states, _ = self.env.reset()
+            states, _ = self.env.init_reset(config)
 
             episode_reward = {agent.id: 0 for agent in self.agents}
             episode_start_time = time.time()
@@ -76,22 +96,35 @@ class DQLearning:
             for agent in self.agents:
                 agent.terminated = False
 
-            while step_count < max_steps and not done:
-                actions = {
-                    agent.id: agent.choose_action(states[agent.id])
-                    for agent in self.agents
-                    if not agent.terminated
-                }
+            if self.pipelined:
+                actions = self._choose_actions(states)
+                self.env.step_async(actions)
 
-                next_states, rewards, terminateds, truncateds, _ = self.env.step(
-                    actions
-                )
+            while step_count < max_steps and not done:
+                if self.pipelined:
+                    next_states, rewards, terminateds, truncateds, _ = (
+                        self.env.step_wait()
+                    )
+                else:
+                    actions = self._choose_actions(states)
+                    next_states, rewards, terminateds, truncateds, _ = self.env.step(
+                        actions
+                    )
 
                 dones = {
                     agent.id: terminateds[agent.id] or truncateds[agent.id]
                     for agent in self.agents
                 }
 
+                next_actions = None
+                if (
+                    self.pipelined
+                    and not all(dones.values())
+                    and step_count + 1 < max_steps
+                ):
+                    next_actions = self._choose_actions(next_states, dones)
+                    self.env.step_async(next_actions)
+
                 for agent in self.agents:
                     if not agent.terminated:
                         agent.store_transition(
@@ -120,6 +153,8 @@ class DQLearning:
 
                 done = all(dones.values())
                 states = next_states
+                if self.pipelined:
+                    actions = next_actions
                 step_count += 1
                 train_step_count += 1
 
@@ -187,6 +222,8 @@ class DQLearning:
         # Font for displaying info
         font = pygame.font.Font(None, 24)
         info_font = pygame.font.Font(None, 20)
+        # frame buffer reused by every render call
+        rgb_array = None
 
         for ep in range(episodes):
             states, _ = self.env.reset()
@@ -235,7 +272,7 @@ class DQLearning:
                 total_reward += rewards[self.agents[0].id]
                 states = next_states
 
-                rgb_array = self.env.render()
+                rgb_array = self.env.render(out=rgb_array)
                 surface = pygame.surfarray.make_surface(
                     np.transpose(rgb_array, (1, 0, 2))
                 )
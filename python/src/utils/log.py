@@ -29,6 +29,10 @@ class Logger:
         """Logs a warning message."""
         self.logger.warning(message)
 
+    def debug_enabled(self) -> bool:
+        """Whether debug messages are emitted, to skip formatting them."""
+        return self.logger.isEnabledFor(logging.DEBUG)
+
     def debug(self, message):
         """Logs a debug message."""
         self.logger.debug(message)
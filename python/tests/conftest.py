@@ -0,0 +1,95 @@
+import asyncio
+import itertools
+import socket
+import threading
+
+import pytest
+
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+from rl.local_server import start_server
+
+PHOTOTAXIS_OPTIONS = {
+    "light_direction": ["none", "light4", "light8"],
+    "light_has_no_light_state": [False, True],
+    "light_intensity_bins": [1, 2, 3],
+    "prox_direction": [
+        "none",
+        "front_min",
+        "prox4",
+        "prox8",
+        "prox4_threat",
+        "prox8_threat",
+    ],
+    "prox_intensity_bins": [1, 2, 3],
+}
+
+
+def _config(agents: int = 1, size: int = 10) -> str:
+    lines = [
+        "environment:",
+        f"  width: {size}",
+        f"  height: {size}",
+        "  entities:",
+        "    - light:",
+        f"        position: [{size - 2.0}, {size - 2.0}]",
+    ]
+    for i in range(agents):
+        lines += [
+            "    - agent:",
+            f"        id: 00000000-0000-0000-0000-{i + 1:012d}",
+            f"        position: [{1.0 + i % (size - 2)}, {1.0 + i // (size - 2)}]",
+            f"        orientation: {45.0 * i % 360}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+@pytest.fixture
+def make_config():
+    """Return a function giving the YAML configuration of a square arena
+    with a light in a corner and a number of robots on a row."""
+    return _config
+
+
+@pytest.fixture
+def free_port():
+    """Return a function giving a localhost port nobody is listening on."""
+
+    def port() -> int:
+        with socket.socket() as s:
+            s.bind(("localhost", 0))
+            return s.getsockname()[1]
+
+    return port
+
+
+@pytest.fixture
+def threaded_server(free_port):
+    """Address of a stand-in served from a thread of its own, so that
+    environments can block on it from any thread."""
+    address = f"localhost:{free_port()}"
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(start_server(address))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield address
+    asyncio.run_coroutine_threadsafe(server.stop(None), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+@pytest.fixture(
+    params=[
+        dict(zip(PHOTOTAXIS_OPTIONS, values, strict=True))
+        for values in itertools.product(*PHOTOTAXIS_OPTIONS.values())
+    ],
+    ids=lambda options: "-".join(str(value) for value in options.values()),
+)
+def phototaxis_env(request):
+    """A Q-learning phototaxis environment, for every combination of its
+    light and proximity encoders."""
+    options = request.param
+    thresholds = {2: [0.4], 3: [0.2, 0.6]}.get(options["light_intensity_bins"])
+    return PhototaxisEnv(
+        "localhost:0", light_intensity_thresholds=thresholds, **options
+    )
@@ -0,0 +1,108 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import rl_pb2
+from rl.local_server import LocalRLServicer, start_server
+from rl.metrics import RPCMetrics
+from rl.observation_batch import PackedObservations
+from rl.rl_client import RLClient
+
+REPEAT = 4
+
+
+class SingleTickServicer(LocalRLServicer):
+    """Stand-in that ignores `repeat`, applying one tick per call, as servers
+    without the feature do."""
+
+    async def _step(self, request: rl_pb2.StepRequest) -> rl_pb2.StepResponse:
+        response = self.instances[request.instance].step(
+            request.actions, request.packed
+        )
+        response.ClearField("ticks")
+        return response
+
+
+def _rows(observations) -> dict[str, np.ndarray]:
+    """Proximity, light and visited values of every agent, in one row."""
+    if isinstance(observations, PackedObservations):
+        return {
+            agent_id: np.concatenate(
+                [
+                    observations.proximity[i],
+                    observations.light[i],
+                    observations.visited[i],
+                ]
+            )
+            for i, agent_id in enumerate(observations.agent_ids)
+        }
+    return {
+        agent_id: np.array([*o.proximity_values, *o.light_values, *o.visited_positions])
+        for agent_id, o in observations.items()
+    }
+
+
+async def _episodes(address: str, servicer, config: str, packed: bool):
+    """Outcome of every decision step of seeded episodes, and the Step calls."""
+    server = await start_server(address, servicer)
+    metrics = RPCMetrics()
+    client = RLClient(address, "TestClient", metrics=metrics, packed_steps=packed)
+    try:
+        await client.connect()
+        await client.init(config, mask=rl_pb2.ObservationMask(visited_delta=True))
+        rng = np.random.default_rng(7)
+        episode = 0
+        observations, _ = await client.reset(episode)
+        outcomes = []
+        for _ in range(60):
+            agent_ids = list(observations)
+            wheels = rng.uniform(-1.0, 1.0, (len(agent_ids), 2)).tolist()
+            actions = {
+                agent_id: rl_pb2.ContinuousAction(left_wheel=left, right_wheel=right)
+                for agent_id, (left, right) in zip(agent_ids, wheels, strict=True)
+            }
+            observations, rewards, terminateds, truncateds, _ = await client.step(
+                actions, repeat=REPEAT
+            )
+            outcomes.append(
+                (
+                    _rows(observations),
+                    dict(rewards),
+                    dict(terminateds),
+                    dict(truncateds),
+                )
+            )
+            if any(terminateds.values()) or any(truncateds.values()):
+                episode += 1
+                observations, _ = await client.reset(episode)
+        return outcomes, metrics.get(address, "Step").latency.count
+    finally:
+        await client.close()
+        await server.stop(None)
+
+
+@pytest.mark.parametrize("packed", [False, True], ids=["maps", "packed"])
+def test_client_fallback_repeats_as_the_server(packed, make_config, free_port):
+    config = make_config(agents=4)
+    expected, server_calls = asyncio.run(
+        _episodes(f"localhost:{free_port()}", LocalRLServicer(), config, packed)
+    )
+    actual, client_calls = asyncio.run(
+        _episodes(f"localhost:{free_port()}", SingleTickServicer(), config, packed)
+    )
+
+    assert server_calls == len(expected)
+    assert client_calls > server_calls
+    for (obs, rewards, terminateds, truncateds), (
+        e_obs,
+        e_rewards,
+        e_terminateds,
+        e_truncateds,
+    ) in zip(actual, expected, strict=True):
+        assert (terminateds, truncateds) == (e_terminateds, e_truncateds)
+        assert obs.keys() == e_obs.keys()
+        for agent_id, row in obs.items():
+            np.testing.assert_array_equal(row, e_obs[agent_id])
+        # summed by the server in double and by the client from float32 blobs
+        assert rewards == pytest.approx(e_rewards, rel=1e-5, abs=1e-6)
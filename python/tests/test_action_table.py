@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import rl_pb2
+from environment.deepqlearning.exploration_env import (
+    ExplorationEnv as DQExplorationEnv,
+)
+from environment.deepqlearning.obstacle_avoidance_env import (
+    ObstacleAvoidanceEnv as DQObstacleAvoidanceEnv,
+)
+from environment.deepqlearning.phototaxis_env import PhototaxisEnv as DQPhototaxisEnv
+from environment.qlearning.exploration_env import ExplorationEnv
+from environment.qlearning.obstacle_avoidance_env import ObstacleAvoidanceEnv
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+from rl.local_server import start_server
+
+ENVS = {
+    "qlearning-obstacle_avoidance": ObstacleAvoidanceEnv,
+    "qlearning-phototaxis": PhototaxisEnv,
+    "qlearning-exploration": ExplorationEnv,
+    "deepqlearning-obstacle_avoidance": DQObstacleAvoidanceEnv,
+    "deepqlearning-phototaxis": DQPhototaxisEnv,
+    "deepqlearning-exploration": DQExplorationEnv,
+}
+
+AGENT_IDS = [f"00000000-0000-0000-0000-{i + 1:012d}" for i in range(50)]
+
+
+@pytest.mark.parametrize(
+    ("instance", "packed", "repeat"), [(0, False, 1), (3, True, 4)]
+)
+@pytest.mark.parametrize("env_cls", ENVS.values(), ids=ENVS.keys())
+def test_cached_actions_give_the_request_built_from_messages(
+    env_cls, instance, packed, repeat
+):
+    env = env_cls("localhost:0", "TestClient")
+    env.client.instance = instance
+    env.client.packed_steps = packed
+    rng = np.random.default_rng(7)
+
+    for _ in range(20):
+        actions = dict(
+            zip(
+                AGENT_IDS,
+                rng.integers(env.action_space.n, size=len(AGENT_IDS)).tolist(),
+                strict=True,
+            )
+        )
+        expected = rl_pb2.StepRequest(
+            actions={k: env._decode_action(v) for k, v in actions.items()},
+            instance=instance,
+            packed=packed,
+            repeat=repeat,
+        )
+        encoded = env._decode_actions(actions)
+        payload = encoded.payload + env.client._step_template(None, repeat)
+
+        assert rl_pb2.StepRequest.FromString(payload) == expected
+        assert encoded.messages == expected.actions
+
+
+def _episode(address: str, config: str, table: bool) -> list:
+    env = PhototaxisEnv(address, "TestClient", action_set="pivot6")
+    if not table:
+        env.action_table = lambda: None
+    server = env.loop.run_until_complete(start_server(address))
+    try:
+        env.connect_to_client()
+        env.init(config)
+        observations, _ = env.reset(seed=7)
+        rng = np.random.default_rng(7)
+        steps = [observations]
+        for _ in range(30):
+            actions = {
+                agent_id: int(rng.integers(env.action_space.n))
+                for agent_id in observations
+            }
+            observations, *_ = env.step(actions)
+            steps.append(observations)
+        return steps
+    finally:
+        env.loop.run_until_complete(server.stop(None))
+        env.close()
+
+
+def test_environment_steps_are_unchanged_by_the_action_table(make_config, free_port):
+    config = make_config(agents=4)
+    expected = _episode(f"localhost:{free_port()}", config, table=False)
+    actual = _episode(f"localhost:{free_port()}", config, table=True)
+
+    assert actual == expected
@@ -0,0 +1,95 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from environment.async_env import AsyncEnv
+from environment.qlearning.exploration_env import ExplorationEnv
+from rl.rl_client import RLClient
+
+ENVS = 3
+STEPS = 20
+
+
+def _env(address: str, instance: int) -> ExplorationEnv:
+    env = ExplorationEnv(address, "TestClient")
+    env.client = RLClient(address, "TestClient", instance=instance)
+    return env
+
+
+def _actions(env, observations: dict, rng: np.random.Generator) -> dict:
+    return {k: int(rng.integers(env.action_space.n)) for k in observations}
+
+
+def _sequential(address: str, config: str) -> list:
+    envs = [_env(address, i) for i in range(ENVS)]
+    for env in envs:
+        env.connect_to_client()
+    rngs = [np.random.default_rng(i) for i in range(ENVS)]
+    trajectories = [[env.init_reset(config, seed=i)] for i, env in enumerate(envs)]
+    for _ in range(STEPS):
+        for env, rng, trajectory in zip(envs, rngs, trajectories, strict=True):
+            observations, _, _, _, infos = env.step(
+                _actions(env, trajectory[-1][0], rng)
+            )
+            trajectory.append((observations, infos))
+    for env in envs:
+        env.close()
+    return trajectories
+
+
+async def _gathered(address: str, config: str) -> list:
+    envs = [AsyncEnv(_env(address, i)) for i in range(ENVS)]
+    await asyncio.gather(*(env.connect() for env in envs))
+    rngs = [np.random.default_rng(i) for i in range(ENVS)]
+    trajectories = [
+        [result]
+        for result in await asyncio.gather(
+            *(env.init_reset(config, seed=i) for i, env in enumerate(envs))
+        )
+    ]
+    for _ in range(STEPS):
+        steps = await asyncio.gather(
+            *(
+                env.step(_actions(env.env, trajectory[-1][0], rng))
+                for env, rng, trajectory in zip(envs, rngs, trajectories, strict=True)
+            )
+        )
+        for (observations, _, _, _, infos), trajectory in zip(
+            steps, trajectories, strict=True
+        ):
+            trajectory.append((observations, infos))
+    await asyncio.gather(*(env.close() for env in envs))
+    return trajectories
+
+
+def _threaded(address: str, config: str) -> list:
+    def run(instance: int) -> list:
+        env = _env(address, instance)
+        env.connect_to_client()
+        try:
+            rng = np.random.default_rng(instance)
+            observations, infos = env.init_reset(config, seed=instance)
+            trajectory = [(observations, infos)]
+            for _ in range(STEPS):
+                observations, _, _, _, infos = env.step(
+                    _actions(env, observations, rng)
+                )
+                trajectory.append((observations, infos))
+            return trajectory
+        finally:
+            env.close()
+
+    with ThreadPoolExecutor(max_workers=ENVS) as pool:
+        return list(pool.map(run, range(ENVS)))
+
+
+def test_gathered_and_threaded_environments_follow_the_sequential_ones(
+    threaded_server, make_config
+):
+    address = threaded_server
+    config = make_config(agents=2)
+    expected = _sequential(address, config)
+
+    assert asyncio.run(_gathered(address, config)) == expected
+    assert _threaded(address, config) == expected
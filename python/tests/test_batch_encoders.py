@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import rl_pb2
+from environment.deepqlearning.exploration_env import (
+    ExplorationEnv as DQExplorationEnv,
+)
+from environment.deepqlearning.obstacle_avoidance_env import (
+    ObstacleAvoidanceEnv as DQObstacleAvoidanceEnv,
+)
+from environment.deepqlearning.phototaxis_env import PhototaxisEnv as DQPhototaxisEnv
+from environment.qlearning.exploration_env import ExplorationEnv
+from environment.qlearning.obstacle_avoidance_env import ObstacleAvoidanceEnv
+
+ENVS = {
+    "qlearning-obstacle_avoidance": ObstacleAvoidanceEnv,
+    "qlearning-exploration": ExplorationEnv,
+    "deepqlearning-phototaxis": DQPhototaxisEnv,
+    "deepqlearning-obstacle_avoidance": DQObstacleAvoidanceEnv,
+    "deepqlearning-exploration": DQExplorationEnv,
+}
+
+
+@pytest.fixture(scope="module")
+def observations() -> dict:
+    """Observation messages with sensor readings on the bin thresholds and
+    positions and orientations outside the grid and the first turn."""
+    rng = np.random.default_rng(7)
+    samples = 300
+    sensors = np.round(rng.uniform(0.0, 1.0, (2, samples, 8)), 1)
+    positions = rng.uniform(-1.0, 6.0, (samples, 2))
+    orientations = rng.uniform(-720.0, 720.0, samples)
+    visited = rng.integers(0, 2, (samples, 25)).astype(float)
+    return {
+        f"agent-{i}": rl_pb2.Observation(
+            proximity_values=prox,
+            light_values=light,
+            position=rl_pb2.Observation.Position(x=x, y=y),
+            orientation=orientation,
+            visited_positions=cells,
+        )
+        for i, (prox, light, (x, y), orientation, cells) in enumerate(
+            zip(
+                *sensors.tolist(),
+                positions.tolist(),
+                orientations.tolist(),
+                visited.tolist(),
+                strict=True,
+            )
+        )
+    }
+
+
+@pytest.mark.parametrize("env_cls", ENVS.values(), ids=ENVS.keys())
+def test_batch_encoder_gives_the_encodings_of_the_per_agent_encoder(
+    env_cls, observations
+):
+    env = env_cls("localhost:0", "TestClient")
+    expected = {
+        agent_id: env._encode_observation(
+            list(o.proximity_values),
+            list(o.light_values),
+            o.position,
+            o.orientation,
+            list(o.visited_positions),
+        )
+        for agent_id, o in observations.items()
+    }
+
+    actual = env._encode_observations(observations)
+
+    assert actual.keys() == expected.keys()
+    for agent_id, encoded in actual.items():
+        np.testing.assert_allclose(encoded, expected[agent_id], rtol=1e-6)
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from rl.local_server import LocalRLServicer, start_server
+from rl.rl_client import RLClient
+
+
+class CountingServicer(LocalRLServicer):
+    """Stand-in counting the configurations uploaded to it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.registrations = 0
+
+    async def RegisterConfig(self, request, context):  # noqa: N802
+        self.registrations += 1
+        return await super().RegisterConfig(request, context)
+
+
+def _on_stand_in(address: str, scenario):
+    """Run `scenario(client, servicer)` with a client of a counting stand-in."""
+
+    async def run():
+        servicer = CountingServicer()
+        server = await start_server(address, servicer)
+        client = RLClient(address, "TestClient")
+        try:
+            await client.connect()
+            return await scenario(client, servicer)
+        finally:
+            await client.close()
+            await server.stop(None)
+
+    return asyncio.run(run())
+
+
+def test_init_reset_gives_the_observations_of_init_and_reset(make_config, free_port):
+    configs = [make_config(agents=1), make_config(agents=3, size=12)]
+
+    async def scenario(client, servicer):
+        results = []
+        for config in configs * 2:
+            await client.init(config)
+            expected, _ = await client.reset(seed=7)
+            actual, _ = await client.init_reset(config, seed=7)
+            results.append((dict(actual), dict(expected)))
+        return results, servicer.registrations
+
+    results, registrations = _on_stand_in(f"localhost:{free_port()}", scenario)
+
+    for actual, expected in results:
+        assert actual == expected
+    assert registrations == len(configs)
+
+
+def test_init_reset_registers_again_a_config_the_server_forgot(make_config, free_port):
+    config = make_config(agents=2)
+
+    async def scenario(client, servicer):
+        await client.init_reset(config, seed=7)
+        servicer.configs.clear()
+        observations, _ = await client.init_reset(config, seed=7)
+        return len(observations), servicer.registrations
+
+    assert _on_stand_in(f"localhost:{free_port()}", scenario) == (2, 2)
+
+
+def test_init_reset_rejects_an_invalid_config(free_port):
+    async def scenario(client, servicer):
+        await client.init_reset("environment: [", seed=7)
+
+    with pytest.raises(ValueError, match="Invalid configuration"):
+        _on_stand_in(f"localhost:{free_port()}", scenario)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from environment.coverage import Coverage
+from environment.deepqlearning.exploration_env import (
+    ExplorationEnv as DQExplorationEnv,
+)
+from environment.qlearning.exploration_env import ExplorationEnv
+from rl.local_server import start_server
+
+SIZE = 12
+
+
+def _check(coverage: Coverage) -> None:
+    """The running counts and the global bitmap against a recount."""
+    union = np.zeros(coverage.shape, dtype=bool)
+    for agent_id, grid in coverage.agent_visited.items():
+        assert coverage.agent_counts[agent_id] == grid.sum()
+        union |= grid
+    np.testing.assert_array_equal(coverage.visited, union)
+    assert coverage.count == union.sum()
+
+
+def test_visits_count_the_new_cells_only():
+    coverage = Coverage((4, 5))
+
+    assert coverage.visit("a", 1, 2)
+    assert not coverage.visit("a", 1, 2)
+    assert not coverage.visit("b", 1, 2)
+    assert coverage.visit("b", 3, 4)
+
+    _check(coverage)
+    assert coverage.agent_counts == {"a": 1, "b": 2}
+    assert coverage.infos(["a", "c"]) == {
+        "a": {"explored_ratio": 0.1, "agent_explored_ratio": 0.05},
+        "c": {"explored_ratio": 0.1, "agent_explored_ratio": 0.0},
+    }
+    coverage.clear()
+    assert coverage.count == 0
+    assert not coverage.visited.any()
+    assert coverage.agent_visited == {}
+
+
+ENVS = {
+    "qlearning": lambda address: ExplorationEnv(
+        address, "TestClient", grid_size=(SIZE, SIZE)
+    ),
+    "deepqlearning": lambda address: DQExplorationEnv(
+        address, "TestClient", grid_size=(SIZE, SIZE), virtual_grid_size=30
+    ),
+}
+
+
+@pytest.mark.parametrize("make_env", ENVS.values(), ids=ENVS.keys())
+def test_environment_coverage_matches_its_bitmaps(make_env, make_config, free_port):
+    address = f"localhost:{free_port()}"
+    env = make_env(address)
+    server = env.loop.run_until_complete(start_server(address))
+    try:
+        env.connect_to_client()
+        env.init(make_config(agents=4, size=SIZE))
+        observations, _ = env.reset(seed=7)
+        _check(env.coverage)
+        rng = np.random.default_rng(7)
+        for step in range(60):
+            actions = {k: int(rng.integers(env.action_space.n)) for k in observations}
+            observations, _, _, _, infos = env.step(actions)
+            _check(env.coverage)
+            for agent_id, info in infos.items():
+                assert info["explored_ratio"] == env.coverage.explored_ratio
+                assert info["agent_explored_ratio"] == (
+                    env.coverage.agent_visited[agent_id].sum()
+                    / env.coverage.total_cells
+                )
+            if step == 30:
+                snapshot, saved = env.snapshot(), infos
+                saved_visited = env.coverage.visited.copy()
+        assert env.coverage.count > saved_visited.sum()
+
+        _, restored = env.restore(snapshot)
+        assert restored == saved
+        np.testing.assert_array_equal(env.coverage.visited, saved_visited)
+        _check(env.coverage)
+    finally:
+        env.loop.run_until_complete(server.stop(None))
+        env.close()
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from environment.qlearning.obstacle_avoidance_env import ObstacleAvoidanceEnv
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+from rl.encoder_spec import evaluate, num_states
+from rl.local_server import start_server
+
+
+def _readings(rng: np.random.Generator, samples: int) -> list[list[float]]:
+    """Sensor readings in [0, 1], rounded so that ties are frequent."""
+    values = np.round(rng.uniform(0.0, 1.0, (samples, 8)), 1)
+    values[rng.uniform(size=samples) < 0.2] *= 0.01
+    return values.tolist()
+
+
+@pytest.fixture(scope="module")
+def readings():
+    rng = np.random.default_rng(7)
+    return _readings(rng, 300), _readings(rng, 300)
+
+
+def _assert_parity(env, readings) -> None:
+    spec = env.encoder_spec()
+    assert num_states(spec) == env.observation_space_n
+    for proximity, light in zip(*readings, strict=True):
+        expected = env._encode_observation(proximity, light, None, None, None)
+        assert evaluate(spec, proximity, light) == expected, (proximity, light)
+
+
+def test_phototaxis_spec_gives_the_states_of_the_encoder(phototaxis_env, readings):
+    _assert_parity(phototaxis_env, readings)
+
+
+def test_obstacle_avoidance_spec_gives_the_states_of_the_encoder(readings):
+    _assert_parity(
+        ObstacleAvoidanceEnv("localhost:0", "obstacle_avoidance_env"), readings
+    )
+
+
+def _states(env, address: str, config: str, server_encoding: bool) -> list[dict]:
+    """States of a seeded episode, encoded by the environment or the server."""
+    env.server_encoding = server_encoding
+    server = env.loop.run_until_complete(start_server(address))
+    try:
+        env.connect_to_client()
+        env.init(config)
+        states, _ = env.reset(seed=7)
+        rng = np.random.default_rng(7)
+        episode = [states]
+        for _ in range(40):
+            actions = {agent_id: int(rng.integers(5)) for agent_id in states}
+            states, *_ = env.step(actions)
+            episode.append(states)
+        return episode
+    finally:
+        env.loop.run_until_complete(server.stop(None))
+        env.close()
+
+
+@pytest.mark.parametrize(
+    "make_env",
+    [
+        lambda address: PhototaxisEnv(
+            address,
+            light_direction="light8",
+            light_intensity_bins=3,
+            light_intensity_thresholds=[0.2, 0.6],
+            prox_direction="prox4_threat",
+            prox_intensity_bins=2,
+        ),
+        lambda address: ObstacleAvoidanceEnv(address, "obstacle_avoidance_env"),
+    ],
+    ids=["phototaxis", "obstacle_avoidance"],
+)
+def test_server_states_are_the_ones_of_the_environment(
+    make_env, make_config, free_port
+):
+    config = make_config(agents=3)
+    address = f"localhost:{free_port()}"
+    expected = _states(make_env(address), address, config, server_encoding=False)
+    address = f"localhost:{free_port()}"
+    actual = _states(make_env(address), address, config, server_encoding=True)
+
+    assert actual == expected
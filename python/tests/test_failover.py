@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+
+from agent.qagent import QAgent
+from environment.deepqlearning.phototaxis_env import PhototaxisEnv as DQPhototaxisEnv
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+from rl.local_server import LocalRLServicer, start_server
+from rl.reconnect import ReconnectPolicy
+from training.general_qlearning import QLearning
+
+AGENT_IDS = [f"00000000-0000-0000-0000-{i:012d}" for i in (1, 2)]
+
+
+def crashing(env_cls):
+    """Subclass of an environment stopping its `victim` stand-in right before
+    step `kill_at`, as if the simulator process was killed."""
+
+    class CrashingEnv(env_cls):
+        victim = None
+        kill_at = None
+
+        def _crash_due(self) -> None:
+            if self.victim is not None and self.step_stats.steps == self.kill_at:
+                self.loop.run_until_complete(self.victim.stop(None))
+                self.victim = None
+
+        def step(self, actions: dict):
+            self._crash_due()
+            return super().step(actions)
+
+        def step_async(self, actions: dict) -> None:
+            self._crash_due()
+            super().step_async(actions)
+
+    return CrashingEnv
+
+
+class RecordingAgent:
+    """Seeded random policy keeping the transitions the trainer gives it."""
+
+    step_per_update = 1
+    step_per_update_target_model = 1
+    batch_size = 1
+    moving_avg_window_size = 20
+
+    def __init__(self, agent_id: str, seed: int) -> None:
+        self.id = agent_id
+        self.epsilon = 1.0
+        self.terminated = False
+        self.replay_memory = []
+        self.rng = np.random.default_rng(seed)
+
+    def choose_action(self, state) -> int:
+        return int(self.rng.integers(5))
+
+    def store_transition(self, state, action, reward, next_state, done) -> None:
+        self.replay_memory.append(
+            (state.tolist(), action, reward, next_state.tolist(), done)
+        )
+
+    def dqn_update(self) -> None:
+        pass
+
+    def update_target_model(self) -> None:
+        pass
+
+    def decay_epsilon(self, episode: int) -> None:
+        pass
+
+
+@pytest.fixture
+def on_stand_ins(free_port):
+    """Return a function building an environment of a class, connected to a
+    primary stand-in, with a spare one to fail over to. The primary one is
+    stopped before step `kill_at`, unless it is None."""
+    envs, servers = [], []
+
+    def build(env_cls, kill_at=None):
+        primary, spare = f"localhost:{free_port()}", f"localhost:{free_port()}"
+        env = crashing(env_cls)(primary, "TestClient")
+        for address in (primary, spare):
+            server = env.loop.run_until_complete(
+                start_server(address, LocalRLServicer())
+            )
+            servers.append((env.loop, server))
+        env.victim = servers[-2][1] if kill_at is not None else None
+        env.kill_at = kill_at
+        env.connect_to_client()
+        env.reconnect = ReconnectPolicy([spare], attempts=3, backoff_s=0.05)
+        envs.append(env)
+        return env
+
+    yield build
+    for loop, server in servers:
+        loop.run_until_complete(server.stop(None))
+    for env in envs:
+        env.close()
+
+
+def _train_q(env, config: str, pipelined: bool) -> np.ndarray:
+    env.init(config)
+    np.random.seed(7)
+    env.action_space.seed(7)
+    agent = QAgent(env, episodes=4)
+    trainer = QLearning(
+        env,
+        {AGENT_IDS[0]: agent},
+        episode_count=4,
+        max_steps_per_episode=30,
+        pipelined=pipelined,
+    )
+    trainer.train(record_history=False)
+    return agent.Q
+
+
+@pytest.mark.parametrize("pipelined", [False, True], ids=["blocking", "pipelined"])
+def test_q_learning_carries_on_after_a_failover(on_stand_ins, make_config, pipelined):
+    config = make_config(agents=1)
+    expected = _train_q(on_stand_ins(PhototaxisEnv), config, pipelined)
+
+    env = on_stand_ins(PhototaxisEnv, kill_at=45)
+    actual = _train_q(env, config, pipelined)
+
+    assert env.victim is None
+    assert env.client.server_address == env.reconnect.endpoints[0]
+    assert np.array_equal(actual, expected)
+
+
+@pytest.mark.parametrize("pipelined", [False, True], ids=["blocking", "pipelined"])
+def test_multi_agent_deep_q_learning_carries_on_after_a_failover(
+    on_stand_ins, make_config, pipelined
+):
+    pytest.importorskip("tensorflow")
+    from training.multi_agent_dqlearning import DQLearning
+
+    def train(env) -> list:
+        agents = [RecordingAgent(agent_id, i) for i, agent_id in enumerate(AGENT_IDS)]
+        np.random.seed(7)
+        DQLearning(
+            env,
+            agents,
+            [make_config(agents=2)],
+            episode_count=3,
+            episode_max_steps=30,
+            pipelined=pipelined,
+        ).simple_dqn_training()
+        return [agent.replay_memory for agent in agents]
+
+    expected = train(on_stand_ins(DQPhototaxisEnv))
+
+    env = on_stand_ins(DQPhototaxisEnv, kill_at=40)
+    actual = train(env)
+
+    assert env.victim is None
+    assert env.client.server_address == env.reconnect.endpoints[0]
+    assert actual == expected
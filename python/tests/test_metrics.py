@@ -0,0 +1,48 @@
+import asyncio
+
+import rl_pb2
+from rl.local_server import start_server
+from rl.metrics import RPCMetrics
+from rl.rl_client import RLClient
+
+AGENT_ID = "00000000-0000-0000-0000-000000000001"
+
+
+async def _record_reset_record(address: str, config: str) -> RPCMetrics:
+    metrics = RPCMetrics()
+    server = await start_server(address)
+    client = RLClient(address, "TestClient", metrics=metrics)
+    actions = {AGENT_ID: rl_pb2.ContinuousAction(left_wheel=1.0, right_wheel=0.5)}
+    try:
+        await client.connect()
+        await client.init(config)
+        await client.reset(seed=7)
+        for _ in range(3):
+            await client.step(actions)
+        metrics.reset()
+        for _ in range(2):
+            await client.step(actions)
+    finally:
+        await client.close()
+        await server.stop(None)
+    return metrics
+
+
+def test_calls_after_a_reset_are_counted_from_zero(make_config, free_port):
+    address = f"localhost:{free_port()}"
+    metrics = asyncio.run(_record_reset_record(address, make_config()))
+
+    rows = {row["method"]: row for row in metrics.snapshot()}
+
+    assert {method: row["calls"] for method, row in rows.items()} == {
+        "Init": 0,
+        "Reset": 0,
+        "Step": 2,
+    }
+    step = rows["Step"]
+    assert step["endpoint"] == address
+    assert step["errors"] == 0
+    assert 0 < step["p50_us"] <= step["p99_us"] <= step["max_us"]
+    assert step["request_bytes"] > 0
+    assert step["response_bytes"] > 0
+    assert rows["Init"]["request_bytes"] == rows["Reset"]["response_bytes"] == 0
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import rl_pb2
+from environment.deepqlearning.exploration_env import (
+    ExplorationEnv as DQExplorationEnv,
+)
+from environment.deepqlearning.obstacle_avoidance_env import (
+    ObstacleAvoidanceEnv as DQObstacleAvoidanceEnv,
+)
+from environment.deepqlearning.phototaxis_env import PhototaxisEnv as DQPhototaxisEnv
+from environment.qlearning.exploration_env import ExplorationEnv
+from environment.qlearning.obstacle_avoidance_env import ObstacleAvoidanceEnv
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+from rl.local_server import start_server
+from rl.metrics import RPCMetrics
+from rl.rl_client import RLClient
+
+ENVS = {
+    "qlearning-obstacle_avoidance": ObstacleAvoidanceEnv,
+    "qlearning-phototaxis": PhototaxisEnv,
+    "qlearning-exploration": ExplorationEnv,
+    "deepqlearning-obstacle_avoidance": DQObstacleAvoidanceEnv,
+    "deepqlearning-phototaxis": DQPhototaxisEnv,
+    "deepqlearning-exploration": DQExplorationEnv,
+}
+
+
+def _episode(env_cls, address: str, config: str, packed: bool, masked: bool):
+    """Encoded observations of a seeded episode, with the mask of the
+    environment or with all the fields, and the bytes of its step responses."""
+    metrics = RPCMetrics()
+    env = env_cls(address, "TestClient")
+    env.client = RLClient(address, "TestClient", metrics=metrics, packed_steps=packed)
+    if not masked:
+        env.observation_mask = lambda: rl_pb2.ObservationMask()
+    server = env.loop.run_until_complete(start_server(address))
+    try:
+        env.connect_to_client()
+        env.init(config)
+        observations, _ = env.reset(seed=7)
+        rng = np.random.default_rng(7)
+        encoded = [observations]
+        for _ in range(30):
+            actions = {
+                agent_id: int(rng.integers(env.action_space.n))
+                for agent_id in observations
+            }
+            observations, *_ = env.step(actions)
+            encoded.append(observations)
+    finally:
+        env.loop.run_until_complete(server.stop(None))
+        env.close()
+    return encoded, metrics.get(address, "Step").response_bytes
+
+
+@pytest.mark.parametrize("packed", [False, True], ids=["maps", "packed"])
+@pytest.mark.parametrize("env_cls", ENVS.values(), ids=ENVS.keys())
+def test_masked_observations_encode_as_the_full_ones(
+    env_cls, packed, make_config, free_port
+):
+    config = make_config(agents=2)
+    expected, full_bytes = _episode(
+        env_cls, f"localhost:{free_port()}", config, packed, masked=False
+    )
+    actual, masked_bytes = _episode(
+        env_cls, f"localhost:{free_port()}", config, packed, masked=True
+    )
+
+    assert masked_bytes < full_bytes
+    for observations, expected_observations in zip(actual, expected, strict=True):
+        assert observations.keys() == expected_observations.keys()
+        for agent_id, encoded in observations.items():
+            np.testing.assert_array_equal(encoded, expected_observations[agent_id])
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import rl_pb2
+from environment.deepqlearning.exploration_env import ExplorationEnv
+from rl.local_server import LocalSimulation, start_server
+from rl.observation_batch import ObservationDecoder
+from rl.step_result import unpack_step
+
+ACTION = rl_pb2.ContinuousAction(left_wheel=0.6, right_wheel=0.4)
+
+
+def _step_from_reset(simulation: LocalSimulation, packed: bool) -> tuple:
+    observations = simulation.reset(7).observations
+    actions = dict.fromkeys(observations, ACTION)
+    for _ in range(10):
+        simulation.step(actions)
+    response = simulation.step(actions, packed=packed)
+    return unpack_step(rl_pb2.StepResponse.FromString(response.SerializeToString()))
+
+
+def test_packed_response_decodes_to_the_values_of_the_maps(make_config):
+    simulation = LocalSimulation()
+    simulation.init(make_config(agents=12, size=20))
+    expected, *expected_flags, _ = _step_from_reset(simulation, packed=False)
+    actual, *actual_flags, _ = _step_from_reset(simulation, packed=True)
+
+    expected_batch = ObservationDecoder(dtype=np.float64).decode(expected)
+    actual_batch = ObservationDecoder(dtype=np.float64).decode(actual)
+
+    # protobuf maps do not keep the agent order, align the rows by agent ID
+    order = [actual_batch.agent_ids.index(a) for a in expected_batch.agent_ids]
+    for field in ObservationDecoder.FIELDS:
+        np.testing.assert_allclose(
+            getattr(actual_batch, field)[order],
+            getattr(expected_batch, field),
+            atol=1e-4,
+            err_msg=field,
+        )
+    for actual_column, expected_column in zip(
+        actual_flags, expected_flags, strict=True
+    ):
+        assert actual_column.keys() == expected_column.keys()
+        for agent_id, value in expected_column.items():
+            assert actual_column[agent_id] == pytest.approx(value, abs=1e-4)
+
+
+def _episode(address: str, config: str, packed: bool) -> list:
+    env = ExplorationEnv(address, "TestClient")
+    server = env.loop.run_until_complete(start_server(address))
+    try:
+        env.connect_to_client()
+        env.client.packed_steps = packed
+        env.init(config)
+        observations, _ = env.reset(seed=7)
+        rng = np.random.default_rng(3)
+        steps = []
+        for _ in range(30):
+            actions = {agent_id: int(rng.integers(5)) for agent_id in observations}
+            observations, rewards, _, _, infos = env.step(actions)
+            steps.append((observations, dict(rewards), infos))
+        return steps
+    finally:
+        env.loop.run_until_complete(server.stop(None))
+        env.close()
+
+
+def test_environments_get_the_same_steps_from_packed_responses(make_config, free_port):
+    config = make_config(agents=3)
+    expected = _episode(f"localhost:{free_port()}", config, packed=False)
+    actual = _episode(f"localhost:{free_port()}", config, packed=True)
+
+    for (observations, rewards, infos), (e_observations, e_rewards, e_infos) in zip(
+        actual, expected, strict=True
+    ):
+        assert infos == e_infos
+        assert rewards == pytest.approx(e_rewards, abs=1e-4)
+        for agent_id, encoded in e_observations.items():
+            np.testing.assert_allclose(observations[agent_id], encoded, atol=1e-4)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+import rl_pb2
+
+
+@pytest.fixture(scope="module")
+def observations() -> dict:
+    """Observation messages with readings with many ties, one in ten of them
+    cut short to exercise the padding."""
+    rng = np.random.default_rng(7)
+    values = np.round(rng.uniform(0.0, 1.0, (2, 300, 8)), 1)
+    values[rng.uniform(size=(2, 300)) < 0.2] *= 0.01
+    result = {}
+    for i, (prox, light) in enumerate(zip(*values.tolist(), strict=True)):
+        if i % 10 == 3:
+            prox = prox[: i % 4]
+        elif i % 10 == 7:
+            light = light[: i % 8]
+        result[f"agent-{i}"] = rl_pb2.Observation(
+            proximity_values=prox, light_values=light
+        )
+    return result
+
+
+def test_batch_encoder_gives_the_states_of_the_per_agent_encoder(
+    phototaxis_env, observations
+):
+    expected = {
+        agent_id: phototaxis_env._encode_observation(
+            list(o.proximity_values), list(o.light_values)
+        )
+        for agent_id, o in observations.items()
+    }
+
+    assert phototaxis_env._encode_observations(observations) == expected
@@ -0,0 +1,76 @@
+import asyncio
+import io
+
+import numpy as np
+from PIL import Image
+
+import rl_pb2
+from rl.local_server import LocalRLServicer, start_server
+from rl.render import decode_frame
+from rl.rl_client import RLClient
+
+WIDTH, HEIGHT = 64, 48
+
+
+class PngOnlyServicer(LocalRLServicer):
+    """Stand-in ignoring the requested format, as servers producing PNG only."""
+
+    async def Render(self, request, context):  # noqa: N802
+        request.ClearField("format")
+        return await super().Render(request, context)
+
+
+async def _frames(address: str, servicer, config: str) -> tuple:
+    """A PNG frame decoded by Pillow and the frames of `RLClient.render`,
+    into a new array and into a reused one."""
+    server = await start_server(address, servicer)
+    client = RLClient(address, "TestClient")
+    try:
+        await client.connect()
+        await client.init(config)
+        await client.reset(7)
+        response = await client.stub.Render(
+            rl_pb2.RenderRequest(width=WIDTH, height=HEIGHT, format="png")
+        )
+        png = np.array(Image.open(io.BytesIO(response.image)).convert("RGB"))
+        frame = await client.render(WIDTH, HEIGHT)
+        out = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+        reused = await client.render(WIDTH, HEIGHT, out=out)
+        return png, frame, reused, out
+    finally:
+        await client.close()
+        await server.stop(None)
+
+
+def test_raw_frames_are_the_png_ones(make_config, free_port):
+    config = make_config(agents=3)
+    png, frame, reused, out = asyncio.run(
+        _frames(f"localhost:{free_port()}", LocalRLServicer(), config)
+    )
+
+    np.testing.assert_array_equal(frame, png)
+    assert frame.flags.writeable
+    assert reused is out
+    np.testing.assert_array_equal(out, png)
+
+
+def test_png_only_servers_give_the_same_frames(make_config, free_port):
+    config = make_config(agents=3)
+    png, frame, reused, out = asyncio.run(
+        _frames(f"localhost:{free_port()}", PngOnlyServicer(), config)
+    )
+
+    np.testing.assert_array_equal(frame, png)
+    assert reused is out
+    np.testing.assert_array_equal(out, png)
+
+
+def test_non_rgb_png_frames_are_converted():
+    rgba = np.random.default_rng(7).integers(256, size=(4, 5, 4), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(rgba, mode="RGBA").save(buffer, format="PNG")
+    response = rl_pb2.RenderResponse(
+        image=buffer.getvalue(), format="png", width=5, height=4, channels=4
+    )
+
+    np.testing.assert_array_equal(decode_frame(response, None), rgba[..., :3])
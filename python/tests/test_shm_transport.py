@@ -0,0 +1,89 @@
+import asyncio
+
+import numpy as np
+
+import rl_pb2
+from rl.local_server import start_server
+from rl.observation_batch import ObservationDecoder
+from rl.rl_client import RLClient
+from rl.shm_transport import SharedMemoryRing
+
+AGENTS = ["a", "b"]
+
+
+async def _echo(actions, observations, rewards, flags):
+    """Simulator step answering the left wheel of every agent as its reward."""
+    await asyncio.sleep(0.01)
+    observations[:] = 0.0
+    rewards[:] = actions[:, 0]
+    flags[:] = 0.0
+
+
+async def _steps_in_flight(count: int) -> list[np.ndarray]:
+    client = SharedMemoryRing.create(count, AGENTS, 8, 8, 25)
+    server = SharedMemoryRing.attach(client.name, count, AGENTS, 8, 8, 25)
+    client.connect()
+    serving = asyncio.get_running_loop().create_task(server.serve(_echo))
+    try:
+        seqs = [
+            client.submit(np.array([[float(i), 0.0]] * len(AGENTS), np.float32))
+            for i in range(count)
+        ]
+        results = await asyncio.gather(*(client.wait(seq, timeout=2.0) for seq in seqs))
+    finally:
+        client.close()
+        await serving
+    return [rewards for _, rewards, _, _ in results]
+
+
+def test_concurrent_waits_all_get_their_step():
+    rewards = asyncio.run(_steps_in_flight(3))
+
+    for i, step_rewards in enumerate(rewards):
+        assert step_rewards.tolist() == [float(i)] * len(AGENTS)
+
+
+async def _trajectory(client: RLClient, steps: int) -> list[np.ndarray]:
+    decoder = ObservationDecoder(dtype=np.float64)
+    observations, _ = await client.reset(7)
+    actions = dict.fromkeys(
+        observations, rl_pb2.ContinuousAction(left_wheel=0.6, right_wheel=0.4)
+    )
+    rows = []
+    for _ in range(steps):
+        observations, rewards, *_ = await client.step(actions)
+        batch = decoder.decode(observations)
+        rows.append(
+            np.hstack([batch.proximity, batch.light, batch.position, batch.visited])
+        )
+        rows.append(np.array(list(rewards.values())))
+    return rows
+
+
+async def _trajectories(address: str, config: str) -> tuple[list, list, bool]:
+    """Trajectories of two instances of a stand-in, stepped over gRPC and
+    over shared memory."""
+    server = await start_server(address)
+    grpc_client = RLClient(address, "TestClient", instance=0)
+    shm_client = RLClient(address, "TestClient", instance=1, shared_memory=True)
+    try:
+        for client in (grpc_client, shm_client):
+            await client.connect()
+            await client.init(config)
+        expected = await _trajectory(grpc_client, 50)
+        actual = await _trajectory(shm_client, 50)
+        return expected, actual, shm_client.ring is not None
+    finally:
+        for client in (grpc_client, shm_client):
+            await client.close()
+        await server.stop(None)
+
+
+def test_shared_memory_steps_follow_the_grpc_trajectory(make_config, free_port):
+    expected, actual, attached = asyncio.run(
+        _trajectories(f"localhost:{free_port()}", make_config(agents=4))
+    )
+
+    assert attached
+    for e, a in zip(expected, actual, strict=True):
+        np.testing.assert_allclose(a, e, atol=1e-4)
@@ -0,0 +1,62 @@
+import grpc
+import numpy as np
+import pytest
+
+from environment.deepqlearning.phototaxis_env import PhototaxisEnv
+from rl.local_server import start_server
+
+
+@pytest.fixture
+def env(free_port):
+    """A deep Q-learning phototaxis environment on a stand-in served from
+    its loop."""
+    address = f"localhost:{free_port()}"
+    env = PhototaxisEnv(address, "TestClient")
+    server = env.loop.run_until_complete(start_server(address))
+    env.connect_to_client()
+    yield env
+    env.loop.run_until_complete(server.stop(None))
+    env.close()
+
+
+def _branch(env, agent_ids: list[str], steps: int) -> list[dict]:
+    rng = np.random.default_rng(3)
+    return [
+        env.step({agent_id: int(rng.integers(5)) for agent_id in agent_ids})[0]
+        for _ in range(steps)
+    ]
+
+
+def _assert_same_branch(actual: list[dict], expected: list[dict]) -> None:
+    assert len(actual) == len(expected)
+    for observations, expected_observations in zip(actual, expected, strict=True):
+        assert observations.keys() == expected_observations.keys()
+        for agent_id, encoded in observations.items():
+            np.testing.assert_array_equal(encoded, expected_observations[agent_id])
+
+
+def test_restored_snapshot_reproduces_the_original_branch(env, make_config):
+    env.init(make_config(agents=2))
+    observations, _ = env.reset(seed=7)
+    agent_ids = list(observations)
+    _branch(env, agent_ids, 25)
+    snapshot = env.snapshot()
+    expected = _branch(env, agent_ids, 10)
+
+    for _ in range(2):
+        env.restore(snapshot)
+        assert len(env._episode.steps) == 25
+        _assert_same_branch(_branch(env, agent_ids, 10), expected)
+    assert len(env._episode.steps) == 35
+
+
+def test_released_snapshots_cannot_be_restored(env, make_config):
+    env.init(make_config())
+    env.reset(seed=7)
+    snapshot = env.snapshot()
+
+    env.release_snapshots([snapshot])
+
+    with pytest.raises(grpc.RpcError) as error:
+        env.restore(snapshot)
+    assert error.value.code() == grpc.StatusCode.NOT_FOUND
@@ -0,0 +1,61 @@
+import asyncio
+
+import numpy as np
+
+import rl_pb2
+from rl.local_server import LocalRLServicer, start_server
+from rl.rl_client import RLClient
+
+AGENT_IDS = [f"00000000-0000-0000-0000-{i:012d}" for i in (1, 2)]
+
+
+def _actions(rng: np.random.Generator, agents: int) -> dict:
+    return {
+        agent_id: rl_pb2.ContinuousAction(
+            left_wheel=float(rng.uniform(-1.0, 1.0)),
+            right_wheel=float(rng.uniform(-1.0, 1.0)),
+        )
+        for agent_id in AGENT_IDS[:agents]
+    }
+
+
+def _as_dicts(step: tuple) -> tuple:
+    return tuple(dict(field) for field in step)
+
+
+async def _steps(address: str, configs: list[str], batched: bool) -> list:
+    """Steps of one instance per configuration, all through StepBatch or every
+    instance through its own Step call."""
+    server = await start_server(address, LocalRLServicer())
+    client = RLClient(address, "TestClient")
+    try:
+        await client.connect()
+        for instance, config in enumerate(configs):
+            assert (await client.init(config, instance))[0]
+            await client.reset(seed=instance + 3, instance=instance)
+        rng = np.random.default_rng(7)
+        steps = []
+        for _ in range(20):
+            actions = {
+                instance: _actions(rng, agents)
+                for instance, agents in enumerate((1, 2))
+            }
+            if batched:
+                results = await client.step_batch(actions)
+            else:
+                results = {i: await client.step(a, i) for i, a in actions.items()}
+            steps.append({i: _as_dicts(step) for i, step in results.items()})
+        return steps
+    finally:
+        await client.close()
+        await server.stop(None)
+
+
+def test_step_batch_gives_the_steps_of_every_instance(make_config, free_port):
+    configs = [make_config(agents=1), make_config(agents=2)]
+
+    expected = asyncio.run(_steps(f"localhost:{free_port()}", configs, False))
+    actual = asyncio.run(_steps(f"localhost:{free_port()}", configs, True))
+
+    assert actual == expected
+    assert [len(step[1][0]) for step in actual] == [2] * len(actual)
@@ -0,0 +1,59 @@
+import sys
+import time
+
+import pytest
+
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+from rl.supervisor import SimulatorSupervisor, parse_ports
+
+
+def _steps(address: str, config: str) -> list:
+    env = PhototaxisEnv(address, "TestClient")
+    env.connect_to_client()
+    try:
+        env.init(config)
+        observations, _ = env.reset(0)
+        steps = [observations]
+        for _ in range(10):
+            observations, *_ = env.step(dict.fromkeys(observations, 0))
+            steps.append(observations)
+        return steps
+    finally:
+        env.close()
+
+
+def test_ports_are_expanded():
+    assert parse_ports("50051-50053,50060") == [50051, 50052, 50053, 50060]
+
+
+def test_a_killed_simulator_is_restarted(free_port, make_config):
+    config = make_config(agents=1)
+    supervisor = SimulatorSupervisor(
+        [free_port(), free_port()], check_interval=0.05, ready_timeout=30.0
+    )
+    with supervisor:
+        expected = _steps(supervisor.addresses[-1], config)
+        victim = supervisor.servers[-1]
+        victim.process.kill()
+        victim.process.wait()
+
+        deadline = time.monotonic() + 30.0
+        while victim.restarts == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert victim.restarts == 1
+        assert victim.ready.wait(max(0.0, deadline - time.monotonic()))
+        assert _steps(supervisor.addresses[-1], config) == expected
+        assert supervisor.servers[0].restarts == 0
+        processes = [server.process for server in supervisor.servers]
+
+    assert all(process.poll() is not None for process in processes)
+    assert all(server.process is None for server in supervisor.servers)
+
+
+def test_a_simulator_exiting_before_being_ready_fails_the_start(free_port):
+    supervisor = SimulatorSupervisor(
+        [free_port()], command=[sys.executable, "-c", "raise SystemExit(3)"]
+    )
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        supervisor.start()
+    assert supervisor.servers[0].process is None
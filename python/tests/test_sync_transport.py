@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+
+
+def _episodes(address: str, config: str, sync_transport: bool) -> list:
+    """Outcome of every step of seeded single-agent episodes."""
+    env = PhototaxisEnv(address, "TestClient")
+    env.client.sync_transport = sync_transport
+    env.connect_to_client()
+    try:
+        env.init(config)
+        rng = np.random.default_rng(7)
+        outcomes = []
+        for step in range(120):
+            if step % 40 == 0:
+                observations, _ = env.reset(step // 40)
+            actions = {k: int(rng.integers(env.action_space.n)) for k in observations}
+            observations, rewards, terminateds, truncateds, _ = env.step(actions)
+            outcomes.append(
+                (observations, dict(rewards), dict(terminateds), dict(truncateds))
+            )
+        return outcomes
+    finally:
+        env.close()
+
+
+@pytest.mark.parametrize("agents", [1, 3], ids=["single", "multi"])
+def test_sync_transport_gives_the_steps_of_the_event_loop(
+    agents, threaded_server, make_config
+):
+    config = make_config(agents=agents)
+    expected = _episodes(threaded_server, config, sync_transport=False)
+
+    assert _episodes(threaded_server, config, sync_transport=True) == expected
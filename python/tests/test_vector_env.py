@@ -0,0 +1,173 @@
+import numpy as np
+import pytest
+
+from environment.deepqlearning.phototaxis_env import PhototaxisEnv as DQPhototaxisEnv
+from environment.qlearning.phototaxis_env import PhototaxisEnv
+from environment.vector_env import VectorEnv
+from rl.local_server import LocalRLServicer, start_server
+from rl.reconnect import ReconnectPolicy
+
+
+class RecordingServicer(LocalRLServicer):
+    """Stand-in keeping the Init requests it receives."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.inits = []
+
+    async def Init(self, request, context):  # noqa: N802
+        self.inits.append(request)
+        return await super().Init(request, context)
+
+
+@pytest.fixture
+def vector_env(free_port):
+    """Two phototaxis environments, each on a recording stand-in served from
+    the loop of the vector environment."""
+    ports = [free_port(), free_port()]
+    vector_env = VectorEnv(
+        [lambda port=port: PhototaxisEnv(f"localhost:{port}") for port in ports]
+    )
+    vector_env.servicers = [RecordingServicer() for _ in ports]
+    servers = [
+        vector_env.loop.run_until_complete(start_server(f"localhost:{port}", s))
+        for port, s in zip(ports, vector_env.servicers, strict=True)
+    ]
+    vector_env.connect()
+    yield vector_env
+    for server in servers:
+        vector_env.loop.run_until_complete(server.stop(None))
+    vector_env.close()
+
+
+def test_init_sends_the_mask_and_encoder_of_every_environment(vector_env, make_config):
+    for env in vector_env.envs:
+        env.server_encoding = True
+    vector_env.init(make_config(agents=2))
+
+    for env, servicer in zip(vector_env.envs, vector_env.servicers, strict=True):
+        [request] = servicer.inits
+        assert request.HasField("mask")
+        assert request.mask == env.observation_mask()
+        assert request.HasField("encoder")
+        assert request.encoder == env.encoder_spec()
+
+
+def test_resets_and_steps_are_logged_per_environment(vector_env, make_config):
+    config = make_config(agents=2)
+    vector_env.init(config)
+    vector_env.reset(seed=7)
+    vector_env.step({agent_id: [0, 1] for agent_id in vector_env.agent_ids})
+
+    for i, env in enumerate(vector_env.envs):
+        assert env._episode.config == config
+        assert env._episode.seed == 7 + i
+        assert len(env._episode.steps) == 1
+
+
+@pytest.fixture
+def failing_vector_env(free_port):
+    """Return a function building two deep Q-learning phototaxis environments,
+    each on a primary stand-in with a spare one to fail over to. The primary
+    stand-in of the first one is in `victim`."""
+    built = []
+
+    def build(max_episode_steps):
+        primaries = [f"localhost:{free_port()}" for _ in range(2)]
+        spares = [f"localhost:{free_port()}" for _ in range(2)]
+        vector_env = VectorEnv(
+            [
+                lambda address=address: DQPhototaxisEnv(address, "TestClient")
+                for address in primaries
+            ],
+            max_episode_steps=max_episode_steps,
+        )
+        servers = [
+            vector_env.loop.run_until_complete(start_server(address, LocalRLServicer()))
+            for address in primaries + spares
+        ]
+        vector_env.connect()
+        for env, spare in zip(vector_env.envs, spares, strict=True):
+            env.reconnect = ReconnectPolicy([spare], attempts=3, backoff_s=0.05)
+        vector_env.victim = servers[0]
+        built.append((vector_env, servers))
+        return vector_env
+
+    yield build
+    for vector_env, servers in built:
+        for server in servers:
+            vector_env.loop.run_until_complete(server.stop(None))
+        vector_env.close()
+
+
+def _kill(vector_env) -> None:
+    vector_env.loop.run_until_complete(vector_env.victim.stop(None))
+
+
+def _actions(vector_env, t: int) -> dict:
+    return {
+        agent_id: np.array([(t + k) % 5, (2 * t + k) % 5])
+        for k, agent_id in enumerate(vector_env.agent_ids)
+    }
+
+
+def _step_after_autoreset(vector_env, config: str, kill: bool) -> dict:
+    vector_env.init(config)
+    vector_env.reset(seed=7)
+    for t in range(2):
+        vector_env.step(_actions(vector_env, t))
+    if kill:
+        _kill(vector_env)
+    observations, *_ = vector_env.step(_actions(vector_env, 2))
+    return observations
+
+
+def test_failover_after_an_autoreset_replays_only_the_new_episode(
+    failing_vector_env, make_config
+):
+    config = make_config(agents=2)
+    expected = _step_after_autoreset(failing_vector_env(2), config, kill=False)
+
+    vector_env = failing_vector_env(2)
+    actual = _step_after_autoreset(vector_env, config, kill=True)
+
+    env = vector_env.envs[0]
+    assert env.client.server_address == env.reconnect.endpoints[0]
+    assert env._episode.seed == 7 + vector_env.num_envs
+    assert len(env._episode.steps) == 1
+    for agent_id, observations in expected.items():
+        np.testing.assert_array_equal(actual[agent_id], observations)
+
+
+def _recv_after_autoreset(vector_env, config: str, kill: bool) -> dict:
+    vector_env.init(config)
+    vector_env.async_reset(seed=7)
+    vector_env.recv()
+    env_ids = np.arange(vector_env.num_envs)
+    # the third send only collects the reset the second recv started
+    for t in range(3):
+        vector_env.send(_actions(vector_env, t), env_ids)
+        vector_env.recv()
+    if kill:
+        _kill(vector_env)
+    vector_env.send(_actions(vector_env, 3), env_ids)
+    observations, *_, infos = vector_env.recv()
+    order = np.argsort(infos["env_id"])
+    return {agent_id: obs[order] for agent_id, obs in observations.items()}
+
+
+def test_failover_after_an_async_autoreset_replays_only_the_new_episode(
+    failing_vector_env, make_config
+):
+    config = make_config(agents=2)
+    expected = _recv_after_autoreset(failing_vector_env(2), config, kill=False)
+
+    vector_env = failing_vector_env(2)
+    actual = _recv_after_autoreset(vector_env, config, kill=True)
+
+    env = vector_env.envs[0]
+    assert env.client.server_address == env.reconnect.endpoints[0]
+    assert env._episode.seed == 7 + vector_env.num_envs
+    assert len(env._episode.steps) == 1
+    for agent_id, observations in expected.items():
+        np.testing.assert_array_equal(actual[agent_id], observations)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from environment.deepqlearning.exploration_env import ExplorationEnv
+from rl.local_server import LocalRLServicer, start_server
+from rl.rl_client import RLClient
+from rl.visited_grid import VisitedGrid
+
+SIZE = 12
+
+
+def _episode(address: str, config: str, delta: bool, packed: bool, repeat: int):
+    """Encoded observations of a seeded episode, with a snapshot restored
+    halfway, with the visited cells kept as client-side grids or sent dense,
+    and the client-side grids with the ones of the server at the end."""
+    env = ExplorationEnv(address, "TestClient", grid_size=(SIZE, SIZE))
+    env.client = RLClient(address, "TestClient", packed_steps=packed)
+    env._visited_delta = delta
+    env.action_repeat = repeat
+    servicer = LocalRLServicer()
+    server = env.loop.run_until_complete(start_server(address, servicer))
+    try:
+        env.connect_to_client()
+        env.init(config)
+        observations, _ = env.reset(seed=7)
+        rng = np.random.default_rng(7)
+        encoded = [observations]
+
+        def take_steps(steps: int) -> None:
+            nonlocal observations
+            for _ in range(steps):
+                actions = {
+                    agent_id: int(rng.integers(env.action_space.n))
+                    for agent_id in observations
+                }
+                observations, *_ = env.step(actions)
+                encoded.append(observations)
+
+        take_steps(30)
+        snapshot = env.snapshot()
+        take_steps(15)
+        observations, _ = env.restore(snapshot)
+        encoded.append(observations)
+        take_steps(30)
+        simulation = servicer.instances[env.client.instance]
+        grids = {}
+        for agent_id, grid in env.client.visited_grids.get(
+            env.client.instance, {}
+        ).items():
+            full_grid = simulation._visited_grid(simulation.robots[agent_id])
+            grids[agent_id] = grid, VisitedGrid.from_message(full_grid)
+        return encoded, grids
+    finally:
+        env.loop.run_until_complete(server.stop(None))
+        env.close()
+
+
+@pytest.mark.parametrize("repeat", [1, 3], ids=["single", "repeated"])
+@pytest.mark.parametrize("packed", [False, True], ids=["maps", "packed"])
+def test_visited_grids_give_the_dense_neighbourhoods(
+    packed, repeat, make_config, free_port
+):
+    config = make_config(agents=4, size=SIZE)
+    expected, _ = _episode(f"localhost:{free_port()}", config, False, packed, repeat)
+    actual, grids = _episode(f"localhost:{free_port()}", config, True, packed, repeat)
+
+    assert grids.keys() == actual[-1].keys()
+    for grid, full_grid in grids.values():
+        np.testing.assert_array_equal(grid.visited, full_grid.visited)
+        visited = grid.visited
+        np.testing.assert_array_equal(
+            (grid.clock - grid.last_visit)[visited],
+            (full_grid.clock - full_grid.last_visit)[visited],
+        )
+        assert grid.cell == full_grid.cell
+    for observations, expected_observations in zip(actual, expected, strict=True):
+        assert observations.keys() == expected_observations.keys()
+        for agent_id, encoded in observations.items():
+            np.testing.assert_array_equal(encoded, expected_observations[agent_id])
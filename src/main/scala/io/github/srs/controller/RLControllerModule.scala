@@ -92,6 +92,20 @@ object RLControllerModule:
      */
     def step(actions: Map[Agent, Action[IO]]): StepResponse
 
+    /**
+     * Restores a state previously read from `initialState` and `state`, e.g. to branch an episode from a saved point.
+     *
+     * The states are immutable, so a saved pair stays valid whatever the controller does afterwards.
+     *
+     * @param initial
+     *   the initial state to use for the next resets.
+     * @param current
+     *   the state to continue the simulation from.
+     * @return
+     *   the observations and infos of the agents in the restored state.
+     */
+    def restore(initial: S, current: S): (Observations, Infos)
+
     /**
      * Renders the current state of the simulation to an image for the RL client.
      *
@@ -104,6 +118,19 @@ object RLControllerModule:
      *   an image representing the current state of the simulation.
      */
     def render(width: Int, height: Int): Image
+
+    /**
+     * Renders the current state of the simulation to uncompressed RGB pixels for the RL client.
+     *
+     * @param width
+     *   the width of the rendered image.
+     * @param height
+     *   the height of the rendered image.
+     *
+     * @return
+     *   the row-major pixels of the image, three bytes (red, green, blue) per pixel.
+     */
+    def renderRaw(width: Int, height: Int): Image
   end Controller
 
   trait Provider[S <: ModelModule.BaseState]:
@@ -138,6 +165,12 @@ object RLControllerModule:
           logger.debug("resetting controller")
           (state.environment.getObservations, state.environment.getInfos)
 
+        override def restore(initial: S, current: S): (Observations, Infos) =
+          _initialState = initial
+          _state = current
+          logger.debug("restoring controller state")
+          (state.environment.getObservations, state.environment.getInfos)
+
         override def step(actions: Map[Agent, Action[IO]]): StepResponse =
           logger.debug("sending step command to controller")
           logger.debug(s"actions: $actions")
@@ -190,6 +223,9 @@ object RLControllerModule:
 
         override def render(width: Int, height: Int): Image =
           EnvironmentRenderer.renderToPNG(state.environment, width, height)
+
+        override def renderRaw(width: Int, height: Int): Image =
+          EnvironmentRenderer.renderToRGB(state.environment, width, height)
       end ControllerImpl
     end Controller
 
@@ -1,5 +1,13 @@
 package io.github.srs.controller.protobuf.rl
 
+import java.nio.{ ByteBuffer, ByteOrder }
+import java.nio.charset.StandardCharsets
+import java.security.MessageDigest
+import java.util.UUID
+import java.util.concurrent.atomic.AtomicReference
+
+import scala.collection.concurrent.TrieMap
+
 import io.github.srs.model.entity.dynamicentity.sensor.SensorReadings.*
 import cats.effect.unsafe.implicits.global
 import cats.effect.IO
@@ -8,13 +16,17 @@ import io.github.srs.controller.RLControllerModule
 import io.github.srs.protos.rl.*
 import io.grpc.*
 import com.google.protobuf.ByteString
+import io.github.srs.config.SimulationConfig
 import io.github.srs.config.yaml.YamlManager
+import io.github.srs.model.environment.ValidEnvironment
 import io.github.srs.model.environment.dsl.CreationDSL.validate
 import io.github.srs.utils.random.SimpleRNG
+import io.github.srs.utils.SpatialUtils.{ discreteCell, VisitedDecay }
 import io.github.srs.model.entity.dynamicentity.DynamicEntity
 import io.github.srs.model.entity.dynamicentity.action.MovementActionFactory
 import io.github.srs.model.entity.dynamicentity.agent.Agent
 import io.github.srs.protos.rl.Observation.Position
+import cats.syntax.all.*
 
 /**
  * Module that exposes a simple RL gRPC service used by the RL controller feature.
@@ -74,24 +86,56 @@ object RLServiceModule:
        * Implements each RPC method separately:
        *   - `init` initializes the simulation with a YAML config
        *   - `reset` resets the environment with an optional seed
+       *   - `registerConfig` validates a YAML config once and returns its content-hash handle
+       *   - `initReset` re-initializes from a registered config and resets in a single round trip
+       *   - `snapshot` saves the current simulation state under an opaque id
+       *   - `restore` continues the simulation from a saved state
+       *   - `releaseSnapshots` forgets saved states that are no longer needed
+       *   - `attachSharedMemory` declines the shared memory step transport, clients keep stepping over gRPC
        *   - `step` executes actions and returns observations, rewards, etc.
+       *   - `stepBatch` executes several steps in a single round trip
+       *   - `stepStream` executes steps over a long-lived bidirectional stream
        *   - `render` generates a rendered image of the environment
        *   - `close` cleans up resources
        */
       private class ServiceImpl extends Service with RLFs2Grpc[IO, Metadata]:
 
+        private val registeredConfigs = TrieMap.empty[String, SimulationConfig[ValidEnvironment]]
+
+        private val snapshots = TrieMap.empty[String, (S, S)]
+
+        private val observationMask = AtomicReference(ObservationMask())
+
+        private val encoderSpec = AtomicReference(Option.empty[EncoderSpec])
+
+        /**
+         * The outcome of a step repeated for some ticks: the last controller response, with the rewards summed and the
+         * flags OR-ed over the ticks, and in delta mode the cells of the acting agents at the ticks before the last.
+         */
+        private final case class RepeatedStep(
+            last: RLControllerModule.StepResponse,
+            acted: Set[String],
+            rewards: Map[String, Double],
+            terminateds: Map[String, Boolean],
+            truncateds: Map[String, Boolean],
+            ticks: Int,
+            paths: Map[String, Vector[Int]],
+        ):
+          def done: Boolean = terminateds.values.exists(identity) || truncateds.values.exists(identity)
+
         /**
          * Initialize the simulation environment.
          *
          * @param request
-         *   contains the YAML configuration string
+         *   contains the YAML configuration string, the observation fields the client reads and the spec of the
+         *   discrete states to send
          * @param ctx
          *   gRPC metadata for the call
          * @return
          *   response indicating success or failure with optional error message
          */
         override def init(request: InitRequest, ctx: Metadata): IO[InitResponse] =
-          IO(manageInitRequest(request.config))
+          onHostedInstance(request.instance)(manageInitRequest(request.config, request.mask, request.encoder))
 
         /**
          * Reset the environment to initial state.
@@ -104,35 +148,182 @@ object RLServiceModule:
          *   response with observations and info for all agents
          */
         override def reset(request: ResetRequest, ctx: Metadata): IO[ResetResponse] =
-          IO(manageResetRequest(request.seed))
+          onHostedInstance(request.instance)(manageResetRequest(request.seed))
+
+        /**
+         * Parse, validate and register a configuration for later `initReset` calls.
+         *
+         * @param request
+         *   contains the YAML configuration string
+         * @param ctx
+         *   gRPC metadata for the call
+         * @return
+         *   response with the handle of the configuration, the hex SHA-256 digest of its UTF-8 bytes, or the validation
+         *   error
+         */
+        override def registerConfig(request: RegisterConfigRequest, ctx: Metadata): IO[RegisterConfigResponse] =
+          IO(manageRegisterConfigRequest(request.config))
+
+        /**
+         * Initialize the simulation from a registered configuration and reset it.
+         *
+         * @param request
+         *   contains the configuration handle, the seed, the observation fields the client reads and the spec of the
+         *   discrete states to send
+         * @param ctx
+         *   gRPC metadata for the call
+         * @return
+         *   response with observations and info for all agents, or a `NOT_FOUND` error if the handle is not registered
+         */
+        override def initReset(request: InitResetRequest, ctx: Metadata): IO[ResetResponse] =
+          registeredConfigs.get(request.handle) match
+            case Some(config) =>
+              onHostedInstance(request.instance):
+                context.controller.init(config)
+                observationMask.set(request.mask.getOrElse(ObservationMask()))
+                encoderSpec.set(request.encoder)
+                manageResetRequest(request.seed)
+            case None =>
+              IO.raiseError(
+                Status.NOT_FOUND
+                  .withDescription(s"Config ${request.handle} is not registered")
+                  .asRuntimeException(),
+              )
+
+        /**
+         * Save the current simulation state, together with the initial state used by the next resets.
+         *
+         * The states are immutable, so saving one costs a map entry and no copy.
+         *
+         * @param request
+         *   contains the simulation instance
+         * @param ctx
+         *   gRPC metadata for the call
+         * @return
+         *   response with the id to pass to `restore`
+         */
+        override def snapshot(request: SnapshotRequest, ctx: Metadata): IO[SnapshotResponse] =
+          onHostedInstance(request.instance):
+            val snapshotId = UUID.randomUUID().toString
+            snapshots.update(snapshotId, (context.controller.initialState, context.controller.state))
+            SnapshotResponse(snapshotId = snapshotId)
+
+        /**
+         * Continue the simulation from a saved state, which stays available for later restores.
+         *
+         * @param request
+         *   contains the snapshot id and the simulation instance
+         * @param ctx
+         *   gRPC metadata for the call
+         * @return
+         *   response with observations and info for all agents in the saved state, or a `NOT_FOUND` error if the id is
+         *   unknown or released
+         */
+        override def restore(request: RestoreRequest, ctx: Metadata): IO[ResetResponse] =
+          snapshots.get(request.snapshotId) match
+            case Some((initial, current)) =>
+              onHostedInstance(request.instance):
+                val (obs, deInfos) = context.controller.restore(initial, current)
+                toResetResponse(obs, deInfos)
+            case None =>
+              IO.raiseError(
+                Status.NOT_FOUND
+                  .withDescription(s"Snapshot ${request.snapshotId} does not exist")
+                  .asRuntimeException(),
+              )
+
+        /**
+         * Forget saved states, unknown ids are ignored.
+         *
+         * @param request
+         *   contains the snapshot ids
+         * @param ctx
+         *   gRPC metadata for the call
+         * @return
+         *   response with the number of states actually released
+         */
+        override def releaseSnapshots(request: ReleaseSnapshotsRequest, ctx: Metadata): IO[ReleaseSnapshotsResponse] =
+          IO(ReleaseSnapshotsResponse(released = request.snapshotIds.count(id => snapshots.remove(id).isDefined)))
+
+        /**
+         * Serve the steps of an instance through a shared memory ring created by a co-located client.
+         *
+         * This server does not implement the ring, which the Python stand-in server does, so the client is told to keep
+         * using `step`.
+         *
+         * @param request
+         *   contains the segment name and layout
+         * @param ctx
+         *   gRPC metadata for the call
+         * @return
+         *   a response with `ok = false`
+         */
+        override def attachSharedMemory(request: SharedMemoryRequest, ctx: Metadata): IO[SharedMemoryResponse] =
+          IO(SharedMemoryResponse(ok = false, message = Some("Shared memory steps are not supported by this server")))
 
         /**
          * Execute a step in the environment.
          *
          * @param request
-         *   contains actions for each agent
+         *   contains actions for each agent and the number of ticks to apply them for
          * @param ctx
          *   gRPC metadata for the call
          * @return
          *   response with observations, rewards, terminateds, truncateds, and infos
          */
         override def step(request: StepRequest, ctx: Metadata): IO[StepResponse] =
-          IO(manageStepRequest(request.actions))
+          onHostedInstance(request.instance)(manageStepRequest(request.actions, request.packed, request.repeat))
+
+        /**
+         * Execute a batch of steps in a single round trip.
+         *
+         * This server hosts a single simulation instance, so every entry must target instance `0` and the entries are
+         * applied in order.
+         *
+         * @param request
+         *   contains one step request per simulation instance
+         * @param ctx
+         *   gRPC metadata for the call
+         * @return
+         *   response with one step response per request entry, in the same order
+         */
+        override def stepBatch(request: StepBatchRequest, ctx: Metadata): IO[StepBatchResponse] =
+          request.steps.toList
+            .traverse: step =>
+              onHostedInstance(step.instance)(manageStepRequest(step.actions, step.packed, step.repeat))
+            .map(steps => StepBatchResponse(steps = steps))
+
+        /**
+         * Execute steps over a long-lived bidirectional stream.
+         *
+         * Each incoming request is answered, in order, with the response `step` would return for it.
+         *
+         * @param request
+         *   stream of step requests
+         * @param ctx
+         *   gRPC metadata for the call
+         * @return
+         *   stream of step responses, one per request
+         */
+        override def stepStream(request: fs2.Stream[IO, StepRequest], ctx: Metadata): fs2.Stream[IO, StepResponse] =
+          request.evalMap: step =>
+            onHostedInstance(step.instance)(manageStepRequest(step.actions, step.packed, step.repeat))
 
         /**
          * Render the current environment state.
          *
          * @param request
-         *   contains optional width and height
+         *   contains optional width, height and format ("png" by default, or "raw" for uncompressed RGB)
          * @param ctx
          *   gRPC metadata for the call
          * @return
-         *   response with rendered image as bytes
+         *   response with rendered image as bytes, tagged with the format actually used
          */
         override def render(request: RenderRequest, ctx: Metadata): IO[RenderResponse] =
           val width = request.width.getOrElse(800)
           val height = request.height.getOrElse(600)
-          IO(manageRenderRequest(width, height))
+          val raw = request.format.contains("raw")
+          onHostedInstance(request.instance)(manageRenderRequest(width, height, raw))
 
         /**
          * Close and cleanup the environment.
@@ -147,48 +338,275 @@ object RLServiceModule:
         override def close(request: CloseRequest, ctx: Metadata): IO[CloseResponse] =
           IO(CloseResponse(ok = true, message = None))
 
-        private def manageInitRequest(config: String): InitResponse =
-          val simulationConfig = YamlManager.parse[IO](config).unsafeRunSync()
-          simulationConfig match
-            case Left(errors) => InitResponse(ok = false, message = Some(errors.mkString("\n")))
-            case Right(config) =>
-              config.environment.validate match
-                case Left(error) => InitResponse(ok = false, message = Some(error.toString))
-                case Right(env) =>
-                  context.controller.init(config.simulation in env)
-                  InitResponse(ok = true, message = None)
+        private def onHostedInstance[A](instance: Int)(response: => A): IO[A] =
+          if instance == 0 then IO(response)
+          else
+            IO.raiseError(
+              Status.INVALID_ARGUMENT
+                .withDescription(s"Instance $instance is not hosted, this server runs a single simulation")
+                .asRuntimeException(),
+            )
+
+        private def parseConfig(config: String): Either[String, SimulationConfig[ValidEnvironment]] =
+          YamlManager.parse[IO](config).unsafeRunSync() match
+            case Left(errors) => Left(errors.mkString("\n"))
+            case Right(parsed) =>
+              parsed.environment.validate match
+                case Left(error) => Left(error.toString)
+                case Right(env) => Right(parsed.simulation in env)
+
+        private def configHandle(config: String): String =
+          MessageDigest
+            .getInstance("SHA-256")
+            .digest(config.getBytes(StandardCharsets.UTF_8))
+            .map(b => f"${b & 0xff}%02x")
+            .mkString
+
+        private def manageInitRequest(
+            config: String,
+            mask: Option[ObservationMask],
+            encoder: Option[EncoderSpec],
+        ): InitResponse =
+          parseConfig(config) match
+            case Left(message) => InitResponse(ok = false, message = Some(message))
+            case Right(simulationConfig) =>
+              context.controller.init(simulationConfig)
+              observationMask.set(mask.getOrElse(ObservationMask()))
+              encoderSpec.set(encoder)
+              InitResponse(ok = true, message = None)
+
+        private def manageRegisterConfigRequest(config: String): RegisterConfigResponse =
+          val handle = configHandle(config)
+          if registeredConfigs.contains(handle) then RegisterConfigResponse(ok = true, handle = handle)
+          else
+            parseConfig(config) match
+              case Left(message) => RegisterConfigResponse(ok = false, message = Some(message), handle = handle)
+              case Right(simulationConfig) =>
+                registeredConfigs.update(handle, simulationConfig)
+                RegisterConfigResponse(ok = true, handle = handle)
 
         private def manageResetRequest(seed: Int): ResetResponse =
           val rng = SimpleRNG(Int.int2long(seed))
           val (obs, deInfos) = context.controller.reset(rng)
-          val observations = obs.map(_.toObservationPair)
+          toResetResponse(obs, deInfos)
+
+        private def toResetResponse(
+            obs: RLControllerModule.Observations,
+            deInfos: RLControllerModule.Infos,
+        ): ResetResponse =
+          val observations = obs.map(_.toSyncedObservationPair)
           val infos = deInfos.map { (ent, info) => ent.id.toString -> info }
 
           ResetResponse(observations = observations, infos = infos)
 
-        private def manageStepRequest(actions: Map[String, ContinuousAction]): StepResponse =
-          val agentActions = for
-            (id, ca) <- actions
-            agent <- context.controller.state.environment.entities.collect:
-              case a: Agent if a.id.toString == id => a
-            action <- MovementActionFactory.customMove[IO](ca.leftWheel, ca.rightWheel).toOption
-          yield agent -> action
-          val stepResponse: io.github.srs.controller.RLControllerModule.StepResponse =
-            context.controller.step(agentActions)
-
-          StepResponse(
-            observations = stepResponse.observations.map(_.toObservationPair),
-            rewards = stepResponse.rewards.map(_.to),
-            terminateds = stepResponse.terminateds.map(_.to),
-            truncateds = stepResponse.truncateds.map(_.to),
-            infos = stepResponse.infos.map(_.to),
+        private def manageStepRequest(
+            actions: Map[String, ContinuousAction],
+            packed: Boolean,
+            repeat: Int,
+        ): StepResponse =
+          val step = repeatedStep(actions, repeat)
+          val last = step.last
+
+          if packed then
+            StepResponse(infos = last.infos.map(_.to), packed = Some(toStepTensors(step)), ticks = step.ticks)
+          else
+            StepResponse(
+              observations = last.observations.map(_.toSteppedObservationPair(step.acted, step.paths)),
+              rewards = step.rewards,
+              terminateds = step.terminateds,
+              truncateds = step.truncateds,
+              infos = last.infos.map(_.to),
+              ticks = step.ticks,
+            )
+
+        /**
+         * Applies the actions for `repeat` ticks, at least one, stopping after a tick where an agent is terminated or
+         * truncated. The agents are looked up again at every tick, as their state changes.
+         */
+        private def repeatedStep(actions: Map[String, ContinuousAction], repeat: Int): RepeatedStep =
+          def tick(): (RLControllerModule.StepResponse, Set[String]) =
+            val agentActions = for
+              (id, ca) <- actions
+              agent <- context.controller.state.environment.entities.collect:
+                case a: Agent if a.id.toString == id => a
+              action <- MovementActionFactory.customMove[IO](ca.leftWheel, ca.rightWheel).toOption
+            yield agent -> action
+            (context.controller.step(agentActions), agentActions.keySet.map(_.id.toString))
+
+          def loop(step: RepeatedStep): RepeatedStep =
+            if step.ticks >= repeat || step.done then step
+            else
+              val (next, _) = tick()
+              val cells =
+                if observationMask.get().visitedDelta then
+                  step.last.observations.collect:
+                    case (agent, obs) if step.acted.contains(agent.id.toString) =>
+                      agent.id.toString -> cellIndex(obs.position)
+                else Map.empty[String, Int]
+              loop(
+                RepeatedStep(
+                  last = next,
+                  acted = step.acted,
+                  rewards = step.rewards ++ next.rewards.map: (agent, reward) =>
+                    agent.id.toString -> (step.rewards.getOrElse(agent.id.toString, 0.0) + reward),
+                  terminateds = step.terminateds ++ next.terminateds.map: (agent, done) =>
+                    agent.id.toString -> (done || step.terminateds.getOrElse(agent.id.toString, false)),
+                  truncateds = step.truncateds ++ next.truncateds.map: (agent, done) =>
+                    agent.id.toString -> (done || step.truncateds.getOrElse(agent.id.toString, false)),
+                  ticks = step.ticks + 1,
+                  paths = step.paths ++ cells.map((id, cell) => id -> (step.paths.getOrElse(id, Vector.empty) :+ cell)),
+                ),
+              )
+
+          val (first, acted) = tick()
+          loop(
+            RepeatedStep(
+              last = first,
+              acted = acted,
+              rewards = first.rewards.map(_.to),
+              terminateds = first.terminateds.map(_.to),
+              truncateds = first.truncateds.map(_.to),
+              ticks = 1,
+              paths = Map.empty,
+            ),
           )
+        end repeatedStep
 
-        private def manageRenderRequest(width: Int, height: Int): RenderResponse =
-          val imageBytes = context.controller.render(width, height)
+        /**
+         * The packed tensors of a step, written column by column from the agent observations, without building the
+         * observation message of every agent first.
+         */
+        private def toStepTensors(step: RepeatedStep): StepTensors =
+          val mask = observationMask.get()
+          val agents = step.last.observations.toList
+          val ids = agents.map(_._1.id.toString)
+          val observations = agents.map(_._2)
+          val proximity = observations.map: obs =>
+            mask.select("proximity", obs.sensorReadings.proximityReadings.map(_.value), mask.proximityIndices)
+          val light = observations.map: obs =>
+            mask.select("light", obs.sensorReadings.lightReadings.map(_.value), mask.lightIndices)
+          val visited =
+            if mask.visitedDelta then observations.map(_ => Seq.empty[Double])
+            else observations.map(obs => mask.select("visited", obs.visitedPositions, Seq.empty))
+          val numProximity = proximity.map(_.size).maxOption.getOrElse(0)
+          val numLight = light.map(_.size).maxOption.getOrElse(0)
+          val numVisited = visited.map(_.size).maxOption.getOrElse(0)
+          val sendsPosition = mask.sends("position")
+          val sendsOrientation = mask.sends("orientation")
+          val delta = (id: String) => mask.visitedDelta && step.acted.contains(id)
+          val flag = (done: Boolean) => if done then 1.0f else 0.0f
+
+          val poses = packed(agents.size * 3): buffer =>
+            observations.foreach: obs =>
+              val (x, y) = if sendsPosition then obs.position else (0.0, 0.0)
+              val orientation = if sendsOrientation then obs.orientation else 0.0
+              buffer.putFloat(x.toFloat).putFloat(y.toFloat).putFloat(orientation.toFloat)
+          val states = encoderSpec.get().filter(_ => mask.sends("state")) match
+            case Some(spec) =>
+              packed(agents.size): buffer =>
+                observations.foreach(obs => buffer.putInt(encodeState(spec, obs)))
+            case None => ByteString.EMPTY
+          val visitedCells =
+            if mask.visitedDelta then
+              packed(agents.size): buffer =>
+                agents.foreach: (agent, obs) =>
+                  buffer.putInt(if delta(agent.id.toString) then cellIndex(obs.position) else -1)
+            else ByteString.EMPTY
+          val visitedPaths =
+            if mask.visitedDelta && step.ticks > 1 then
+              packed(agents.size * (step.ticks - 1)): buffer =>
+                ids.foreach: id =>
+                  val path = if delta(id) then step.paths.getOrElse(id, Seq.empty) else Seq.empty
+                  path.iterator.padTo(step.ticks - 1, -1).foreach(cell => buffer.putInt(cell))
+            else ByteString.EMPTY
+          val rewards = packed(agents.size): buffer =>
+            ids.foreach(id => buffer.putFloat(step.rewards.getOrElse(id, 0.0).toFloat))
+          val flags = packed(agents.size * 2): buffer =>
+            ids.foreach: id =>
+              buffer
+                .putFloat(flag(step.terminateds.getOrElse(id, false)))
+                .putFloat(flag(step.truncateds.getOrElse(id, false)))
+
+          StepTensors(
+            observations = Some(
+              ObservationTensors(
+                agentIds = ids,
+                numProximity = numProximity,
+                numLight = numLight,
+                numVisited = numVisited,
+                proximity = float32Rows(proximity, numProximity, 1.0),
+                light = float32Rows(light, numLight, 0.0),
+                poses = poses,
+                visited = float32Rows(visited, numVisited, -1.0),
+                states = states,
+                visitedCells = visitedCells,
+                visitedPaths = visitedPaths,
+              ),
+            ),
+            rewards = rewards,
+            flags = flags,
+          )
+        end toStepTensors
+
+        /**
+         * Rows of float32 values padded to the same width, one after the other.
+         */
+        private def float32Rows(rows: Seq[Seq[Double]], width: Int, pad: Double): ByteString =
+          packed(rows.size * width): buffer =>
+            rows.foreach(row => row.iterator.padTo(width, pad).foreach(value => buffer.putFloat(value.toFloat)))
+
+        /**
+         * Little-endian bytes of `count` 32-bit values, written by `write` into a buffer allocated once.
+         */
+        private def packed(count: Int)(write: ByteBuffer => Unit): ByteString =
+          val buffer = ByteBuffer.allocate(count * 4).order(ByteOrder.LITTLE_ENDIAN)
+          write(buffer)
+          ByteString.copyFrom(buffer.array())
+
+        /**
+         * Discrete state of an agent with the spec sent at init, see [[StateEncoder]].
+         */
+        private def encodeState(spec: EncoderSpec, obs: RLControllerModule.AgentObservation): Int =
+          StateEncoder.encode(
+            spec,
+            obs.sensorReadings.proximityReadings.map(_.value),
+            obs.sensorReadings.lightReadings.map(_.value),
+          )
+
+        /**
+         * Index of the grid cell of a position, as in [[VisitedGrid]].
+         */
+        private def cellIndex(position: (Double, Double)): Int =
+          val (x, y) = discreteCell(position)
+          y * context.controller.state.environment.width + x
+
+        /**
+         * The cells visited by an agent with the steps since their last visit, as seen by its observation: the cells
+         * of the agent map decay once more and the current cell has age 0.
+         */
+        private def visitedGrid(agent: Agent, position: (Double, Double)): VisitedGrid =
+          val env = context.controller.state.environment
+          val current = discreteCell(position)
+          val inside = (x: Int, y: Int) => x >= 0 && x < env.width && y >= 0 && y < env.height
+          val ages = agent.visitedCountPositions.collect {
+            case ((x, y), value) if (x != current._1 || y != current._2) && value > 0.0 && inside(x, y) =>
+              (y * env.width + x) -> (math.round(math.log(value) / math.log(VisitedDecay)).toInt + 1)
+          } + (cellIndex(position) -> 0)
+          val cells = Array.fill[Byte]((env.width * env.height + 7) / 8)(0)
+          ages.keys.foreach(i => cells(i / 8) = (cells(i / 8) | (1 << (i % 8))).toByte)
+          VisitedGrid(
+            width = env.width,
+            height = env.height,
+            cells = ByteString.copyFrom(cells),
+            ages = ages.toList.sortBy(_._1).map(_._2),
+          )
+
+        private def manageRenderRequest(width: Int, height: Int, raw: Boolean): RenderResponse =
+          val imageBytes =
+            if raw then context.controller.renderRaw(width, height) else context.controller.render(width, height)
           RenderResponse(
             image = ByteString.copyFrom(imageBytes),
-            format = "png",
+            format = if raw then "raw" else "png",
             width = width,
             height = height,
             channels = 3,
@@ -207,20 +625,62 @@ object RLServiceModule:
         extension (self: (DynamicEntity, RLControllerModule.AgentObservation))
 
           def toObservationPair: (String, Observation) =
+            val mask = observationMask.get()
             self.to(obs =>
               Observation(
-                proximityValues = obs.sensorReadings.proximityReadings.map(_.value),
-                lightValues = obs.sensorReadings.lightReadings.map(_.value),
-                position = Some(
+                proximityValues =
+                  mask.select("proximity", obs.sensorReadings.proximityReadings.map(_.value), mask.proximityIndices),
+                lightValues = mask.select("light", obs.sensorReadings.lightReadings.map(_.value), mask.lightIndices),
+                position = Option.when(mask.sends("position"))(
                   Position(
                     x = obs.position._1,
                     y = obs.position._2,
                   ),
                 ),
-                orientation = obs.orientation,
-                visitedPositions = obs.visitedPositions,
+                orientation = if mask.sends("orientation") then obs.orientation else 0.0,
+                visitedPositions =
+                  if mask.visitedDelta then Seq.empty else mask.select("visited", obs.visitedPositions, Seq.empty),
+                state = encoderSpec.get().filter(_ => mask.sends("state")).map(encodeState(_, obs)),
               ),
             )
+
+          /**
+           * The observation of a reset or restore, carrying the whole visited grid in delta mode.
+           */
+          def toSyncedObservationPair: (String, Observation) =
+            val (id, observation) = toObservationPair
+            val grid = self._1 match
+              case agent: Agent if observationMask.get().visitedDelta => Some(visitedGrid(agent, self._2.position))
+              case _ => None
+            id -> observation.copy(visitedGrid = grid)
+
+          /**
+           * The observation of a step, carrying the cell of the agent in delta mode if it acted, the only case where
+           * its visited grid changes, preceded by the cells of the earlier ticks of a repeated step.
+           */
+          def toSteppedObservationPair(acted: Set[String], paths: Map[String, Seq[Int]]): (String, Observation) =
+            val (id, observation) = toObservationPair
+            val delta = observationMask.get().visitedDelta && acted.contains(id)
+            id -> observation.copy(
+              visitedCell = Option.when(delta)(cellIndex(self._2.position)),
+              visitedPath = if delta then paths.getOrElse(id, Seq.empty) else Seq.empty,
+            )
+
+        extension (mask: ObservationMask)
+
+          /**
+           * Whether the client subscribed to a field, every field being sent when none is listed.
+           */
+          def sends(field: String): Boolean = mask.fields.isEmpty || mask.fields.contains(field)
+
+          /**
+           * The values of a field the client reads: none if it is not subscribed, otherwise the values at the given
+           * indices, in their order, or all of them if no index is given.
+           */
+          def select(field: String, values: Seq[Double], indices: Seq[Int]): Seq[Double] =
+            if !mask.sends(field) then Seq.empty
+            else if indices.isEmpty then values
+            else indices.flatMap(values.lift)
       end ServiceImpl
     end Service
   end Component
@@ -0,0 +1,32 @@
+package io.github.srs.controller.protobuf.rl
+
+import io.github.srs.protos.rl.EncoderSpec
+
+/**
+ * Discretization of the sensor readings of an agent with the [[EncoderSpec]] sent at init, as `rl.encoder_spec` does
+ * on the Python side.
+ */
+object StateEncoder:
+
+  /**
+   * Discrete state of an agent: every term of the spec reduces a group of sensors to one digit of a mixed-radix
+   * number, the first term being the most significant. Sensors missing from the readings read 1.0 for proximity and
+   * 0.0 for light.
+   */
+  def encode(spec: EncoderSpec, proximity: Seq[Double], light: Seq[Double]): Int =
+    spec.terms.foldLeft(0): (state, term) =>
+      val (readings, pad) = if term.source.isLight then (light, 0.0) else (proximity, 1.0)
+      val indices = if term.indices.isEmpty then readings.indices else term.indices
+      val group = indices.map(i => readings.lift(i).getOrElse(pad))
+      val highest = group.maxOption.getOrElse(pad)
+      val lowest = group.minOption.getOrElse(pad)
+      val bin = (value: Double) => term.thresholds.count(_ <= value)
+      val (digit, radix) =
+        if term.reduce.isArgmax then
+          val noneState = term.noneBelow.exists(readings.maxOption.getOrElse(pad) < _)
+          (if noneState then group.size else group.indexOf(highest), group.size + term.noneBelow.size)
+        else if term.reduce.isArgmin then (group.indexOf(lowest), group.size)
+        else if term.reduce.isMax then (bin(highest), term.thresholds.size + 1)
+        else (bin(lowest), term.thresholds.size + 1)
+      state * radix + digit
+end StateEncoder
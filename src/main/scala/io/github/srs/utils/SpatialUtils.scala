@@ -7,6 +7,11 @@ import io.github.srs.model.environment.Environment
 
 object SpatialUtils:
 
+  /**
+   * Factor applied to the visited-cell values of an agent at every step, the current cell being set back to 1.
+   */
+  val VisitedDecay: Double = 0.999
+
   def discreteCell(pos: Point2D, cellSize: Double = 1.0): (Int, Int) =
     val cellX = (pos.x / cellSize).toInt
     val cellY = (pos.y / cellSize).toInt
@@ -81,7 +86,7 @@ object SpatialUtils:
   ): (Map[(Int, Int), Double], List[Double]) =
     val (x, y) = pos
 
-    val m2 = m.view.mapValues(_ * 0.999).toMap
+    val m2 = m.view.mapValues(_ * VisitedDecay).toMap
     val newM = m2 + ((x, y) -> 1.0)
 
     def insideMap(px: Int, py: Int): Boolean =
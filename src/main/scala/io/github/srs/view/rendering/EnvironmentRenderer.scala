@@ -74,4 +74,23 @@ object EnvironmentRenderer extends EnvironmentDrawing:
     javax.imageio.ImageIO.write(image, "png", baos)
     baos.toByteArray
 
+  /**
+   * Renders environment as uncompressed RGB pixels, skipping the PNG encoding.
+   *
+   * @param env
+   *   Environment to render
+   * @param width
+   *   Image width
+   * @param height
+   *   Image height
+   * @return
+   *   Row-major byte array with three bytes (red, green, blue) per pixel
+   */
+  def renderToRGB(env: Environment, width: Int, height: Int): Array[Byte] =
+    val image = render(env, width, height)
+    val pixels = image.getRGB(0, 0, width, height, new Array[Int](width * height), 0, width)
+    Array.tabulate[Byte](width * height * 3): i =>
+      val shift = 16 - 8 * (i % 3)
+      ((pixels(i / 3) >> shift) & 0xff).toByte
+
 end EnvironmentRenderer
@@ -0,0 +1,38 @@
+package io.github.srs.controller.protobuf.rl
+
+import io.github.srs.protos.rl.{ EncoderSpec, EncoderTerm }
+import io.github.srs.protos.rl.EncoderTerm.{ Reduce, Source }
+import org.scalatest.flatspec.AnyFlatSpec
+import org.scalatest.matchers.should.Matchers
+
+/**
+ * Tests for [[StateEncoder]]. The expected states are the ones given by `rl.encoder_spec.evaluate` on the Python side
+ * for the same spec and readings.
+ */
+final class StateEncoderTest extends AnyFlatSpec with Matchers:
+
+  private val spec = EncoderSpec(
+    terms = Seq(
+      EncoderTerm(source = Source.LIGHT, reduce = Reduce.ARGMAX, indices = Seq(0, 2, 4, 6), noneBelow = Some(0.05)),
+      EncoderTerm(source = Source.LIGHT, reduce = Reduce.MAX, thresholds = Seq(0.2, 0.6)),
+      EncoderTerm(source = Source.PROXIMITY, reduce = Reduce.ARGMIN, indices = Seq(0, 1, 7)),
+      EncoderTerm(source = Source.PROXIMITY, reduce = Reduce.MIN, thresholds = Seq(0.5)),
+    ),
+  )
+
+  "StateEncoder" should "give a mixed-radix digit per term, the first one being the most significant" in:
+    val proximity = Seq(0.9, 0.3, 0.3, 0.9, 0.9, 0.9, 0.9, 0.2)
+    val light = Seq(0.1, 0.0, 0.7, 0.0, 0.7, 0.0, 0.2, 0.0)
+    StateEncoder.encode(spec, proximity, light) shouldBe 34
+
+  it should "give the extra argmax digit when every sensor is below none_below, and the first sensor on ties" in:
+    StateEncoder.encode(spec, Seq.fill(8)(0.4), Seq.fill(8)(0.01)) shouldBe 72
+
+  it should "read 1.0 for missing proximity sensors and 0.0 for missing light sensors" in:
+    val proximity = Seq(0.8, 0.6, 0.7, 0.9)
+    val light = Seq(0.0, 0.3, 0.1, 0.0, 0.5)
+    StateEncoder.encode(spec, proximity, light) shouldBe 45
+
+  it should "give state 0 for an empty spec" in:
+    StateEncoder.encode(EncoderSpec(), Seq(0.5), Seq(0.5)) shouldBe 0
+end StateEncoderTest